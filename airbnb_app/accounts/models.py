@@ -116,6 +116,8 @@ class CustomUser(AbstractUser, PermissionsMixin):
 
     # email field tracker
     email_tracker = FieldTracker(fields=['email'])
+    # tracker of fields, that are rendered with the user's realty (as its host) on pages and by the API
+    host_fields_tracker = FieldTracker(fields=['email', 'first_name', 'last_name', 'is_email_confirmed'])
 
     class Meta:
         verbose_name = 'user'
@@ -199,6 +201,11 @@ class Profile(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # tracker of fields, that are rendered with the user's realty (as its host) on pages and by the API
+    host_fields_tracker = FieldTracker(fields=[
+        'profile_image', 'date_of_birth', 'gender', 'phone_number', 'is_phone_number_confirmed', 'description',
+    ])
+
     class Meta:
         verbose_name = 'profile'
         verbose_name_plural = 'profiles'
@@ -13,7 +13,7 @@ from common.constants import (
 )
 from common.types import AuthenticatedHttpRequest
 from hosts.services import get_host_or_none_by_user
-from realty.services.realty import get_available_realty_by_host
+from realty.services.realty import get_available_realty_by_host, get_listing_cards
 
 from .constants import (
     EMAIL_CONFIRMATION_FAILURE_RESPONSE_MESSAGE, EMAIL_CONFIRMATION_SUCCESS_RESPONSE_MESSAGE,
@@ -228,8 +228,8 @@ class ProfileShowView(
         return super(ProfileShowView, self).dispatch(request, *args, **kwargs)
 
     def get(self, request: HttpRequest, *args, **kwargs):
-        host_listings = get_available_realty_by_host(
-            realty_host=get_host_or_none_by_user(user=self.profile_owner),
+        host_listings = get_listing_cards(
+            get_available_realty_by_host(realty_host=get_host_or_none_by_user(user=self.profile_owner)),
         )
 
         return self.render_to_response(
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from itertools import cycle
 
 from model_bakery.recipe import Recipe
@@ -18,6 +19,19 @@ cities = [
     "New York",
     "Chicago",
 ]
+# (latitude, longitude) of the `cities` centers
+cities_coordinates = [
+    (Decimal('55.755826'), Decimal('37.617300')),
+    (Decimal('59.931058'), Decimal('30.360910')),
+    (Decimal('41.902783'), Decimal('12.496366')),
+    (Decimal('45.464204'), Decimal('9.189982')),
+    (Decimal('52.520007'), Decimal('13.404954')),
+    (Decimal('48.135125'), Decimal('11.581981')),
+    (Decimal('48.856614'), Decimal('2.352222')),
+    (Decimal('43.296482'), Decimal('5.369780')),
+    (Decimal('40.712776'), Decimal('-74.005974')),
+    (Decimal('41.878114'), Decimal('-87.629798')),
+]
 streets = [
     "Tverskaya Ulitsa, 12",
     "Bolshaya Nikitskaya Ulitsa, 24",
@@ -41,4 +55,7 @@ address = Recipe(
     country=cycle(countries),
     city=cycle(cities),
     street=cycle(streets),
+    # same length as `cities`, so coordinates match the city
+    latitude=cycle(latitude for latitude, _ in cities_coordinates),
+    longitude=cycle(longitude for _, longitude in cities_coordinates),
 )
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.text import slugify
 
@@ -10,10 +12,32 @@ class Address(models.Model):
     street = models.CharField(verbose_name='street', max_length=255)
     city_slug = models.SlugField(verbose_name='city slug', max_length=255)
     country_slug = models.SlugField(verbose_name='country slug', max_length=255)
+    latitude = models.DecimalField(
+        verbose_name='latitude',
+        max_digits=9,
+        decimal_places=6,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        null=True,
+        blank=True,
+    )
+    longitude = models.DecimalField(
+        verbose_name='longitude',
+        max_digits=9,
+        decimal_places=6,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         verbose_name = 'address'
         verbose_name_plural = 'addresses'
+        indexes = [
+            # autocomplete (`pg_trgm`)
+            GinIndex(fields=['city'], name='address_city_trgm_idx', opclasses=['gin_trgm_ops']),
+            # map viewport search (latitude range scan, longitude is checked inside that range)
+            models.Index(fields=['latitude', 'longitude'], name='address_coordinates_idx'),
+        ]
 
     def __str__(self):
         return f"Address #{self.id}"
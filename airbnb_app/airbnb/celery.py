@@ -39,6 +39,41 @@ app.conf.beat_schedule = {
             'queue': 'default',
         },
     },
+    'update_trending_realty_ranking': {
+        'task': 'realty.tasks.update_trending_realty_ranking',
+        'schedule': crontab(minute='*/5'),  # every 5 minutes (a visits bucket is 5 minutes wide)
+        'options': {
+            'queue': 'default',
+        },
+    },
+    'refresh_realty_materialized_view': {
+        'task': 'realty.tasks.refresh_realty_materialized_view',
+        'schedule': crontab(minute=0),  # every hour (picks up changes that don't trigger a refresh, e.g. host info)
+        'options': {
+            'queue': 'default',
+        },
+    },
+    'render_realty_sitemaps': {
+        'task': 'realty.tasks.render_realty_sitemaps',
+        'schedule': crontab(minute=10),  # every hour
+        'options': {
+            'queue': 'default',
+        },
+    },
+    'rebuild_cities_popularity_ranking': {
+        'task': 'realty.tasks.rebuild_cities_popularity_ranking',
+        'schedule': crontab(hour=3, minute=30),  # every day at 3:30 a.m.
+        'options': {
+            'queue': 'default',
+        },
+    },
+    'rollup_realty_unique_visitors_stats': {
+        'task': 'realty.tasks.rollup_realty_unique_visitors_stats',
+        'schedule': crontab(hour=0, minute=15),  # every day at 0:15 a.m. (previous day stats)
+        'options': {
+            'queue': 'default',
+        },
+    },
     'email_subscribers_about_latest_realty': {
         'task': 'subscribers.tasks.email_subscribers_about_latest_realty',
         'schedule': crontab(day_of_week=5, hour=18, minute=0),  # every Friday at 6:00 p.m.
@@ -69,6 +69,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -82,6 +83,7 @@ MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 
     'main.middleware.MobileUserAgentMiddleware',
+    'main.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'airbnb.urls'
@@ -254,6 +256,30 @@ REDIS_PORT = os.environ.get('REDIS_PORT', '6379')
 REDIS_DB = os.environ.get('REDIS_MAIN_DB', 1)
 REDIS_DECODE_RESPONSES = os.environ.get('REDIS_DECODE_RESPONSES', True)
 
+# Realty type/amenities filtering by Redis bitmaps (rebuild them with `manage.py rebuildrealtybitmaps` first)
+REALTY_BITMAP_INDEX_ENABLED = bool(os.environ.get('REALTY_BITMAP_INDEX_ENABLED', False))
+
+# Realty visits are buffered in every web worker and flushed to Redis in batches (instead of a round trip per visit);
+# the displayed visits count includes visits flushed to Redis as of the last worker flush and visits buffered by it
+REALTY_VISITS_BUFFER_ENABLED = bool(os.environ.get('REALTY_VISITS_BUFFER_ENABLED', False))
+
+# Amenities are cached by every process and invalidated through Redis pub/sub on amenity changes
+AMENITY_CATALOGUE_CACHE_ENABLED = bool(os.environ.get('AMENITY_CATALOGUE_CACHE_ENABLED', False))
+
+# DB queries and Redis commands count of every request in the `X-Request-*` response headers
+REQUEST_STATS_ENABLED = bool(os.environ.get('REQUEST_STATS_ENABLED', False))
+
+# Full-page cache of anonymous (cookie-less) requests (see `AnonymousPageCacheMiddleware`)
+PAGE_CACHE_ENABLED = bool(os.environ.get('PAGE_CACHE_ENABLED', False))
+
+# Cached pages by URL names: TTL (in seconds) and purge tags (formatted with URL kwargs)
+PAGE_CACHE_URLS = {
+    'home_page': {'ttl': 60, 'tags': ['realty', 'realty-list']},
+    'realty:all': {'ttl': 60, 'tags': ['realty', 'realty-list']},
+    'realty:all_by_city': {'ttl': 60, 'tags': ['realty', 'realty-list']},
+    'realty:detail': {'ttl': 30, 'tags': ['realty', 'realty:{pk}']},
+}
+
 
 # CACHES
 REDIS_CACHE_DB = os.environ.get('REDIS_CACHE_DB', 2)
@@ -73,5 +73,13 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'realty': {
+            'handlers': [
+                'file_info',
+                'file_error',
+            ],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
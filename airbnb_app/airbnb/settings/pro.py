@@ -43,6 +43,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
     'main.middleware.MobileUserAgentMiddleware',
+    'main.middleware.AnonymousPageCacheMiddleware',
 ]
 
 
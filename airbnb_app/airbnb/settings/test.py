@@ -5,6 +5,8 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*']
 
+REQUEST_STATS_ENABLED = True
+
 # DATABASE
 DATABASES = {
     'default': {
@@ -17,6 +19,13 @@ DATABASES = {
     },
 }
 
+# CACHES
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 # MEDIA
 YANDEX_STORAGE_CUSTOM_DOMAIN = None
 MEDIA_URL = os.environ.get('MEDIA_URL', '/media/')
@@ -9,3 +9,14 @@ VERIFICATION_CODE_STATUS_DELIVERED = "delivered"
 
 # Indicates Twilio status codes (if message hasn't been sent)
 TWILIO_MESSAGE_STATUS_CODES_FAILED = ("undelivered", "failed")
+
+# Indicates how long (in seconds) a page is served from the page cache after its TTL while it's being regenerated
+PAGE_CACHE_STALE_TTL = 5 * 60
+
+# Indicates how long (in seconds) a page regeneration is locked for a single worker
+PAGE_CACHE_LOCK_TTL = 30
+
+# Indicates query parameters that don't change a page (they are ignored by the page cache)
+PAGE_CACHE_IGNORED_QUERY_PARAMS = frozenset((
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'fbclid', 'gclid',
+))
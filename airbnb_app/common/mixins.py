@@ -1,6 +1,11 @@
-from typing import List, Tuple, Union
+import hashlib
+from typing import List, Optional, Tuple, Union
 
-from django.http import HttpRequest, HttpResponseRedirect
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .types import ResponseValidators
 
 
 class SessionDataRequiredMixin:
@@ -16,3 +21,54 @@ class SessionDataRequiredMixin:
         ):
             return HttpResponseRedirect(self.redirect_url)
         return super(SessionDataRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """Answer conditional GET requests with `304 Not Modified` before the response is rendered (or serialized).
+
+    `get_validators()` should return ETag (any string, it's hashed) and Last-Modified of the response,
+    that are cheaper to get than the response itself (None if they are unknown, e.g. the object doesn't exist).
+    """
+
+    # set for responses, that aren't byte-for-byte equal (e.g. pages with a CSRF token)
+    weak_etag: bool = False
+
+    _validators: Optional[ResponseValidators] = None
+
+    def get_validators(self) -> Optional[ResponseValidators]:
+        return None
+
+    def get_not_modified_response(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """Return `304 Not Modified` response if the client's copy is fresh, otherwise None."""
+        self._validators = self.get_validators()
+        if self._validators is None:
+            return None
+        response = get_conditional_response(
+            request,
+            etag=self._get_etag(),
+            last_modified=self._get_last_modified_timestamp(),
+        )
+        return self.set_validators(response) if response is not None else None
+
+    def set_validators(self, response: HttpResponse) -> HttpResponse:
+        """Set `ETag` and `Last-Modified` headers of a successful response."""
+        if self._validators is None or response.status_code not in (200, 304):
+            return response
+        response['ETag'] = self._get_etag()
+        if (last_modified := self._get_last_modified_timestamp()) is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        if (not_modified_response := self.get_not_modified_response(request)) is not None:
+            return not_modified_response
+        return self.set_validators(super(ConditionalGetMixin, self).get(request, *args, **kwargs))
+
+    def _get_etag(self) -> str:
+        etag = quote_etag(hashlib.md5(self._validators['etag'].encode()).hexdigest())
+        return f"W/{etag}" if self.weak_etag else etag
+
+    def _get_last_modified_timestamp(self) -> Optional[int]:
+        if self._validators['last_modified'] is None:
+            return None
+        return int(self._validators['last_modified'].timestamp())
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.http import urlencode
+
+from .constants import PAGE_CACHE_IGNORED_QUERY_PARAMS, PAGE_CACHE_LOCK_TTL, PAGE_CACHE_STALE_TTL
+
+
+# sent when a page is served from the page cache, so its view isn't called (args: `request`, `resolver_match`)
+page_served_from_cache = Signal()
+
+# CSRF tokens of cached pages are replaced with a fresh token of every request
+CSRF_TOKEN_PLACEHOLDER = b'__page_cache_csrf_token__'
+CSRF_TOKEN_INPUT_REGEX = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+# response headers that aren't cached (cookies are never cached, length changes with the CSRF token)
+PAGE_CACHE_SKIPPED_HEADERS = frozenset(('set-cookie', 'content-length'))
+
+
+class CachedPage(TypedDict):
+    content: bytes
+    status: int
+    headers: List[Tuple[str, str]]
+    created: float
+    tags: Dict[str, str]
+
+
+def get_page_cache_tag_key(tag: str) -> str:
+    return f"page_cache:tag:{tag}"
+
+
+def get_page_cache_tag_versions(tags: Iterable[str]) -> Dict[str, str]:
+    """Return current versions of the page cache `tags` (a tag version changes on every purge)."""
+    tag_keys = {tag: get_page_cache_tag_key(tag) for tag in tags}
+    versions = cache.get_many(list(tag_keys.values()))
+    return {tag: versions.get(tag_key, '') for tag, tag_key in tag_keys.items()}
+
+
+def purge_page_cache_tags(tags: Iterable[str]) -> None:
+    """Mark cached pages with any of the `tags` as stale.
+
+    Stale pages are regenerated by the next request (and served to concurrent requests in the meantime).
+    """
+    tag_keys = [get_page_cache_tag_key(tag) for tag in tags]
+    if tag_keys:
+        cache.set_many({tag_key: uuid.uuid4().hex for tag_key in tag_keys}, timeout=None)
+
+
+def normalize_query_string(request: HttpRequest) -> str:
+    """Return the request query string with sorted parameters and without blank and tracking parameters."""
+    params = sorted(
+        (name, value)
+        for name, values in request.GET.lists() if name not in PAGE_CACHE_IGNORED_QUERY_PARAMS
+        for value in values if value != ''
+    )
+    return urlencode(params)
+
+
+def get_page_cache_key(request: HttpRequest, url_name: str) -> str:
+    device = 'mobile' if getattr(request, 'is_mobile_agent', False) else 'desktop'
+    fingerprint = '|'.join((request.get_host(), request.path, url_name, normalize_query_string(request), device))
+    return f"page_cache:page:{hashlib.md5(fingerprint.encode()).hexdigest()}"
+
+
+def is_request_cacheable(request: HttpRequest) -> bool:
+    """Only anonymous requests without cookies (i.e. without session) are served from the page cache.
+
+    The CSRF cookie is allowed, since CSRF tokens of cached pages are replaced by the request token.
+    """
+    return request.method in ('GET', 'HEAD') and set(request.COOKIES) <= {settings.CSRF_COOKIE_NAME}
+
+
+def is_response_cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    cache_control = response.get('Cache-Control', '')
+    if 'private' in cache_control or 'no-store' in cache_control:
+        return False
+    # the session is saved (and its cookie is set) later, by the session middleware
+    session = getattr(request, 'session', None)
+    return session is None or (not session.modified and session.is_empty())
+
+
+def get_cached_page(key: str) -> Optional[CachedPage]:
+    return cache.get(key)
+
+
+def is_cached_page_fresh(page: CachedPage, ttl: int) -> bool:
+    """Check whether the cached `page` is younger than `ttl` and none of its tags has been purged."""
+    if time.time() - page['created'] >= ttl:
+        return False
+    return get_page_cache_tag_versions(page['tags']) == page['tags']
+
+
+def cache_page(key: str, response: HttpResponse, *, ttl: int, tag_versions: Dict[str, str]) -> None:
+    """Cache the `response` for `ttl` seconds (+ `PAGE_CACHE_STALE_TTL`, while it's served stale).
+
+    `tag_versions` should be taken before the response is rendered, so purges made during rendering aren't lost.
+    """
+    page = CachedPage(
+        content=CSRF_TOKEN_INPUT_REGEX.sub(rb'\g<1>' + CSRF_TOKEN_PLACEHOLDER + rb'\g<2>', response.content),
+        status=response.status_code,
+        headers=[
+            (header, value) for header, value in response.items()
+            if header.lower() not in PAGE_CACHE_SKIPPED_HEADERS
+        ],
+        created=time.time(),
+        tags=tag_versions,
+    )
+    cache.set(key, page, ttl + PAGE_CACHE_STALE_TTL)
+
+
+def build_cached_page_response(request: HttpRequest, page: CachedPage) -> HttpResponse:
+    content = page['content']
+    if CSRF_TOKEN_PLACEHOLDER in content:
+        content = content.replace(CSRF_TOKEN_PLACEHOLDER, get_token(request).encode())
+
+    response = HttpResponse(content, status=page['status'])
+    for header, value in page['headers']:
+        response[header] = value
+    return response
+
+
+def acquire_page_regeneration_lock(key: str) -> bool:
+    """Lock the page regeneration, so a stale page is regenerated by a single worker."""
+    return cache.add(f"{key}:lock", time.time(), PAGE_CACHE_LOCK_TTL)
+
+
+def release_page_regeneration_lock(key: str) -> None:
+    cache.delete(f"{key}:lock")
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, List, Optional, Tuple, Union
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class InvalidCursorError(Exception):
+    """Cursor can't be decoded or doesn't match the paginator ordering."""
+
+
+class KeysetPage(Sequence):
+    """A single page of objects returned by the KeysetPaginator."""
+
+    def __init__(
+            self,
+            object_list: List[Union[Model, dict]],
+            paginator: 'KeysetPaginator',
+            *,
+            has_next: bool,
+            has_previous: bool,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<KeysetPage ({len(self)} objects)>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], reverse=False)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], reverse=True)
+
+
+class KeysetPaginator:
+    """Keyset (seek) paginator.
+
+    Pages are fetched with `WHERE (key_1, key_2, ...) < (last_1, last_2, ...) LIMIT per_page`,
+    instead of OFFSET, so every page costs O(`per_page`) no matter how deep it is.
+    Neighbour pages are addressed by opaque cursors (see `encode_cursor()`).
+
+    All `ordering` fields should have the same direction and the last one should be unique (e.g. `id`).
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list: QuerySet, per_page: int, ordering: Tuple[str, ...] = ('-created', '-id')):
+        if len({field.startswith('-') for field in ordering}) != 1:
+            raise ValueError("All `ordering` fields should have the same direction")
+
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.is_descending = ordering[0].startswith('-')
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+
+    @cached_property
+    def count(self) -> int:
+        """Total count of objects (note: it isn't used for pagination itself and runs a separate COUNT query)."""
+        return self.object_list.count()
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """Return a page that starts right after (or before, if it is a 'previous' cursor) the `cursor` position."""
+        if not cursor:
+            object_list = list(self.object_list.order_by(*self.ordering)[:self.per_page + 1])
+            has_next = len(object_list) > self.per_page
+            return KeysetPage(object_list[:self.per_page], self, has_next=has_next, has_previous=False)
+
+        values, reverse = self.decode_cursor(cursor)
+        # reversed cursor (previous page) seeks in the opposite direction
+        lookup = 'gt' if self.is_descending == reverse else 'lt'
+        ordering = self._get_reversed_ordering() if reverse else self.ordering
+
+        queryset = self.object_list.filter(
+            # bounds the index range scan, the rest of the keyset condition is checked inside that range
+            **{f"{self.fields[0]}__{lookup}e": values[0]},
+        ).filter(
+            self._get_keyset_condition(values, lookup),
+        ).order_by(*ordering)
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if reverse:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_next=True, has_previous=has_more)
+        return KeysetPage(object_list, self, has_next=has_more, has_previous=True)
+
+    def encode_cursor(self, obj: Union[Model, dict], *, reverse: bool) -> str:
+        """Encode position of the `obj` (a model instance or a `.values()` row)."""
+        values = [
+            self._serialize_value(obj[field] if isinstance(obj, dict) else getattr(obj, field))
+            for field in self.fields
+        ]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> Tuple[List[Any], bool]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            raw_values, reverse = payload['v'], bool(payload['r'])
+            if len(raw_values) != len(self.fields):
+                raise InvalidCursorError("Cursor doesn't match the paginator ordering")
+            values = [
+                self.object_list.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, raw_values)
+            ]
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError, ValidationError) as error:
+            raise InvalidCursorError("Invalid cursor") from error
+        return values, reverse
+
+    def _get_keyset_condition(self, values: List[Any], lookup: str) -> Q:
+        """Build `(f1, f2, ...) <lookup> (v1, v2, ...)` row comparison."""
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            equal_fields = dict(zip(self.fields[:index], values[:index]))
+            condition |= Q(**equal_fields, **{f"{field}__{lookup}": values[index]})
+        return condition
+
+    def _get_reversed_ordering(self) -> Tuple[str, ...]:
+        return tuple(field.lstrip('-') if self.is_descending else f"-{field}" for field in self.ordering)
+
+    @staticmethod
+    def _serialize_value(value: Any) -> Any:
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+class KeysetPaginationMixin:
+    """Paginate ListView's queryset with the KeysetPaginator.
+
+    The current position is taken from the `cursor` query parameter.
+    """
+
+    keyset_ordering: Tuple[str, ...] = ('-created', '-id')
+    cursor_query_param: str = 'cursor'
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return KeysetPaginator(queryset, per_page, ordering=self.keyset_ordering)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator: KeysetPaginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursorError as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import contextvars
+import dataclasses
+import functools
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from redis.client import Pipeline, Redis
+
+from django.db import connection
+
+
+@dataclasses.dataclass
+class RequestStats:
+    """Number of DB queries and Redis operations made while handling a request."""
+
+    db_queries: int = 0
+    redis_round_trips: int = 0
+    redis_commands: int = 0
+
+
+_current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    'current_request_stats', default=None,
+)
+_is_redis_instrumented = False
+
+
+def instrument_redis_client() -> None:
+    """Count Redis commands and round trips (single commands and pipelines) of the current `RequestStats`.
+
+    Commands are counted only inside `collect_request_stats()`.
+    """
+    global _is_redis_instrumented
+    if _is_redis_instrumented:
+        return
+
+    redis_execute_command = Redis.execute_command
+    pipeline_execute = Pipeline.execute
+
+    @functools.wraps(redis_execute_command)
+    def execute_command(self, *args, **options):
+        stats = _current_request_stats.get()
+        if stats is not None:
+            stats.redis_round_trips += 1
+            stats.redis_commands += 1
+        return redis_execute_command(self, *args, **options)
+
+    @functools.wraps(pipeline_execute)
+    def execute(self, *args, **kwargs):
+        stats = _current_request_stats.get()
+        if stats is not None and self.command_stack:
+            stats.redis_round_trips += 1
+            stats.redis_commands += len(self.command_stack)
+        return pipeline_execute(self, *args, **kwargs)
+
+    # `Pipeline.execute_command()` only buffers commands, so pipelined commands are counted once, on `execute()`
+    Redis.execute_command = execute_command
+    Pipeline.execute = execute
+    _is_redis_instrumented = True
+
+
+@contextmanager
+def collect_request_stats() -> Iterator[RequestStats]:
+    """Count DB queries and Redis operations made inside the block."""
+    stats = RequestStats()
+
+    def count_query(execute, sql, params, many, context):
+        stats.db_queries += 1
+        return execute(sql, params, many, context)
+
+    token = _current_request_stats.set(stats)
+    try:
+        with connection.execute_wrapper(count_query):
+            yield stats
+    finally:
+        _current_request_stats.reset(token)
@@ -1,4 +1,5 @@
-from typing import Type, TypeVar
+import datetime
+from typing import Optional, Type, TypedDict, TypeVar
 
 from django.db.models import Model
 from django.forms import BaseForm
@@ -16,3 +17,8 @@ AbstractModel = TypeVar('AbstractModel', bound=Type[Model])
 
 class AuthenticatedHttpRequest(HttpRequest):
     user: CustomUser
+
+
+class ResponseValidators(TypedDict):
+    etag: str
+    last_modified: Optional[datetime.datetime]
@@ -11,6 +11,13 @@ redis_instance = redis.Redis(
     charset=settings.DEFAULT_CHARSET,
     decode_responses=settings.REDIS_DECODE_RESPONSES,
 )
+# client for binary values (e.g. bitmaps), its responses are never decoded
+redis_binary_instance = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    decode_responses=False,
+)
 if not settings.DEBUG:
     sentinel = Sentinel(
         sentinels=settings.REDIS_CLUSTER_SENTINELS,
@@ -23,3 +30,8 @@ if not settings.DEBUG:
         password=settings.REDIS_CLUSTER_PASSWORD,
         decode_responses=settings.REDIS_DECODE_RESPONSES,
     )
+    redis_binary_instance: redis.Redis = sentinel.master_for(
+        service_name=settings.REDIS_CLUSTER_NAME,
+        password=settings.REDIS_CLUSTER_PASSWORD,
+        decode_responses=False,
+    )
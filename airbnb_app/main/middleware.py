@@ -1,6 +1,16 @@
 import re
 
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, ResolverMatch, resolve
+
+from common.page_cache import (
+    CachedPage, acquire_page_regeneration_lock, build_cached_page_response, cache_page, get_cached_page,
+    get_page_cache_key, get_page_cache_tag_versions, is_cached_page_fresh, is_request_cacheable, is_response_cacheable,
+    page_served_from_cache, release_page_regeneration_lock,
+)
+from common.request_stats import collect_request_stats, instrument_redis_client
 
 
 class MobileUserAgentMiddleware:
@@ -18,3 +28,86 @@ class MobileUserAgentMiddleware:
 
         response: HttpResponse = self._get_response(request)
         return response
+
+
+class RequestStatsMiddleware:
+    """Middleware for exposing the number of DB queries and Redis commands made by the request.
+
+    Enabled by the `REQUEST_STATS_ENABLED` setting.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_STATS_ENABLED', False):
+            raise MiddlewareNotUsed
+        instrument_redis_client()
+        self._get_response = get_response
+
+    def __call__(self, request: HttpRequest, *args, **kwargs):
+        with collect_request_stats() as stats:
+            response: HttpResponse = self._get_response(request)
+
+        response['X-Request-DB-Queries'] = stats.db_queries
+        response['X-Request-Redis-Round-Trips'] = stats.redis_round_trips
+        response['X-Request-Redis-Commands'] = stats.redis_commands
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """Middleware for caching whole pages of anonymous (cookie-less) requests.
+
+    Cached pages are configured by URL names in the `PAGE_CACHE_URLS` setting: a TTL (in seconds) and tags,
+    that purge the page (formatted with URL kwargs, e.g. `realty:{pk}`). Expired and purged pages are
+    regenerated by a single worker (behind a lock), while other workers serve the stale page.
+    Enabled by the `PAGE_CACHE_ENABLED` setting.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', False):
+            raise MiddlewareNotUsed
+        self._get_response = get_response
+        self._cached_urls = settings.PAGE_CACHE_URLS
+
+    def __call__(self, request: HttpRequest, *args, **kwargs):
+        if not is_request_cacheable(request):
+            return self._get_response(request)
+
+        try:
+            resolver_match = resolve(request.path_info)
+        except Resolver404:
+            return self._get_response(request)
+        if (page_cache_options := self._cached_urls.get(resolver_match.view_name)) is None:
+            return self._get_response(request)
+
+        ttl = page_cache_options['ttl']
+        key = get_page_cache_key(request, resolver_match.view_name)
+        page = get_cached_page(key)
+        if page is not None and is_cached_page_fresh(page, ttl):
+            return self._serve_cached_page(request, page, resolver_match, 'HIT')
+
+        if not acquire_page_regeneration_lock(key):
+            if page is not None:
+                return self._serve_cached_page(request, page, resolver_match, 'STALE')
+            return self._get_response(request)
+
+        try:
+            tags = [tag.format(**resolver_match.kwargs) for tag in page_cache_options.get('tags', ())]
+            tag_versions = get_page_cache_tag_versions(tags)
+            response: HttpResponse = self._get_response(request)
+            if is_response_cacheable(request, response):
+                cache_page(key, response, ttl=ttl, tag_versions=tag_versions)
+                response['X-Page-Cache'] = 'MISS'
+        finally:
+            release_page_regeneration_lock(key)
+        return response
+
+    def _serve_cached_page(
+            self,
+            request: HttpRequest,
+            page: CachedPage,
+            resolver_match: ResolverMatch,
+            status: str,
+    ) -> HttpResponse:
+        response = build_cached_page_response(request, page)
+        response['X-Page-Cache'] = status
+        page_served_from_cache.send(sender=self.__class__, request=request, resolver_match=resolver_match)
+        return response
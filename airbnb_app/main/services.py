@@ -1,7 +1,10 @@
+from typing import List
+
 from django.conf import settings
 from django.db.models import QuerySet
 
 from realty.models import Realty
+from realty.services.cities import get_most_popular_cities
 
 from .constants import TARGET_IMAGE_SIZE_SEPARATOR
 
@@ -10,6 +13,14 @@ def get_all_realty_cities() -> QuerySet[str]:
     return Realty.available.order_by().values_list('location__city', flat=True).distinct()
 
 
+def get_popular_cities(cities_count: int) -> List[str]:
+    """Return the most popular cities from the Redis ranking.
+
+    Falls back to (any) cities from DB until the ranking is built.
+    """
+    return get_most_popular_cities(cities_count) or list(get_all_realty_cities()[:cities_count])
+
+
 def get_target_image_url_with_size(*, image_url: str, target_size: str) -> str:
     """Build url with specific size.
 
@@ -193,3 +193,51 @@ function webSocketChatBot() {
 if (!isMobileAgent) {
     webSocketChatBot();
 }
+
+
+// Search autocomplete
+const searchField = $('.search-field');
+const searchSuggestions = $('#search-suggestions');
+let autocompleteTimeout = null;
+
+searchField.on('input', function () {
+    const query = $(this).val().trim();
+    clearTimeout(autocompleteTimeout);
+    if (query.length < 2) {
+        searchSuggestions.empty();
+        return;
+    }
+    autocompleteTimeout = setTimeout(function () {
+        $.getJSON(searchField.data('autocomplete-url'), {q: query}, function (data) {
+            searchSuggestions.empty();
+            data.cities.concat(data.realty).forEach(
+                suggestion => searchSuggestions.append($('<option>').attr('value', suggestion.name))
+            );
+        });
+    }, 150);
+});
+
+
+// Realty filters' facet counts
+const filterRow = $('.filter-row[data-facets-url]');
+
+function showFacetCount($checkbox, count) {
+    const $label = $checkbox.closest('label');
+    $label.find('.facet-count').remove();
+    $label.append($('<span class="facet-count">').text(` (${count || 0})`));
+}
+
+if (filterRow.length) {
+    const facetsParams = new URLSearchParams(window.location.search);
+    if (filterRow.data('facets-city-slug')) {
+        facetsParams.set('city_slug', filterRow.data('facets-city-slug'));
+    }
+    $.getJSON(`${filterRow.data('facets-url')}?${facetsParams.toString()}`, function (facets) {
+        $('input[name="realty_type"]').each(function () {
+            showFacetCount($(this), facets.realty_type[$(this).val()]);
+        });
+        $('input[name="amenities"]').each(function () {
+            showFacetCount($(this), facets.amenities[$(this).val()]);
+        });
+    });
+}
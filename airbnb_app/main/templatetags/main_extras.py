@@ -1,6 +1,8 @@
 from django import template
 from django.conf import settings
 
+from realty.services.images import get_realty_image_url
+
 from ..services import get_target_image_url_with_size
 
 
@@ -12,6 +14,7 @@ def url_replace(context, **kwargs) -> str:
     """Update url with optional query parameters."""
     query_params = context['request'].GET.copy()
     query_params.pop('page', None)
+    query_params.pop('cursor', None)
     query_params.update(kwargs)
     return query_params.urlencode()
 
@@ -26,3 +29,9 @@ def has_group(user: settings.AUTH_USER_MODEL, group_name: str) -> bool:
 def image_size(image_url: str, target_size: str) -> str:
     """Return image url with specified size - `target_size`."""
     return get_target_image_url_with_size(image_url=image_url, target_size=target_size)
+
+
+@register.filter(name='realty_image_url')
+def realty_image_url(image_path: str) -> str:
+    """Return url of the realty image stored at `image_path`."""
+    return get_realty_image_url(image_path)
@@ -0,0 +1,119 @@
+from unittest import mock
+
+import fakeredis
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from addresses.models import Address
+from common.page_cache import CSRF_TOKEN_PLACEHOLDER, purge_page_cache_tags
+from hosts.models import RealtyHost
+from realty.models import Realty
+from realty.services.realty import get_cached_realty_visits_count_by_realty_id
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheMiddlewareTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        cache.clear()
+        host = RealtyHost.objects.create(
+            user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+        )
+        self.realty = Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+            host=host,
+        )
+        self.list_url = reverse('realty:all')
+
+    def test_page_served_from_cache(self):
+        """A page of the anonymous request is rendered once and then served from the cache."""
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.list_url)
+        self.assertEqual(cached_response['X-Page-Cache'], 'HIT')
+        self.assertContains(cached_response, self.realty.name)
+
+    def test_request_with_cookies_not_cached(self):
+        """Requests with cookies (e.g. a session) bypass the page cache."""
+        self.client.cookies['sessionid'] = 'session-key'
+
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_query_string_normalized(self):
+        """Order of query parameters, blank and tracking parameters don't change the cached page."""
+        self.client.get(f"{self.list_url}?beds_count=1&guests_count=2")
+
+        response = self.client.get(f"{self.list_url}?guests_count=2&utm_source=email&beds_count=1&amenities=")
+
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+
+    def test_purged_page_regenerated(self):
+        """A page purged by its tag is regenerated by the next request."""
+        self.client.get(self.list_url)
+
+        purge_page_cache_tags(['realty-list'])
+
+        self.assertEqual(self.client.get(self.list_url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.list_url)['X-Page-Cache'], 'HIT')
+
+    def test_stale_page_served_while_regenerated(self):
+        """A stale page is served while another worker regenerates it."""
+        self.client.get(self.list_url)
+        purge_page_cache_tags(['realty-list'])
+
+        with mock.patch('main.middleware.acquire_page_regeneration_lock', return_value=False):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response['X-Page-Cache'], 'STALE')
+        self.assertContains(response, self.realty.name)
+
+    def test_realty_change_purges_pages(self):
+        """Realty change purges cached lists and the realty detail page."""
+        self.client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.realty.name = 'New name'
+            self.realty.save()
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'New name')
+
+    def test_csrf_token_not_cached(self):
+        """Cached pages get the CSRF token of the request instead of the token of the cached response."""
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertNotIn(CSRF_TOKEN_PLACEHOLDER, response.content)
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_cached_detail_page_visit_counted(self):
+        """Visits of detail pages served from the cache are counted."""
+        detail_url = self.realty.get_absolute_url()
+        visits_count = get_cached_realty_visits_count_by_realty_id(self.realty.id)
+
+        self.assertEqual(self.client.get(detail_url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(detail_url)['X-Page-Cache'], 'HIT')
+
+        self.assertEqual(get_cached_realty_visits_count_by_realty_id(self.realty.id), visits_count + 2)
@@ -1,7 +1,16 @@
+from unittest import mock
+
+import fakeredis
+
 from django.conf import settings
-from django.test import SimpleTestCase, override_settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.models import CustomUser
+from addresses.models import Address
+from hosts.models import RealtyHost
+from realty.models import Realty
 
-from ..services import get_target_image_url_with_size
+from ..services import get_popular_cities, get_target_image_url_with_size
 
 
 class MainServicesSimpleTests(SimpleTestCase):
@@ -51,3 +60,41 @@ class MainServicesSimpleTests(SimpleTestCase):
 
         result = get_target_image_url_with_size(image_url=image_url, target_size=target_size)
         self.assertEqual(result, image_url)
+
+
+class MainServicesTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+            host=RealtyHost.objects.create(user=test_user),
+        )
+
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_get_popular_cities_from_ranking(self):
+        """get_popular_cities() returns cities from the Redis ranking without DB queries."""
+        fakeredis.FakeStrictRedis(server=self.redis_server).zincrby('realty:cities:popularity', 1, 'Rome')
+
+        with self.assertNumQueries(0):
+            self.assertListEqual(get_popular_cities(6), ['Rome'])
+
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_get_popular_cities_fallback(self):
+        """get_popular_cities() returns cities from DB if the ranking is empty."""
+        self.assertListEqual(get_popular_cities(6), ['Moscow'])
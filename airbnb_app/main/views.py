@@ -1,9 +1,10 @@
-from django.db.models import QuerySet
+from typing import List
+
 from django.shortcuts import render
 from django.views import generic
 
 from .constants import DISPLAYED_CITIES_COUNT
-from .services import get_all_realty_cities
+from .services import get_popular_cities
 
 
 class HomePageView(generic.TemplateView):
@@ -14,8 +15,7 @@ class HomePageView(generic.TemplateView):
     def get_context_data(self, **kwargs):
         context = super(HomePageView, self).get_context_data(**kwargs)
 
-        # TODO: get most popular cities (by views + booking count, - Redis, sorted set (another milestone)
-        context['popular_cities']: QuerySet = get_all_realty_cities()[:DISPLAYED_CITIES_COUNT]
+        context['popular_cities']: List[str] = get_popular_cities(DISPLAYED_CITIES_COUNT)
         context['meta_description'] = (
             "Find vacation rentals, cabins, beach houses, "
             "unique homes and experiences around the world - "
@@ -2,18 +2,28 @@ from django.contrib import admin
 from django.db.models.query import QuerySet
 from django.http import HttpRequest
 
-from .models import Amenity, Realty, RealtyImage
+from .models import Amenity, Realty, RealtyDailyStats, RealtyImage
+from .services.bulk import bulk_update_realty
+
+
+def set_realty_availability(queryset: QuerySet[Realty], is_available: bool) -> None:
+    # `QuerySet.update()` doesn't send `post_save`, so realty is updated by the bulk service
+    # (its `realty_bulk_updated` signal invalidates the catalogue, bitmaps, cards and cached pages)
+    bulk_update_realty(
+        [{'id': realty_id, 'is_available': is_available} for realty_id in queryset.values_list('id', flat=True)],
+        queryset,
+    )
 
 
 def make_realty_available(modeladmin: "RealtyAdmin", request: HttpRequest, queryset: QuerySet[Realty]) -> None:
-    queryset.update(is_available=True)
+    set_realty_availability(queryset, is_available=True)
 
 
 make_realty_available.short_description = "Make selected realty available"
 
 
 def make_realty_unavailable(modeladmin: "RealtyAdmin", request: HttpRequest, queryset: QuerySet[Realty]) -> None:
-    queryset.update(is_available=False)
+    set_realty_availability(queryset, is_available=False)
 
 
 make_realty_unavailable.short_description = "Make selected realty unavailable"
@@ -60,3 +70,10 @@ class RealtyImageAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'realty')
     search_fields = ('realty__name',)
     list_filter = ('realty',)
+
+
+@admin.register(RealtyDailyStats)
+class RealtyDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'realty', 'date', 'unique_visitors', 'week_unique_visitors', 'month_unique_visitors')
+    search_fields = ('realty__name',)
+    list_filter = ('date',)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Optional
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+
+
+# realty relations, that are rendered as nested objects if they are expanded (otherwise by ids)
+REALTY_EXPANDABLE_FIELDS = ('location', 'host', 'amenities')
+
+
+@dataclass(frozen=True)
+class RealtyFieldset:
+    """Requested shape of the realty representation: its fields and expanded relations."""
+
+    fields: FrozenSet[str]
+    expand: FrozenSet[str]
+
+
+def parse_fields_param(value: str) -> FrozenSet[str]:
+    return frozenset(field for field in map(str.strip, value.split(',')) if field)
+
+
+def get_realty_fieldset(
+        request: Request,
+        *,
+        available_fields: Iterable[str],
+        default_fields: Optional[Iterable[str]] = None,
+        fields_param: str = 'fields',
+        expand_param: str = 'expand',
+) -> RealtyFieldset:
+    """Return realty fields and expanded relations requested by `fields` and `expand` query parameters.
+
+    Without `fields`, `default_fields` (or all `available_fields`) are returned. Without `expand`, all requested
+    relations are expanded. Expanded relations are always returned, even if they aren't in `fields`.
+
+    Raises:
+        ValidationError: if unknown fields are requested
+    """
+    available_fields = frozenset(available_fields)
+    errors = {}
+
+    fields = parse_fields_param(request.query_params.get(fields_param, ''))
+    if fields_param not in request.query_params:
+        fields = available_fields if default_fields is None else frozenset(default_fields)
+    elif unknown_fields := fields.difference(available_fields):
+        errors[fields_param] = [f"Unknown fields: {', '.join(sorted(unknown_fields))}."]
+
+    if expand_param not in request.query_params:
+        expand = fields.intersection(REALTY_EXPANDABLE_FIELDS)
+    else:
+        expand = parse_fields_param(request.query_params[expand_param])
+        expandable_fields = available_fields.intersection(REALTY_EXPANDABLE_FIELDS)
+        if unknown_fields := expand.difference(expandable_fields):
+            errors[expand_param] = [f"Relations can't be expanded: {', '.join(sorted(unknown_fields))}."]
+
+    if errors:
+        raise ValidationError(errors)
+    return RealtyFieldset(fields=fields.union(expand), expand=expand)
+
+
+class RealtyFieldsetMixin:
+    """Support sparse fieldsets (`fields` and `expand` query parameters) on realty API views.
+
+    The fieldset is passed to serializers by the `fieldset` context. Without both query parameters
+    (and for unsafe methods) there is no fieldset and the view returns its default representation.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    available_fields: Iterable[str] = ()
+    default_fields: Optional[Iterable[str]] = None
+
+    def get_fieldset(self) -> Optional[RealtyFieldset]:
+        query_params = self.request.query_params
+        if (
+                self.request.method not in SAFE_METHODS or
+                (self.fields_query_param not in query_params and self.expand_query_param not in query_params)
+        ):
+            return None
+        return get_realty_fieldset(
+            self.request,
+            available_fields=self.available_fields,
+            default_fields=self.default_fields,
+            fields_param=self.fields_query_param,
+            expand_param=self.expand_query_param,
+        )
+
+    def get_serializer_context(self):
+        context = super(RealtyFieldsetMixin, self).get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
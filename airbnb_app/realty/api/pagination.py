@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import List, Optional
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from common.pagination import InvalidCursorError, KeysetPage, KeysetPaginator
+
+
+class RealtyKeysetPagination(BasePagination):
+    """Keyset (cursor) pagination for realty, ordered by `(created, id)`.
+
+    Unlike `PageNumberPagination`, it doesn't run COUNT and OFFSET queries.
+    """
+
+    page_size: int = settings.REST_FRAMEWORK['PAGE_SIZE']
+    ordering = ('-created', '-id')
+    cursor_query_param = 'cursor'
+
+    page: Optional[KeysetPage] = None
+    request: Optional[Request] = None
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> List:
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.page_size, ordering=self.ordering)
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursorError as error:
+            raise NotFound(str(error))
+        return list(self.page)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self) -> Optional[str]:
+        return self._get_link(self.page.next_cursor)
+
+    def get_previous_link(self) -> Optional[str]:
+        return self._get_link(self.page.previous_cursor)
+
+    def _get_link(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class FlatRealtyKeysetPagination(RealtyKeysetPagination):
+    """Keyset (cursor) pagination for flat realty rows, ordered by `id`."""
+
+    ordering = ('id',)
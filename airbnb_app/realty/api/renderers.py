@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer for newline delimited JSON (exports are streamed by views, so it renders errors only)."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b''
+        objects = data if isinstance(data, list) else [data]
+        return ''.join(f"{json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False)}\n" for obj in objects).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    """Renderer for CSV (exports are streamed by views, so it renders errors only)."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if not data:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue().encode()
@@ -1,18 +1,24 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
 from rest_framework import serializers
 
+from django.db.models import FileField, QuerySet
 from django.shortcuts import get_object_or_404
 
 from accounts.models import CustomUser, Profile
 from addresses.models import Address
 from hosts.models import RealtyHost
 
-from ..models import Amenity, Realty
+from ..models import Amenity, Realty, RealtyView
+from ..services.amenities import get_amenity_catalogue
+from ..services.realty import get_realty_amenity_ids
+from .fieldsets import REALTY_EXPANDABLE_FIELDS, RealtyFieldset
 
 
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
         model = Address
-        fields = ['id', 'country', 'city', 'street']
+        fields = ['id', 'country', 'city', 'street', 'latitude', 'longitude']
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -65,6 +71,21 @@ class RealtySerializer(serializers.ModelSerializer):
             'location', 'host', 'amenities',
         ]
 
+    def __init__(self, *args, **kwargs):
+        super(RealtySerializer, self).__init__(*args, **kwargs)
+        # sparse fieldset: only requested fields are rendered, relations that aren't expanded are rendered by ids
+        fieldset: Optional[RealtyFieldset] = self.context.get('fieldset')
+        if fieldset is None:
+            return
+        for name, field in list(self.fields.items()):
+            if name not in fieldset.fields:
+                self.fields.pop(name)
+            elif name in REALTY_EXPANDABLE_FIELDS and name not in fieldset.expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    many=isinstance(field, serializers.ListSerializer),
+                )
+
     def create(self, validated_data: dict):
         location_data = validated_data.pop('location')
         amenities_data = validated_data.pop('amenities')
@@ -85,9 +106,144 @@ class RealtySerializer(serializers.ModelSerializer):
         return new_realty
 
 
+class RealtyAmenityNameSerializer(serializers.Serializer):
+    # amenities are resolved (or created) by names in bulk, so names aren't validated as unique
+    name = serializers.CharField(max_length=100)
+
+
+class RealtyBulkCreateSerializer(serializers.ModelSerializer):
+    """Serializer for validating realty items created in bulk (validation doesn't make DB queries)."""
+
+    location = AddressSerializer()
+    amenities = RealtyAmenityNameSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = Realty
+        fields = [
+            'name', 'description', 'is_available', 'realty_type', 'beds_count', 'max_guests_count', 'price_per_night',
+            'location', 'amenities',
+        ]
+
+
+class RealtyBulkUpdateSerializer(serializers.ModelSerializer):
+    """Serializer for validating realty items updated in bulk."""
+
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Realty
+        fields = ['id', 'is_available', 'price_per_night']
+        extra_kwargs = {
+            'is_available': {'required': False},
+            'price_per_night': {'required': False},
+        }
+
+    def validate(self, attrs: dict):
+        if attrs.keys() == {'id'}:
+            raise serializers.ValidationError('At least one field should be updated.')
+        return attrs
+
+
+class FastRealtySerializer:
+    """Read-only serializer, that builds the `RealtySerializer` representation from `.values()` rows.
+
+    DRF fields are introspected once per serializer (not for every object) and model instances aren't created:
+    realty with location, host, user and profile are fetched by a single `.values()` query (see `get_rows()`)
+    and amenities by another one (amenity names are taken from the amenity catalogue).
+    Sparse fieldsets (the `fieldset` context) are supported: only requested fields are fetched.
+    """
+
+    serializer_class = RealtySerializer
+
+    # layout entries: (name, kind, (values path, DRF field, model file field) | (id path, nested layout) | path | None)
+    VALUE, RELATED_ID, NESTED, AMENITIES, AMENITY_IDS = 'value', 'related_id', 'nested', 'amenities', 'amenity_ids'
+
+    def __init__(self, *, context: Optional[dict] = None):
+        self.context = context or {}
+        self._value_paths: List[str] = []
+        self._amenity_kinds: Set[str] = set()
+        self._layout = self._build_layout(self.serializer_class(context=self.context))
+
+    def get_rows(self, realty_qs: 'QuerySet[Realty]', *extra_paths: str) -> 'QuerySet[dict]':
+        """Return `.values()` rows of `realty_qs` (with `extra_paths`, e.g. the pagination ordering)."""
+        return realty_qs.values(*dict.fromkeys(['id', *self._value_paths, *extra_paths]))
+
+    def to_representation(self, rows: List[dict]) -> List[Dict[str, Any]]:
+        amenity_ids = get_realty_amenity_ids([row['id'] for row in rows]) if self._amenity_kinds else {}
+        amenity_names = get_amenity_catalogue().names_by_id if self.AMENITIES in self._amenity_kinds else {}
+        return [
+            self._represent(row, self._layout, amenity_ids=amenity_ids.get(row['id'], []), amenity_names=amenity_names)
+            for row in rows
+        ]
+
+    def _build_layout(self, serializer: serializers.Serializer, prefix: str = '') -> List[Tuple[str, str, Any]]:
+        layout = []
+        for name, field in serializer.fields.items():
+            path = f"{prefix}{field.source}"
+            if isinstance(field, serializers.ListSerializer):
+                layout.append((name, self.AMENITIES, None))
+                self._amenity_kinds.add(self.AMENITIES)
+            elif isinstance(field, serializers.ManyRelatedField):
+                layout.append((name, self.AMENITY_IDS, None))
+                self._amenity_kinds.add(self.AMENITY_IDS)
+            elif isinstance(field, serializers.BaseSerializer):
+                layout.append((name, self.NESTED, (f"{path}__id", self._build_layout(field, f"{path}__"))))
+            elif isinstance(field, serializers.RelatedField):
+                layout.append((name, self.RELATED_ID, path))
+                self._value_paths.append(path)
+            else:
+                model_field = serializer.Meta.model._meta.get_field(field.source)
+                file_field = model_field if isinstance(model_field, FileField) else None
+                layout.append((name, self.VALUE, (path, field, file_field)))
+                self._value_paths.append(path)
+        return layout
+
+    def _represent(
+            self,
+            row: dict,
+            layout: List[Tuple[str, str, Any]],
+            *,
+            amenity_ids: List[int],
+            amenity_names: Dict[int, str],
+    ) -> Dict[str, Any]:
+        representation = {}
+        for name, kind, spec in layout:
+            if kind == self.AMENITIES:
+                representation[name] = [
+                    {'id': amenity_id, 'name': amenity_names.get(amenity_id)} for amenity_id in amenity_ids
+                ]
+            elif kind == self.AMENITY_IDS:
+                representation[name] = amenity_ids
+            elif kind == self.NESTED:
+                id_path, nested_layout = spec
+                representation[name] = (
+                    None if row[id_path] is None else
+                    self._represent(row, nested_layout, amenity_ids=amenity_ids, amenity_names=amenity_names)
+                )
+            elif kind == self.RELATED_ID:
+                representation[name] = row[spec]
+            else:
+                path, field, file_field = spec
+                value = row[path]
+                if value is not None and file_field is not None:
+                    value = file_field.attr_class(None, file_field, value)
+                representation[name] = None if value is None else field.to_representation(value)
+        return representation
+
+
 class RealtyUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Realty
         fields = [
             'name', 'description', 'is_available', 'realty_type', 'beds_count', 'max_guests_count', 'price_per_night',
         ]
+
+
+class FlatRealtySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RealtyView
+        fields = [
+            'id', 'name', 'description', 'is_available', 'realty_type', 'beds_count', 'max_guests_count',
+            'price_per_night', 'country', 'city', 'street', 'email', 'first_name', 'last_name',
+        ]
+        read_only_fields = fields
@@ -8,4 +8,10 @@ app_name = 'realty'
 urlpatterns = [
     path('realty/', views.RealtyListApiView.as_view(), name='realty_list'),
     path('realty/<int:pk>/', views.RealtyDetailApiView.as_view(), name='realty_detail'),
+    path('realty/bulk/', views.RealtyBulkApiView.as_view(), name='realty_bulk'),
+    path('realty/export/', views.RealtyExportApiView.as_view(), name='realty_export'),
+    path('realty/flat/', views.FlatRealtyListApiView.as_view(), name='realty_flat_list'),
+    path('realty/autocomplete/', views.RealtyAutocompleteApiView.as_view(), name='realty_autocomplete'),
+    path('realty/facets/', views.RealtyFacetsApiView.as_view(), name='realty_facets'),
+    path('realty/trending/', views.RealtyTrendingApiView.as_view(), name='realty_trending'),
 ]
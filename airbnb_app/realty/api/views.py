@@ -1,22 +1,54 @@
+from collections import Counter
+from typing import List, Optional
+
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from django.http import StreamingHttpResponse
+
+from common.mixins import ConditionalGetMixin
 
-from ..filters import RealtyFilter
-from ..services.realty import get_all_available_realty
+from ..constants import (
+    REALTY_BULK_CREATE_MAX_COUNT, REALTY_BULK_UPDATE_MAX_COUNT, REALTY_TRENDING_COUNT, REALTY_TRENDING_MAX_COUNT,
+)
+from ..filters import FlatRealtyFilter, RealtyFilter
+from ..services.autocomplete import get_autocomplete_suggestions
+from ..services.bulk import RealtyNotFoundError, bulk_create_realty, bulk_update_realty
+from ..services.cache import get_realty_collection_validators, get_realty_validators
+from ..services.export import iter_realty_csv, iter_realty_ndjson
+from ..services.facets import get_cached_realty_facets
+from ..services.realty import (
+    get_all_available_realty, get_available_flat_realty, get_or_create_realty_host_by_user, get_realty_api_details,
+    get_realty_editable_by_user,
+)
+from ..services.trending import get_trending_realty
+from .fieldsets import RealtyFieldsetMixin
+from .pagination import FlatRealtyKeysetPagination, RealtyKeysetPagination
 from .permissions import IsAbleToAddRealty, IsRealtyOwnerOrReadOnly
-from .serializers import RealtySerializer, RealtyUpdateSerializer
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (
+    FastRealtySerializer, FlatRealtySerializer, RealtyBulkCreateSerializer, RealtyBulkUpdateSerializer,
+    RealtySerializer, RealtyUpdateSerializer,
+)
 
 
 # TODO: refactor API
 
 
-class RealtyListApiView(generics.ListCreateAPIView):
+class RealtyListApiView(RealtyFieldsetMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     """API view for listing realty objects.
 
     get:
     Return a list of all available Realty objects.
+    The list is paginated by cursors: pages have `next` and `previous` links, but no `count` (it would need
+    a COUNT query on every page), and realty created meanwhile don't shift the following pages.
+    The list has an ETag (by the catalogue version), so conditional requests are answered with `304 Not Modified`.
+    With the `fast` query parameter, the list is serialized from plain rows (faster, with the same representation).
+    `fields` (e.g. `fields=id,name,price_per_night`) and `expand` (e.g. `expand=host,amenities,location`)
+    query parameters return only the requested fields and nested relations (other relations are returned by ids).
 
     post:
     Create a new Realty object.
@@ -25,9 +57,42 @@ class RealtyListApiView(generics.ListCreateAPIView):
     queryset = get_all_available_realty()
     serializer_class = RealtySerializer
     filterset_class = RealtyFilter
+    pagination_class = RealtyKeysetPagination
     permission_classes = (
         IsAbleToAddRealty,
     )
+    fast_query_param = 'fast'
+    available_fields = RealtySerializer.Meta.fields
+
+    def get_queryset(self):
+        realty_qs = super(RealtyListApiView, self).get_queryset()
+        if (fieldset := self.get_fieldset()) is None:
+            return get_realty_api_details(realty_qs)
+        return get_realty_api_details(
+            realty_qs,
+            fields=[*fieldset.fields, *self.get_ordering_fields()],
+            expand=fieldset.expand,
+        )
+
+    def get_ordering_fields(self) -> List[str]:
+        # keyset pagination reads ordering fields of the last object
+        return [field.lstrip('-') for field in self.pagination_class.ordering]
+
+    def list(self, request: Request, *args, **kwargs):
+        if request.query_params.get(self.fast_query_param) not in ('1', 'true'):
+            return super(RealtyListApiView, self).list(request, *args, **kwargs)
+
+        serializer = FastRealtySerializer(context=self.get_serializer_context())
+        # `.values()` rows can't prefetch, so the plain queryset is used
+        realty_qs = self.filter_queryset(super(RealtyListApiView, self).get_queryset())
+        rows = self.paginate_queryset(serializer.get_rows(realty_qs, *self.get_ordering_fields()))
+        return self.get_paginated_response(serializer.to_representation(rows))
+
+    def get_validators(self):
+        # the list depends on query parameters (filters, cursor) and the representation (e.g. the browsable API)
+        return get_realty_collection_validators(
+            f"{self.request.build_absolute_uri()}:{self.request.META.get('HTTP_ACCEPT', '')}",
+        )
 
     def post(self, request: Request, *args, **kwargs):
         # TODO: finish API (`hosts`)
@@ -42,11 +107,14 @@ class RealtyListApiView(generics.ListCreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RealtyDetailApiView(generics.RetrieveUpdateDestroyAPIView):
+class RealtyDetailApiView(RealtyFieldsetMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API view for a single Realty object.
 
     retrieve:
     Return a Realty object by the given id.
+    The object has ETag and Last-Modified, so conditional requests are answered with `304 Not Modified`.
+    `fields` and `expand` query parameters return the requested fields of the realty list representation
+    (by default, only fields that can be updated).
 
     put:
     Update some of the Realty object's fields.
@@ -61,3 +129,216 @@ class RealtyDetailApiView(generics.RetrieveUpdateDestroyAPIView):
         IsAuthenticatedOrReadOnly,
         IsRealtyOwnerOrReadOnly,
     )
+    available_fields = RealtySerializer.Meta.fields
+    default_fields = RealtyUpdateSerializer.Meta.fields
+
+    def get_queryset(self):
+        realty_qs = super(RealtyDetailApiView, self).get_queryset()
+        if (fieldset := self.get_fieldset()) is None:
+            return realty_qs
+        return get_realty_api_details(realty_qs, fields=fieldset.fields, expand=fieldset.expand)
+
+    def get_serializer_class(self):
+        if self.get_fieldset() is not None:
+            return RealtySerializer
+        return super(RealtyDetailApiView, self).get_serializer_class()
+
+    def get_validators(self):
+        validators = get_realty_validators(self.kwargs['pk'])
+        if validators is not None:
+            # the representation depends on the fieldset and the renderer (e.g. the browsable API)
+            validators['etag'] = (
+                f"{validators['etag']}:{self.request.get_full_path()}:{self.request.META.get('HTTP_ACCEPT', '')}"
+            )
+        return validators
+
+
+class RealtyAutocompleteApiView(APIView):
+    """API view for the search autocomplete.
+
+    get:
+    Return city and realty name suggestions for the `q` query parameter.
+    """
+
+    permission_classes = (
+        AllowAny,
+    )
+
+    def get(self, request: Request, *args, **kwargs):
+        return Response(get_autocomplete_suggestions(request.query_params.get('q', '')))
+
+
+class RealtyFacetsApiView(APIView):
+    """API view for the realty filters' facet counts.
+
+    get:
+    Return counts of available realty by type, amenities, beds count, guests count and price
+    for the current query parameters (`q`, `city_slug`, `realty_type`, `beds_count`, `guests_count`, `amenities`).
+    """
+
+    permission_classes = (
+        AllowAny,
+    )
+
+    def get(self, request: Request, *args, **kwargs):
+        return Response(get_cached_realty_facets(request.query_params))
+
+
+class RealtyTrendingApiView(generics.ListAPIView):
+    """API view for trending realty.
+
+    get:
+    Return available realty with the highest trending score (recent visits with time decay),
+    optionally in the city with the `city_slug` query parameter.
+    The number of realty is set by the `count` query parameter (12 by default, at most 50).
+    """
+
+    serializer_class = RealtySerializer
+    pagination_class = None
+    permission_classes = (
+        AllowAny,
+    )
+
+    def get_queryset(self):
+        try:
+            count = int(self.request.query_params.get('count', REALTY_TRENDING_COUNT))
+        except ValueError:
+            count = REALTY_TRENDING_COUNT
+
+        return get_trending_realty(
+            min(count, REALTY_TRENDING_MAX_COUNT),
+            city_slug=self.request.query_params.get('city_slug', None),
+            realty_qs=get_realty_api_details(get_all_available_realty()),
+        )
+
+
+class FlatRealtyListApiView(generics.ListAPIView):
+    """API view for listing flat (denormalized) realty rows.
+
+    get:
+    Return a list of all available realty with their location and host info.
+    Rows are read from the `realty_view` materialized view, so they may be slightly stale.
+    """
+
+    queryset = get_available_flat_realty()
+    serializer_class = FlatRealtySerializer
+    filterset_class = FlatRealtyFilter
+    pagination_class = FlatRealtyKeysetPagination
+
+
+class RealtyExportApiView(generics.GenericAPIView):
+    """API view for exporting the whole realty catalogue.
+
+    get:
+    Stream all available realty (filtered by the same filters as the realty list) as NDJSON (`format=ndjson`,
+    by default) or CSV (`format=csv`). Rows are read by a server-side cursor and sent as they are read,
+    so the export doesn't depend on the number of rows and starts at once.
+    """
+
+    queryset = get_all_available_realty()
+    filterset_class = RealtyFilter
+    renderer_classes = (
+        NDJSONRenderer,
+        CSVRenderer,
+    )
+    export_streams = {
+        NDJSONRenderer.format: iter_realty_ndjson,
+        CSVRenderer.format: iter_realty_csv,
+    }
+
+    def get(self, request: Request, *args, **kwargs):
+        realty_qs = self.filter_queryset(self.get_queryset())
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            self.export_streams[renderer.format](realty_qs),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response['Content-Disposition'] = f'attachment; filename="realty.{renderer.format}"'
+        return response
+
+
+class RealtyBulkApiView(generics.GenericAPIView):
+    """API view for creating and updating realty objects in bulk.
+
+    All items are validated first: if any of them is invalid, nothing is changed and errors are returned
+    for each item (in the order of items, an empty object for a valid one).
+
+    post:
+    Create realty objects of the current user from a list (up to `REALTY_BULK_CREATE_MAX_COUNT` items).
+    All objects are inserted by batches in a single transaction and their ids are returned.
+
+    patch:
+    Update `is_available` and/or `price_per_night` of realty objects from a list of `{id, ...}` items
+    (up to `REALTY_BULK_UPDATE_MAX_COUNT` items). Only owners (hosts) and superusers can update realty:
+    ownership is checked by a single query, and all objects are updated in a single transaction.
+    """
+
+    permission_classes = (
+        IsAuthenticated,
+        IsAbleToAddRealty,
+    )
+
+    def get_serializer_class(self):
+        if self.request.method == 'PATCH':
+            return RealtyBulkUpdateSerializer
+        return RealtyBulkCreateSerializer
+
+    def get_permissions(self):
+        if self.request.method == 'PATCH':
+            # ownership is checked by the updated queryset (see `get_queryset()`)
+            return [IsAuthenticated()]
+        return super(RealtyBulkApiView, self).get_permissions()
+
+    def get_queryset(self):
+        return get_realty_editable_by_user(self.request.user)
+
+    def post(self, request: Request, *args, **kwargs):
+        if (error_response := self.get_items_error_response(request.data, REALTY_BULK_CREATE_MAX_COUNT)) is not None:
+            return error_response
+
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        realty_host, _ = get_or_create_realty_host_by_user(request.user)
+        realty_objects = bulk_create_realty(serializer.validated_data, realty_host)
+        return Response({'ids': [realty.pk for realty in realty_objects]}, status=status.HTTP_201_CREATED)
+
+    def patch(self, request: Request, *args, **kwargs):
+        if (error_response := self.get_items_error_response(request.data, REALTY_BULK_UPDATE_MAX_COUNT)) is not None:
+            return error_response
+
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        realty_ids = [item['id'] for item in serializer.validated_data]
+        if duplicate_ids := sorted(realty_id for realty_id, count in Counter(realty_ids).items() if count > 1):
+            return Response(
+                {'non_field_errors': [f"Duplicate ids: {', '.join(map(str, duplicate_ids))}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            realty_objects = bulk_update_realty(serializer.validated_data, self.get_queryset())
+        except RealtyNotFoundError as error:
+            not_found_ids = set(error.realty_ids)
+            return Response(
+                [
+                    {'id': ['Realty does not exist or you are not its host.']} if realty_id in not_found_ids else {}
+                    for realty_id in realty_ids
+                ],
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({'ids': [realty.pk for realty in realty_objects]})
+
+    @staticmethod
+    def get_items_error_response(data, max_count: int) -> Optional[Response]:
+        """Return `400 Bad Request` response if `data` isn't a list of up to `max_count` items, otherwise None."""
+        if not isinstance(data, list):
+            return Response({'non_field_errors': ['Expected a list of items.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > max_count:
+            return Response(
+                {'non_field_errors': [f'Ensure there are no more than {max_count} items.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return None
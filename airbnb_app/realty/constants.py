@@ -12,3 +12,104 @@ REALTY_FORM_SESSION_PREFIX = 'realty'
 
 # Indicates the name of the variable in the session that stores all multiple-step forms' specific keys
 REALTY_FORM_KEYS_COLLECTOR_NAME = 'realty_form_keys'
+
+# Indicates the minimal length of the query (in chars) for the autocomplete suggestions
+AUTOCOMPLETE_MIN_QUERY_LENGTH = 2
+
+# Indicates how many suggestions (per group: cities, realty) are returned by the autocomplete
+AUTOCOMPLETE_SUGGESTIONS_COUNT = 5
+
+# Indicates how long (in seconds) autocomplete suggestions are cached
+AUTOCOMPLETE_CACHE_TTL = 60
+
+# Indicates how long (in seconds) search/list results are cached (results are also invalidated by catalogue changes)
+REALTY_RESULTS_CACHE_TTL = 10 * 60
+
+# Indicates the maximum number of realty ids that are cached for a single search/list query
+REALTY_RESULTS_CACHE_MAX_IDS = 1000
+
+# Indicates the delay (in seconds) between a realty change and the `realty_view` refresh (changes are debounced)
+REALTY_VIEW_REFRESH_DELAY = 30
+
+# Indicates the width of `price_per_night` buckets in the realty facet counts
+FACETS_PRICE_BUCKET_SIZE = 50
+
+# Indicates how many Redis commands (or database rows) are processed at once when rebuilding realty bitmaps
+REALTY_BITMAPS_BATCH_SIZE = 1000
+
+# Indicates the maximum number of candidate realty ids matched by Redis bitmaps (more are filtered by SQL instead)
+REALTY_BITMAPS_MAX_CANDIDATES = 5000
+
+# Indicates the maximum number of realty markers returned for a single map viewport
+REALTY_MAP_MAX_MARKERS = 500
+
+# Indicates how many Redis visit counters are flushed to DB at once (by a single UPDATE statement)
+REALTY_VISITS_FLUSH_BATCH_SIZE = 1000
+
+# Indicates how long (in seconds) daily/weekly/monthly unique visitors HyperLogLogs are kept in Redis
+REALTY_DAILY_VISITORS_TTL = 40 * 24 * 60 * 60
+REALTY_WEEKLY_VISITORS_TTL = 15 * 24 * 60 * 60
+REALTY_MONTHLY_VISITORS_TTL = 63 * 24 * 60 * 60
+
+# Indicates how many realty unique visitors HyperLogLogs are rolled up at once
+REALTY_VISITORS_ROLLUP_BATCH_SIZE = 500
+
+# Indicates how much a single detail page visit adds to the realty city popularity
+CITY_POPULARITY_VISIT_SCORE = 1
+
+# Indicates how much a new realty adds to its city popularity
+CITY_POPULARITY_NEW_REALTY_SCORE = 10
+
+# Indicates the width (in seconds) of realty visit buckets the trending score is computed from
+REALTY_TRENDING_BUCKET_SIZE = 5 * 60
+
+# Indicates how long (in seconds) realty visit buckets are kept in Redis if they haven't been processed
+REALTY_TRENDING_BUCKET_TTL = 24 * 60 * 60
+
+# Indicates the time (in seconds) after which a visit adds half as much to the realty trending score
+REALTY_TRENDING_HALF_LIFE = 6 * 60 * 60
+
+# Indicates the trending score below which realty is removed from the trending ranking
+REALTY_TRENDING_MIN_SCORE = 0.01
+
+# Indicates how many realty are shown in the "Trending now" feed (and the maximum that can be requested by the API)
+REALTY_TRENDING_COUNT = 12
+REALTY_TRENDING_MAX_COUNT = 50
+
+# Indicates how often (in seconds) visits buffered by a web worker are flushed to Redis (if the buffer is enabled)
+REALTY_VISITS_BUFFER_FLUSH_INTERVAL = 0.5
+
+# Indicates how many buffered visits trigger a flush to Redis before the flush interval has passed
+REALTY_VISITS_BUFFER_FLUSH_SIZE = 100
+
+# Indicates how long (in seconds) rendered realty cards are cached (cards are also invalidated by realty changes)
+REALTY_CARD_CACHE_TTL = 24 * 60 * 60
+
+# Indicates how many realty ids a single sitemap chunk covers (a sitemap can't have more than 50 000 URLs)
+REALTY_SITEMAP_CHUNK_SIZE = 10_000
+
+# Indicates how many rows the server-side cursor fetches at once while a sitemap chunk is rendered
+REALTY_SITEMAP_CURSOR_ITERSIZE = 2_000
+
+# Indicates how long (in seconds) rendered sitemaps are cached (they are re-rendered every hour by a Celery task)
+REALTY_SITEMAP_CACHE_TTL = 24 * 60 * 60
+
+# Indicates `changefreq` and `priority` of realty detail pages in the sitemap
+REALTY_SITEMAP_CHANGEFREQ = 'weekly'
+REALTY_SITEMAP_PRIORITY = '0.9'
+
+# Indicates how many rows the server-side cursor fetches at once (and how many rows are sent as a single chunk)
+# while realty is exported
+REALTY_EXPORT_CHUNK_SIZE = 2_000
+
+# Indicates the maximum number of realty objects that can be created by a single bulk request
+REALTY_BULK_CREATE_MAX_COUNT = 10_000
+
+# Indicates how many rows are inserted by a single INSERT statement while realty is created in bulk
+REALTY_BULK_CREATE_BATCH_SIZE = 1_000
+
+# Indicates the maximum number of realty objects that can be updated by a single bulk request
+REALTY_BULK_UPDATE_MAX_COUNT = 10_000
+
+# Indicates how many realty objects are updated by a single UPDATE statement while realty is updated in bulk
+REALTY_BULK_UPDATE_BATCH_SIZE = 500
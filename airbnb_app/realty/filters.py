@@ -1,11 +1,64 @@
 import django_filters
 
-from .models import Realty
+from django import forms
+
+from .models import Realty, RealtyView
+from .services.geo import get_realty_in_bbox, get_realty_within_radius, parse_bbox
+
+
+class BoundingBoxField(forms.CharField):
+    """Map viewport in the `west,south,east,north` format."""
+
+    def to_python(self, value):
+        value = super(BoundingBoxField, self).to_python(value)
+        if not value:
+            return None
+        try:
+            return parse_bbox(value)
+        except ValueError as error:
+            raise forms.ValidationError(str(error), code='invalid')
+
+
+class PointRadiusField(forms.CharField):
+    """Circle in the `latitude,longitude,radius_km` format."""
+
+    def to_python(self, value):
+        value = super(PointRadiusField, self).to_python(value)
+        if not value:
+            return None
+        try:
+            latitude, longitude, radius_km = (float(number) for number in value.split(','))
+        except ValueError:
+            raise forms.ValidationError("Value should be in the `latitude,longitude,radius_km` format", code='invalid')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and 0 < radius_km <= 20000):
+            raise forms.ValidationError("Coordinates or radius are out of range", code='invalid')
+        return latitude, longitude, radius_km
+
+
+class BoundingBoxFilter(django_filters.Filter):
+    field_class = BoundingBoxField
+
+    def filter(self, qs, value):
+        if value is None:
+            return qs
+        return get_realty_in_bbox(value, qs)
+
+
+class PointRadiusFilter(django_filters.Filter):
+    field_class = PointRadiusField
+
+    def filter(self, qs, value):
+        if value is None:
+            return qs
+        return get_realty_within_radius(*value, realty_qs=qs)
 
 
 class RealtyFilter(django_filters.FilterSet):
     """Filter for a Realty model."""
 
+    bbox = BoundingBoxFilter(label='Map viewport (`west,south,east,north`)')
+    near = PointRadiusFilter(label='Circle around a point (`latitude,longitude,radius_km`)')
+
     class Meta:
         model = Realty
         fields = [
@@ -23,3 +76,15 @@ class RealtyShortFilter(django_filters.FilterSet):
         fields = [
             'beds_count', 'guests_count', 'amenities',
         ]
+
+
+class FlatRealtyFilter(django_filters.FilterSet):
+    """Filter for a RealtyView model (`realty_view` materialized view)."""
+
+    class Meta:
+        model = RealtyView
+        fields = {
+            'city': ['exact'],
+            'realty_type': ['exact'],
+            'price_per_night': ['exact', 'lte', 'gte'],
+        }
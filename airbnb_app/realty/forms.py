@@ -2,6 +2,7 @@ from django import forms
 
 from .constants import MAX_BEDS_COUNT, MAX_GUESTS_COUNT, MAX_REALTY_IMAGES_COUNT
 from .models import Amenity, Realty, RealtyImage, RealtyTypeChoices
+from .services.amenities import get_amenity_choices
 
 
 REALTY_FORM_WIDGETS = {
@@ -27,6 +28,17 @@ REALTY_FORM_WIDGETS = {
 }
 
 
+class AmenityChoicesFormMixin:
+    """Mixin for forms with the `amenities` field, that renders choices from the amenity catalogue.
+
+    The catalogue is cached by the process, so rendering the field doesn't query amenities.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AmenityChoicesFormMixin, self).__init__(*args, **kwargs)
+        self.fields['amenities'].choices = get_amenity_choices()
+
+
 class RealtyTypeForm(forms.Form):
     """Form for selecting realty types."""
 
@@ -36,7 +48,7 @@ class RealtyTypeForm(forms.Form):
     )
 
 
-class RealtyFiltersForm(forms.Form):
+class RealtyFiltersForm(AmenityChoicesFormMixin, forms.Form):
     """Form for filtering realty objects."""
 
     beds_count = forms.DecimalField(
@@ -72,7 +84,7 @@ class RealtyFiltersForm(forms.Form):
     amenities.group = 2
 
 
-class RealtyForm(forms.ModelForm):
+class RealtyForm(AmenityChoicesFormMixin, forms.ModelForm):
     """Form for editing (creating or updating) a Realty object."""
 
     class Meta:
@@ -99,7 +111,7 @@ class RealtyImageForm(forms.ModelForm):
 
 
 # Realty multi-step forms
-class RealtyGeneralInfoForm(forms.ModelForm):
+class RealtyGeneralInfoForm(AmenityChoicesFormMixin, forms.ModelForm):
     """Form for editing Realty's general info.
 
     Step-1
@@ -0,0 +1,64 @@
+import time
+from typing import Callable, List
+
+from django.core.management.base import ArgumentParser, BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ...api.serializers import FastRealtySerializer, RealtySerializer
+from ...services.realty import get_all_available_realty, get_realty_api_details
+
+
+class Command(BaseCommand):
+    """Custom management command that measures serialization speed of a realty API page."""
+
+    help = "Measures rows per second of a realty API page: naive, query-optimized and fast (`.values()`) serialization"
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument('--rows', type=int, default=1000, help='Indicates how many realty rows a page has')
+        parser.add_argument('--repeat', type=int, default=5, help='Indicates how many times every mode is measured')
+
+    def handle(self, *args, **options):
+        rows_count: int = options['rows']
+        repeat: int = options['repeat']
+
+        if rows_count < 1 or repeat < 1:
+            raise ValueError("`rows` and `repeat` should be greater than or equal to 1")
+
+        realty_qs = get_all_available_realty().order_by('-created', '-id')
+        available_count = realty_qs.count()
+        if available_count < rows_count:
+            self.stdout.write(self.style.WARNING(
+                f"There are only {available_count} available realty (create more with `manage.py populaterealty`)",
+            ))
+
+        def serialize_naive() -> List[dict]:
+            return RealtySerializer(list(realty_qs[:rows_count]), many=True).data
+
+        def serialize_optimized() -> List[dict]:
+            return RealtySerializer(list(get_realty_api_details(realty_qs)[:rows_count]), many=True).data
+
+        def serialize_fast() -> List[dict]:
+            serializer = FastRealtySerializer()
+            return serializer.to_representation(list(serializer.get_rows(realty_qs)[:rows_count]))
+
+        for mode, serialize in (
+                ('naive', serialize_naive),
+                ('optimized', serialize_optimized),
+                ('fast', serialize_fast),
+        ):
+            self._measure(mode, serialize, repeat)
+
+    def _measure(self, mode: str, serialize: Callable[[], List[dict]], repeat: int) -> None:
+        best_duration, serialized_count, queries_count = float('inf'), 0, 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                serialized_count = len(serialize())
+                best_duration = min(best_duration, time.perf_counter() - started)
+            queries_count = len(queries)
+
+        self.stdout.write(
+            f"{mode:>10}: {serialized_count / best_duration:,.0f} rows/s "
+            f"({serialized_count} rows in {best_duration * 1000:.1f} ms, {queries_count} queries)",
+        )
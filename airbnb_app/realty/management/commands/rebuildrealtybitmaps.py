@@ -0,0 +1,26 @@
+from django.core.management.base import ArgumentParser, BaseCommand
+
+from realty.constants import REALTY_BITMAPS_BATCH_SIZE
+from realty.services.bitmaps import rebuild_realty_bitmaps
+
+
+class Command(BaseCommand):
+    """Custom management command that rebuilds Redis bitmaps of realty types, amenities and availability."""
+
+    help = "Rebuilds realty bitmaps"
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument(
+            '--batch-size', type=int, default=REALTY_BITMAPS_BATCH_SIZE,
+            help='Indicates how many Redis commands to send at once',
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options['batch_size']
+
+        if batch_size < 1:
+            raise ValueError("`batch_size` should be greater than or equal to 1")
+
+        indexed_count = rebuild_realty_bitmaps(batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS("Successfully indexed %s realty" % (indexed_count,)))
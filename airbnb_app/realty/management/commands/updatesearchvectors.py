@@ -0,0 +1,31 @@
+from django.core.management.base import ArgumentParser, BaseCommand
+from django.db.models import Max, Min
+
+from realty.models import Realty
+from realty.services.realty import update_realty_search_vector
+
+
+class Command(BaseCommand):
+    """Custom management command that rebuilds realty `search_vector` (e.g. after a bulk import)."""
+
+    help = "Rebuilds realty search vectors"
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Indicates how many realty to update at once')
+
+    def handle(self, *args, **options):
+        batch_size: int = options['batch_size']
+
+        if batch_size < 1:
+            raise ValueError("`batch_size` should be greater than or equal to 1")
+
+        realty_ids = Realty.objects.aggregate(Min('pk'), Max('pk'))
+        start, end = realty_ids['pk__min'] or 0, realty_ids['pk__max'] or -1
+
+        updated_count = 0
+        for batch_start in range(start, end + 1, batch_size):
+            updated_count += update_realty_search_vector(
+                Realty.objects.filter(pk__range=(batch_start, batch_start + batch_size - 1)),
+            )
+
+        self.stdout.write(self.style.SUCCESS("Successfully updated %s search vectors" % (updated_count,)))
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0016_alter_amenity_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='realty',
+            index=models.Index(fields=['-created', '-id'], name='realty_created_id_idx'),
+        ),
+    ]
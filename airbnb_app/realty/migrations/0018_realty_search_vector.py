@@ -0,0 +1,37 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addresses', '0004_auto_20210327_1837'),
+        ('realty', '0017_realty_created_id_idx'),
+    ]
+
+    backfill_sql = """
+    UPDATE realty_realty AS r
+    SET search_vector = (
+        setweight(to_tsvector(COALESCE(r.name, '')), 'A') ||
+        setweight(to_tsvector(COALESCE(l.city, '')), 'B') ||
+        setweight(to_tsvector(COALESCE(r.description, '')), 'B')
+    )
+    FROM addresses_address AS l
+    WHERE r.location_id = l.id
+    """
+
+    operations = [
+        migrations.AddField(
+            model_name='realty',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='realty',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='realty_search_vector_idx'),
+        ),
+        migrations.RunSQL(backfill_sql, reverse_sql=migrations.RunSQL.noop),
+    ]
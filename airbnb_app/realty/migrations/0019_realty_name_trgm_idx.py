@@ -0,0 +1,18 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0018_realty_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='realty',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='realty_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0019_realty_name_trgm_idx'),
+    ]
+
+    sql = """
+    CREATE MATERIALIZED VIEW realty_view AS
+        SELECT
+            r.id,
+            r.name, r.description, r.is_available, r.realty_type, r.beds_count, r.max_guests_count, r.price_per_night,
+            l.country, l.city, l.street,
+            u.email, u.first_name, u.last_name
+        FROM realty_realty AS r
+        LEFT JOIN addresses_address AS l
+            ON r.location_id = l.id
+        LEFT JOIN hosts_realtyhost AS h
+            ON r.host_id = h.id
+        LEFT JOIN accounts_customuser AS u
+            ON h.user_id = u.id
+    WITH DATA;
+
+    -- required by `REFRESH MATERIALIZED VIEW CONCURRENTLY`
+    CREATE UNIQUE INDEX realty_view_id_uniq ON realty_view (id);
+    CREATE INDEX realty_view_city_idx ON realty_view (city);
+    CREATE INDEX realty_view_price_per_night_idx ON realty_view (price_per_night);
+    """
+
+    reverse_sql = """
+    CREATE VIEW realty_view AS
+        SELECT
+            r.id,
+            r.name, r.description, r.is_available, r.realty_type, r.beds_count, r.max_guests_count, r.price_per_night,
+            l.country, l.city, l.street,
+            u.email, u.first_name, u.last_name
+        FROM realty_realty AS r
+        LEFT JOIN addresses_address AS l
+            ON r.location_id = l.id
+        LEFT JOIN hosts_realtyhost AS h
+            ON r.host_id = h.id
+        LEFT JOIN accounts_customuser AS u
+            ON h.user_id = u.id
+        ORDER BY r.id
+    """
+
+    operations = [
+        migrations.RunSQL('DROP VIEW IF EXISTS realty_view;', reverse_sql=reverse_sql),
+        migrations.RunSQL(sql, reverse_sql='DROP MATERIALIZED VIEW IF EXISTS realty_view;'),
+    ]
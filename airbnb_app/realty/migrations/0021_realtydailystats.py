@@ -0,0 +1,34 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realty', '0020_materialize_realty_view'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RealtyDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('unique_visitors', models.PositiveIntegerField(default=0, verbose_name='unique visitors')),
+                ('week_unique_visitors', models.PositiveIntegerField(default=0, verbose_name='unique visitors since the beginning of the week')),
+                ('month_unique_visitors', models.PositiveIntegerField(default=0, verbose_name='unique visitors since the beginning of the month')),
+                ('realty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='realty.realty', verbose_name='realty')),
+            ],
+            options={
+                'verbose_name': 'realty daily stats',
+                'verbose_name_plural': 'realty daily stats',
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='realtydailystats',
+            constraint=models.UniqueConstraint(fields=('realty', 'date'), name='realty_daily_stats_realty_date_unique'),
+        ),
+    ]
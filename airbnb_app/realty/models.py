@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.urls import reverse
@@ -92,6 +94,7 @@ class Realty(models.Model):
     location = models.OneToOneField(Address, on_delete=models.CASCADE, verbose_name='location')
     host = models.ForeignKey(RealtyHost, on_delete=models.CASCADE, related_name='realty', verbose_name='realty host')
     amenities = models.ManyToManyField(Amenity, related_name='realty', blank=True, verbose_name='amenities')
+    search_vector = SearchVectorField(verbose_name='search vector', null=True, editable=False)
 
     objects = RealtyManager()
     available = AvailableRealtyManager()
@@ -100,6 +103,14 @@ class Realty(models.Model):
         verbose_name = 'realty'
         verbose_name_plural = 'realty'
         ordering = ('-created',)
+        indexes = [
+            # keyset pagination
+            models.Index(fields=['-created', '-id'], name='realty_created_id_idx'),
+            # full-text search
+            GinIndex(fields=['search_vector'], name='realty_search_vector_idx'),
+            # autocomplete (`pg_trgm`)
+            GinIndex(fields=['name'], name='realty_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.name
@@ -117,7 +128,11 @@ class Realty(models.Model):
 
 
 class RealtyView(models.Model):  # noqa: DJ10, DJ08, DJ11
-    """Postgres View."""
+    """Postgres Materialized View.
+
+    Flat (denormalized) realty rows: realty + location + host's user.
+    The view is refreshed by the `refresh_realty_view` task, so it can be slightly stale.
+    """
 
     id = models.PositiveBigIntegerField(primary_key=True)
     name = models.CharField(verbose_name="name", max_length=255)
@@ -215,3 +230,35 @@ class RealtyImage(models.Model):
                 realty_image.save(update_fields=['order'])
 
         super(RealtyImage, self).delete(using, keep_parents)
+
+
+class RealtyDailyStats(models.Model):
+    """Daily unique visitors of a realty (rolled up from Redis HyperLogLogs)."""
+
+    realty = models.ForeignKey(
+        Realty,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='realty',
+    )
+    date = models.DateField(verbose_name='date')
+    unique_visitors = models.PositiveIntegerField(verbose_name='unique visitors', default=0)
+    week_unique_visitors = models.PositiveIntegerField(
+        verbose_name='unique visitors since the beginning of the week',
+        default=0,
+    )
+    month_unique_visitors = models.PositiveIntegerField(
+        verbose_name='unique visitors since the beginning of the month',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'realty daily stats'
+        verbose_name_plural = 'realty daily stats'
+        ordering = ('-date',)
+        constraints = [
+            models.UniqueConstraint(fields=['realty', 'date'], name='realty_daily_stats_realty_date_unique'),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.realty_id} on {self.date}"
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from redis.client import PubSub
+from redis.exceptions import RedisError
+
+from django.conf import settings
+
+from configs.redis_conf import redis_instance
+
+from ..models import Amenity
+
+
+logger = logging.getLogger(__name__)
+
+# Redis channel, that notifies all processes (web workers, Celery workers) about amenity changes
+AMENITY_CATALOGUE_CHANNEL = 'realty:amenities:invalidate'
+
+
+@dataclass(frozen=True)
+class AmenityCatalogue:
+    names_by_id: Dict[int, str]
+    ids_by_name: Dict[str, int]
+    choices: List[Tuple[int, str]]
+
+
+def is_amenity_catalogue_cache_enabled() -> bool:
+    return bool(getattr(settings, 'AMENITY_CATALOGUE_CACHE_ENABLED', False))
+
+
+def load_amenity_catalogue() -> AmenityCatalogue:
+    """Load all amenities by a single query."""
+    amenities = list(Amenity.objects.order_by('id').values_list('id', 'name'))
+    return AmenityCatalogue(
+        names_by_id=dict(amenities),
+        ids_by_name={name: amenity_id for amenity_id, name in amenities},
+        choices=amenities,
+    )
+
+
+class AmenityCatalogueCache:
+    """Process-local cache of the amenity catalogue.
+
+    The catalogue is loaded once and kept until an amenity is changed in any process: changes are published
+    to the `AMENITY_CATALOGUE_CHANNEL`, and every process reads its subscription before using the catalogue
+    (a non-blocking read of already received messages, so there is no round trip to Redis).
+    """
+
+    def __init__(self):
+        self._init_process_state()
+        # subscription connections don't survive fork (e.g. gunicorn `preload_app`, Celery prefork pool)
+        os.register_at_fork(after_in_child=self._init_process_state)
+
+    def _init_process_state(self) -> None:
+        self._lock = threading.Lock()
+        self._catalogue: Optional[AmenityCatalogue] = None
+        self._pubsub: Optional[PubSub] = None
+
+    def get(self) -> AmenityCatalogue:
+        with self._lock:
+            if self._has_invalidation():
+                self._catalogue = None
+            if self._catalogue is None:
+                self._catalogue = load_amenity_catalogue()
+            return self._catalogue
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._catalogue = None
+
+    def _has_invalidation(self) -> bool:
+        """Read invalidations received by the subscription (subscribe to the channel first, if it's needed)."""
+        try:
+            if self._pubsub is None:
+                self._pubsub = redis_instance.pubsub()
+                self._pubsub.subscribe(AMENITY_CATALOGUE_CHANNEL)
+                # changes made before the subscription are unknown
+                return True
+
+            has_invalidation = False
+            while (message := self._pubsub.get_message()) is not None:
+                has_invalidation = has_invalidation or message['type'] == 'message'
+            return has_invalidation
+        except RedisError:
+            logger.exception("Amenity catalogue invalidations haven't been read, the catalogue is reloaded")
+            self._reset_pubsub()
+            return True
+
+    def _reset_pubsub(self) -> None:
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except RedisError:
+                pass
+        self._pubsub = None
+
+
+amenity_catalogue_cache = AmenityCatalogueCache()
+
+
+def get_amenity_catalogue() -> AmenityCatalogue:
+    """Return the amenity catalogue (cached by the process if `AMENITY_CATALOGUE_CACHE_ENABLED` is set)."""
+    if not is_amenity_catalogue_cache_enabled():
+        return load_amenity_catalogue()
+    return amenity_catalogue_cache.get()
+
+
+def get_amenity_choices() -> List[Tuple[int, str]]:
+    return get_amenity_catalogue().choices
+
+
+def invalidate_amenity_catalogue() -> None:
+    """Invalidate the amenity catalogue cached by this process and all other processes."""
+    if not is_amenity_catalogue_cache_enabled():
+        return
+    amenity_catalogue_cache.invalidate()
+    redis_instance.publish(AMENITY_CATALOGUE_CHANNEL, 'invalidate')
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+from typing import List, TypedDict
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.urls import reverse
+
+from addresses.models import Address
+
+from ..constants import AUTOCOMPLETE_CACHE_TTL, AUTOCOMPLETE_MIN_QUERY_LENGTH, AUTOCOMPLETE_SUGGESTIONS_COUNT
+from ..models import Realty
+
+
+class CitySuggestion(TypedDict):
+    name: str
+    url: str
+
+
+class RealtySuggestion(TypedDict):
+    id: int
+    name: str
+    url: str
+
+
+class AutocompleteSuggestions(TypedDict):
+    cities: List[CitySuggestion]
+    realty: List[RealtySuggestion]
+
+
+def normalize_autocomplete_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def get_autocomplete_cache_key(query: str) -> str:
+    """Return the cache key of suggestions for the normalized `query` (hashed, so any input is a valid key)."""
+    return f"realty:autocomplete:{hashlib.md5(query.encode()).hexdigest()}"
+
+
+def get_city_suggestions(query: str, limit: int = AUTOCOMPLETE_SUGGESTIONS_COUNT) -> List[CitySuggestion]:
+    """Return cities (with available realty) that are similar to the `query`, the most similar first.
+
+    Both `%` (trigram similarity) and `ILIKE` operators are served by the trigram GIN index on `Address.city`.
+    """
+    cities = Address.objects.filter(
+        Q(city__trigram_similar=query) | Q(city__icontains=query),
+        realty__is_available=True,
+    ).values(
+        'city', 'city_slug',
+    ).annotate(
+        similarity=Max(TrigramSimilarity('city', query)),
+    ).order_by('-similarity', 'city')[:limit]
+
+    return [
+        CitySuggestion(name=city['city'], url=reverse('realty:all_by_city', kwargs={'city_slug': city['city_slug']}))
+        for city in cities
+    ]
+
+
+def get_realty_name_suggestions(query: str, limit: int = AUTOCOMPLETE_SUGGESTIONS_COUNT) -> List[RealtySuggestion]:
+    """Return available realty with names that are similar to the `query`, the most similar first.
+
+    Both `%` (trigram similarity) and `ILIKE` operators are served by the trigram GIN index on `Realty.name`.
+    """
+    realty_list = Realty.available.filter(
+        Q(name__trigram_similar=query) | Q(name__icontains=query),
+    ).annotate(
+        similarity=TrigramSimilarity('name', query),
+    ).order_by('-similarity', '-created').values('id', 'name', 'slug')[:limit]
+
+    return [
+        RealtySuggestion(
+            id=realty['id'],
+            name=realty['name'],
+            url=reverse('realty:detail', kwargs={'pk': realty['id'], 'slug': realty['slug']}),
+        )
+        for realty in realty_list
+    ]
+
+
+def get_autocomplete_suggestions(query: str) -> AutocompleteSuggestions:
+    """Return ranked city and realty name suggestions for the (possibly misspelled) `query`.
+
+    Suggestions are cached by the normalized query for `AUTOCOMPLETE_CACHE_TTL` seconds,
+    so hot prefixes don't hit the DB on every keystroke.
+    """
+    query = normalize_autocomplete_query(query)
+    if len(query) < AUTOCOMPLETE_MIN_QUERY_LENGTH:
+        return AutocompleteSuggestions(cities=[], realty=[])
+
+    cache_key = get_autocomplete_cache_key(query)
+    suggestions = cache.get(cache_key)
+    if suggestions is None:
+        suggestions = AutocompleteSuggestions(
+            cities=get_city_suggestions(query),
+            realty=get_realty_name_suggestions(query),
+        )
+        cache.set(cache_key, suggestions, AUTOCOMPLETE_CACHE_TTL)
+    return suggestions
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import re
+import uuid
+from typing import Iterable, List, Optional, Set
+
+from django.conf import settings
+
+from configs.redis_conf import redis_binary_instance, redis_instance
+
+from ..constants import REALTY_BITMAPS_BATCH_SIZE, REALTY_BITMAPS_MAX_CANDIDATES
+from ..models import Amenity, Realty, RealtyTypeChoices
+
+
+REALTY_BITMAPS_KEY_PREFIX = 'realty:bitmaps'
+
+# offsets of set bits of every byte value (bits are numbered from the most significant one, like by SETBIT)
+BYTE_BITS_OFFSETS = tuple(
+    tuple(offset for offset in range(8) if byte & (0x80 >> offset)) for byte in range(256)
+)
+
+NON_ZERO_BYTE_PATTERN = re.compile(rb'[^\x00]')
+
+
+def is_realty_bitmap_index_enabled() -> bool:
+    return bool(getattr(settings, 'REALTY_BITMAP_INDEX_ENABLED', False))
+
+
+def get_available_bitmap_key() -> str:
+    return f"{REALTY_BITMAPS_KEY_PREFIX}:available"
+
+
+def get_type_bitmap_key(realty_type: str) -> str:
+    return f"{REALTY_BITMAPS_KEY_PREFIX}:type:{realty_type}"
+
+
+def get_amenity_bitmap_key(amenity_id: int | str) -> str:
+    return f"{REALTY_BITMAPS_KEY_PREFIX}:amenity:{amenity_id}"
+
+
+def get_bitmap_ids(bitmap: bytes) -> List[int]:
+    """Return offsets (realty ids) of all set bits in the `bitmap`.
+
+    Zero bytes are skipped by the regex engine, so only bytes with set bits are decoded in Python.
+    """
+    return [
+        match.start() * 8 + offset
+        for match in NON_ZERO_BYTE_PATTERN.finditer(bitmap)
+        for offset in BYTE_BITS_OFFSETS[bitmap[match.start()]]
+    ]
+
+
+def update_realty_bitmaps(realty: Realty) -> None:
+    """Set `realty` bits in the `is_available` and `realty_type` bitmaps."""
+    update_many_realty_bitmaps([realty])
+
+
+def update_many_realty_bitmaps(realty_objects: Iterable[Realty]) -> None:
+    """Set bits of all `realty_objects` in the `is_available` and `realty_type` bitmaps by a single pipeline."""
+    pipe = redis_instance.pipeline(transaction=False)
+    for realty in realty_objects:
+        pipe.setbit(get_available_bitmap_key(), realty.pk, int(realty.is_available))
+        for realty_type in RealtyTypeChoices.values:
+            pipe.setbit(get_type_bitmap_key(realty_type), realty.pk, int(realty_type == realty.realty_type))
+    pipe.execute()
+
+
+def update_realty_availability_bitmap(realty_ids: Iterable[int], is_available: bool) -> None:
+    """Set bits of the realty with the given `realty_ids` in the `is_available` bitmap (e.g. after a bulk update)."""
+    pipe = redis_instance.pipeline(transaction=False)
+    for realty_id in realty_ids:
+        pipe.setbit(get_available_bitmap_key(), realty_id, int(is_available))
+    pipe.execute()
+
+
+def update_realty_amenities_bitmaps(realty_ids: Iterable[int], amenity_ids: Iterable[int], has_amenity: bool) -> None:
+    """Set bits of the realty with the given `realty_ids` in bitmaps of the given amenities."""
+    amenity_ids = list(amenity_ids)
+    pipe = redis_instance.pipeline(transaction=False)
+    for realty_id in realty_ids:
+        for amenity_id in amenity_ids:
+            pipe.setbit(get_amenity_bitmap_key(amenity_id), realty_id, int(has_amenity))
+    pipe.execute()
+
+
+def remove_realty_from_bitmaps(realty_id: int) -> None:
+    """Clear bits of the (deleted) realty in all bitmaps."""
+    pipe = redis_instance.pipeline(transaction=False)
+    pipe.setbit(get_available_bitmap_key(), realty_id, 0)
+    for realty_type in RealtyTypeChoices.values:
+        pipe.setbit(get_type_bitmap_key(realty_type), realty_id, 0)
+    for amenity_id in Amenity.objects.values_list('id', flat=True):
+        pipe.setbit(get_amenity_bitmap_key(amenity_id), realty_id, 0)
+    pipe.execute()
+
+
+def remove_amenity_bitmap(amenity_id: int) -> None:
+    redis_instance.delete(get_amenity_bitmap_key(amenity_id))
+
+
+def rebuild_realty_bitmaps(*, batch_size: int = REALTY_BITMAPS_BATCH_SIZE) -> int:
+    """Rebuild all realty bitmaps from the database.
+
+    Bitmaps are built under temporary keys and then swapped in a single transaction,
+    so filtering keeps working (with the old bitmaps) during the rebuild.
+
+    Returns:
+        int: number of indexed realty
+    """
+    rebuild_prefix = f"{REALTY_BITMAPS_KEY_PREFIX}:rebuild:{uuid.uuid4().hex}"
+    built_keys: Set[str] = set()
+    pipe = redis_instance.pipeline(transaction=False)
+
+    def setbit(key: str, offset: int) -> None:
+        built_keys.add(key)
+        pipe.setbit(f"{rebuild_prefix}:{key}", offset, 1)
+        if len(pipe) >= batch_size:
+            pipe.execute()
+
+    realty_count = 0
+    for realty_id, realty_type, is_available in Realty.objects.values_list(
+            'id', 'realty_type', 'is_available',
+    ).order_by().iterator(chunk_size=batch_size):
+        realty_count += 1
+        setbit(get_type_bitmap_key(realty_type), realty_id)
+        if is_available:
+            setbit(get_available_bitmap_key(), realty_id)
+
+    for realty_id, amenity_id in Realty.amenities.through.objects.values_list(
+            'realty_id', 'amenity_id',
+    ).order_by().iterator(chunk_size=batch_size):
+        setbit(get_amenity_bitmap_key(amenity_id), realty_id)
+    pipe.execute()
+
+    stale_keys = {
+        get_available_bitmap_key(),
+        *(get_type_bitmap_key(realty_type) for realty_type in RealtyTypeChoices.values),
+        *redis_instance.scan_iter(match=get_amenity_bitmap_key('*')),
+    }
+    swap_pipe = redis_instance.pipeline(transaction=True)
+    swap_pipe.delete(*stale_keys)
+    for key in built_keys:
+        swap_pipe.rename(f"{rebuild_prefix}:{key}", key)
+    swap_pipe.execute()
+
+    return realty_count
+
+
+def get_candidate_realty_ids(
+        *,
+        realty_types: Iterable[str] = (),
+        amenity_ids: Iterable[int] = (),
+        max_count: int = REALTY_BITMAPS_MAX_CANDIDATES,
+) -> Optional[List[int]]:
+    """Return ids of available realty of any of the `realty_types` with any of the `amenities`.
+
+    Bitmaps are intersected in Redis (BITOP), so only candidate ids are passed to the database.
+    If there are more than `max_count` candidates, they aren't decoded and None is returned
+    (a long list of ids is a worse filter than the SQL one).
+    """
+    result_key = f"{REALTY_BITMAPS_KEY_PREFIX}:candidates:{uuid.uuid4().hex}"
+    operand_keys = [get_available_bitmap_key()]
+    temporary_keys = [result_key]
+
+    # bitmaps are binary strings, so they are read by the client, that doesn't decode responses
+    pipe = redis_binary_instance.pipeline(transaction=False)
+    for name, keys in (
+            ('types', [get_type_bitmap_key(realty_type) for realty_type in realty_types]),
+            ('amenities', [get_amenity_bitmap_key(amenity_id) for amenity_id in amenity_ids]),
+    ):
+        if keys:
+            union_key = f"{result_key}:{name}"
+            pipe.bitop('OR', union_key, *keys)
+            operand_keys.append(union_key)
+            temporary_keys.append(union_key)
+    pipe.bitop('AND', result_key, *operand_keys)
+    pipe.bitcount(result_key)
+    pipe.get(result_key)
+    pipe.delete(*temporary_keys)
+    *_, candidates_count, bitmap, _ = pipe.execute()
+
+    if candidates_count > max_count:
+        return None
+    return get_bitmap_ids(bitmap or b'')
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Set
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.text import slugify
+
+from addresses.models import Address
+from hosts.models import RealtyHost
+
+from ..constants import REALTY_BULK_CREATE_BATCH_SIZE, REALTY_BULK_UPDATE_BATCH_SIZE
+from ..models import Amenity, Realty
+from .amenities import invalidate_amenity_catalogue
+
+
+# sent after realty is created in bulk (`bulk_create()` doesn't send `post_save` and `m2m_changed` signals)
+# with `realty` (created objects with their locations) and `amenity_ids` (realty id -> its amenity ids) arguments
+realty_bulk_created = Signal()
+
+# sent after realty is updated in bulk (`bulk_update()` doesn't send `post_save` signals)
+# with `realty` (updated objects with updated fields only) and `fields` (names of updated fields) arguments
+realty_bulk_updated = Signal()
+
+# realty fields, that can be updated in bulk
+REALTY_BULK_UPDATE_FIELDS = ('is_available', 'price_per_night')
+
+
+class RealtyNotFoundError(Exception):
+    """Some realty to update don't exist (or aren't in the given queryset, e.g. belong to another host)."""
+
+    def __init__(self, realty_ids: List[int]):
+        super(RealtyNotFoundError, self).__init__(f"Realty not found: {', '.join(map(str, realty_ids))}")
+        self.realty_ids = realty_ids
+
+
+def get_or_create_amenity_ids(names: Iterable[str]) -> Dict[str, int]:
+    """Return ids of amenities with the given `names` (missing amenities are created).
+
+    Existing amenities are fetched by a single query and missing ones are inserted by a single query
+    (conflicts with amenities created concurrently are ignored, so they are fetched after the insert).
+    """
+    names = set(names)
+    if not names:
+        return {}
+
+    ids_by_name = dict(Amenity.objects.filter(name__in=names).values_list('name', 'id'))
+    if missing_names := names.difference(ids_by_name):
+        Amenity.objects.bulk_create([Amenity(name=name) for name in missing_names], ignore_conflicts=True)
+        ids_by_name.update(Amenity.objects.filter(name__in=missing_names).values_list('name', 'id'))
+        # `post_save` isn't sent by `bulk_create()`
+        transaction.on_commit(invalidate_amenity_catalogue)
+    return ids_by_name
+
+
+def bulk_create_realty(
+        realty_data: List[dict],
+        host: RealtyHost,
+        *,
+        batch_size: int = REALTY_BULK_CREATE_BATCH_SIZE,
+) -> List[Realty]:
+    """Create realty of the `host` from validated `realty_data` (`RealtyBulkCreateSerializer` items).
+
+    Amenities, addresses, realty and their amenities are inserted by batches in a single transaction
+    (`save()` isn't called, so slugs are set here), then `realty_bulk_created` is sent.
+
+    Returns:
+        List[Realty]: created realty in the order of `realty_data`
+    """
+    with transaction.atomic():
+        amenity_ids_by_name = get_or_create_amenity_ids(
+            amenity['name'] for data in realty_data for amenity in data['amenities']
+        )
+
+        locations = Address.objects.bulk_create(
+            [
+                Address(
+                    city_slug=slugify(data['location']['city']),
+                    country_slug=slugify(data['location']['country']),
+                    **data['location'],
+                )
+                for data in realty_data
+            ],
+            batch_size=batch_size,
+        )
+        realty_objects = Realty.objects.bulk_create(
+            [
+                Realty(
+                    slug=slugify(data['name']),
+                    location=location,
+                    host=host,
+                    **{field: value for field, value in data.items() if field not in ('location', 'amenities')},
+                )
+                for data, location in zip(realty_data, locations)
+            ],
+            batch_size=batch_size,
+        )
+
+        amenity_ids = {
+            realty.pk: sorted({amenity_ids_by_name[amenity['name']] for amenity in data['amenities']})
+            for realty, data in zip(realty_objects, realty_data)
+        }
+        Realty.amenities.through.objects.bulk_create(
+            [
+                Realty.amenities.through(realty_id=realty_id, amenity_id=amenity_id)
+                for realty_id, realty_amenity_ids in amenity_ids.items()
+                for amenity_id in realty_amenity_ids
+            ],
+            batch_size=batch_size,
+        )
+
+        realty_bulk_created.send(sender=Realty, realty=realty_objects, amenity_ids=amenity_ids)
+    return realty_objects
+
+
+def bulk_update_realty(
+        changes: List[dict],
+        realty_qs: 'QuerySet[Realty]',
+        *,
+        batch_size: int = REALTY_BULK_UPDATE_BATCH_SIZE,
+) -> List[Realty]:
+    """Apply `changes` (items with `id` and some of `REALTY_BULK_UPDATE_FIELDS`) to realty from `realty_qs`.
+
+    Realty is locked and fetched by a single query (so realty, that isn't in `realty_qs`, is found at once),
+    then updated by `bulk_update()` in a single transaction, and `realty_bulk_updated` is sent.
+
+    Raises:
+        RealtyNotFoundError: if any realty isn't in `realty_qs` (nothing is updated)
+
+    Returns:
+        List[Realty]: updated realty
+    """
+    changes_by_id = {item['id']: item for item in changes}
+    with transaction.atomic():
+        realty_objects = list(
+            realty_qs.filter(pk__in=changes_by_id).select_for_update(of=('self',)).order_by('id').only(
+                'id', *REALTY_BULK_UPDATE_FIELDS,
+            ),
+        )
+        if missing_ids := set(changes_by_id).difference(realty.pk for realty in realty_objects):
+            raise RealtyNotFoundError(sorted(missing_ids))
+
+        # `auto_now` isn't applied by `bulk_update()`
+        updated = timezone.now()
+        fields: Set[str] = set()
+        for realty in realty_objects:
+            for field, value in changes_by_id[realty.pk].items():
+                if field in REALTY_BULK_UPDATE_FIELDS:
+                    setattr(realty, field, value)
+                    fields.add(field)
+            realty.updated = updated
+        Realty.objects.bulk_update(realty_objects, [*sorted(fields), 'updated'], batch_size=batch_size)
+
+        realty_bulk_updated.send(sender=Realty, realty=realty_objects, fields=fields)
+    return realty_objects
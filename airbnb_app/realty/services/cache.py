@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import time
+from collections.abc import Sequence
+from typing import Iterable, List, Mapping, Optional, TypedDict, Union
+
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db.models import F, Func, IntegerField, QuerySet, Value
+
+from common.page_cache import purge_page_cache_tags
+from common.types import ResponseValidators
+
+from ..constants import REALTY_RESULTS_CACHE_MAX_IDS, REALTY_RESULTS_CACHE_TTL
+from ..models import Realty
+
+
+CATALOGUE_VERSION_KEY = 'realty:catalogue:version'
+
+# global version of all realty cards (it is bumped on changes that may affect any card, e.g. amenity renaming)
+REALTY_CARDS_VERSION_KEY = 'realty:cards:version'
+
+# query parameters that affect search/list results
+RESULTS_FINGERPRINT_PARAMS = ('q', 'city_slug', 'realty_type', 'beds_count', 'guests_count', 'amenities')
+
+
+class CachedRealtyResults(TypedDict):
+    ids: List[int]
+    total: int
+
+
+class ArrayPosition(Func):
+    function = 'array_position'
+    output_field = IntegerField()
+
+
+def get_catalogue_version() -> int:
+    """Return global version of the realty catalogue (it is bumped on every realty/address/amenities/host change)."""
+    cache.add(CATALOGUE_VERSION_KEY, 1, timeout=None)
+    return int(cache.get(CATALOGUE_VERSION_KEY, 1))
+
+
+def bump_catalogue_version() -> int:
+    """Invalidate all cached search/list results."""
+    cache.add(CATALOGUE_VERSION_KEY, 1, timeout=None)
+    return cache.incr(CATALOGUE_VERSION_KEY)
+
+
+def get_realty_card_version_key(realty_id: int) -> str:
+    return f"realty:card:version:{realty_id}"
+
+
+def bump_realty_cards_version(realty_ids: Optional[Iterable[int]] = None) -> None:
+    """Invalidate cached cards of the realty with the given `realty_ids` (or all cards) by a single multi-set.
+
+    Versions are timestamps of the changes, so they are also modification times of the realty
+    (see `get_realty_validators()`).
+    """
+    if realty_ids is None:
+        version_keys = [REALTY_CARDS_VERSION_KEY]
+    else:
+        version_keys = [get_realty_card_version_key(realty_id) for realty_id in realty_ids]
+    if version_keys:
+        version = f"{time.time():.6f}"
+        cache.set_many({version_key: version for version_key in version_keys}, timeout=None)
+
+
+def get_version_modified(version: str) -> Optional[datetime.datetime]:
+    """Return the modification time of the cards `version` (None for versions that aren't timestamps)."""
+    try:
+        return datetime.datetime.fromtimestamp(float(version), tz=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+
+def get_realty_validators(realty_id: int) -> Optional[ResponseValidators]:
+    """Return ETag and Last-Modified of the available realty (None if it isn't available).
+
+    They are taken from `updated` (a single indexed query) and the realty cards versions (a single cache lookup),
+    that are bumped on changes of related objects, that have no `updated` (images, address, amenities,
+    the host and its user and profile), and on visits flushes.
+    """
+    updated = Realty.available.filter(pk=realty_id).values_list('updated', flat=True).first()
+    if updated is None:
+        return None
+
+    version_keys = [get_realty_card_version_key(realty_id), REALTY_CARDS_VERSION_KEY]
+    versions = cache.get_many(version_keys)
+    versions_modified = [get_version_modified(version) for version in versions.values()]
+    return ResponseValidators(
+        etag=':'.join((str(realty_id), updated.isoformat(), *(versions.get(key, '') for key in version_keys))),
+        last_modified=max([updated, *filter(None, versions_modified)]),
+    )
+
+
+def get_realty_collection_validators(fingerprint: str) -> ResponseValidators:
+    """Return ETag of a realty collection (e.g. an API page) with the `fingerprint` by the catalogue version."""
+    return ResponseValidators(etag=f"{get_catalogue_version()}:{fingerprint}", last_modified=None)
+
+
+def get_realty_page_cache_tag(realty_id: int) -> str:
+    return f"realty:{realty_id}"
+
+
+def invalidate_rendered_realty(realty_ids: Optional[Iterable[int]] = None) -> None:
+    """Invalidate cached cards and pages of the realty with the given `realty_ids` (or of all realty).
+
+    Pages are purged by tags of the `PAGE_CACHE_URLS` setting: `realty-list` (lists of realty),
+    `realty:<id>` (a detail page) and `realty` (all realty pages).
+    """
+    if realty_ids is None:
+        bump_realty_cards_version()
+        purge_page_cache_tags(['realty'])
+        return
+
+    realty_ids = list(realty_ids)
+    if realty_ids:
+        bump_realty_cards_version(realty_ids)
+        purge_page_cache_tags(['realty-list', *map(get_realty_page_cache_tag, realty_ids)])
+
+
+def invalidate_host_realty(realty_ids: Iterable[int]) -> None:
+    """Invalidate cached results and rendered realty of a changed host (hosts are rendered with their realty)."""
+    realty_ids = list(realty_ids)
+    if realty_ids:
+        bump_catalogue_version()
+        invalidate_rendered_realty(realty_ids)
+
+
+def get_results_fingerprint(scope: str, params: Mapping[str, Iterable[str]]) -> str:
+    """Return a normalized fingerprint of the query parameters (`params`) for the given `scope` (e.g. `search`).
+
+    Parameters' order, blank and repeated values (and also letter case and whitespaces of the search query)
+    don't change the fingerprint.
+    """
+    normalized_params = {}
+    for name in RESULTS_FINGERPRINT_PARAMS:
+        values = {str(value) for value in params.get(name, ())}
+        if name == 'q':
+            values = {" ".join(value.lower().split()) for value in values}
+        values = sorted(values - {''})
+        if values:
+            normalized_params[name] = values
+    digest = hashlib.md5(json.dumps(normalized_params, sort_keys=True).encode()).hexdigest()
+    return f"realty:results:{scope}:{digest}"
+
+
+def get_cached_realty_results(
+        fingerprint: str,
+        realty_qs: 'QuerySet[Realty]',
+        *,
+        max_ids: int = REALTY_RESULTS_CACHE_MAX_IDS,
+) -> CachedRealtyResults:
+    """Return ordered ids and the total count of `realty_qs`, cached by the `fingerprint` and catalogue version.
+
+    Only the first `max_ids` ids are cached.
+    """
+    version = get_catalogue_version()
+    results: Optional[CachedRealtyResults] = cache.get(fingerprint, version=version)
+    if results is None:
+        ids = list(realty_qs.values_list('id', flat=True)[:max_ids])
+        total = len(ids) if len(ids) < max_ids else realty_qs.count()
+        results = CachedRealtyResults(ids=ids, total=total)
+        cache.set(fingerprint, results, REALTY_RESULTS_CACHE_TTL, version=version)
+    return results
+
+
+class CachedRealtyIds(Sequence):
+    """All ids of `realty_qs` as a sequence (e.g. for a paginator).
+
+    Ids within the cached `results` are taken from the cache, ids past them
+    (only the first `REALTY_RESULTS_CACHE_MAX_IDS` are cached) are fetched from the DB.
+    """
+
+    def __init__(self, results: CachedRealtyResults, realty_qs: 'QuerySet[Realty]'):
+        self.results = results
+        self.realty_qs = realty_qs
+
+    def __len__(self):
+        return self.results['total']
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, List[int]]:
+        if not isinstance(index, slice):
+            ids = self[index:index + 1] if index >= 0 else self[len(self) + index:len(self) + index + 1]
+            if not ids:
+                raise IndexError("Realty id index out of range")
+            return ids[0]
+
+        start, stop, step = index.indices(len(self))
+        cached_ids = self.results['ids']
+        if stop <= len(cached_ids):
+            return cached_ids[start:stop:step]
+        return list(self.realty_qs.values_list('id', flat=True)[start:stop])[::step]
+
+
+def get_cached_realty_count(fingerprint: str, realty_qs: 'QuerySet[Realty]') -> int:
+    """Return count of `realty_qs`, cached by the `fingerprint` and catalogue version."""
+    version = get_catalogue_version()
+    count: Optional[int] = cache.get(fingerprint, version=version)
+    if count is None:
+        count = realty_qs.count()
+        cache.set(fingerprint, count, REALTY_RESULTS_CACHE_TTL, version=version)
+    return count
+
+
+def get_realty_by_ordered_ids(ids: List[int], realty_qs: Optional['QuerySet[Realty]'] = None) -> 'QuerySet[Realty]':
+    """Return available realty with the given `ids` in the same order."""
+    if realty_qs is None:
+        realty_qs = Realty.available.all()
+    if not ids:
+        return realty_qs.none()
+    return realty_qs.filter(id__in=ids).order_by(
+        ArrayPosition(Value(ids, output_field=ArrayField(IntegerField())), F('id')),
+    )
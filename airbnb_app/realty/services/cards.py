@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+
+from ..constants import REALTY_CARD_CACHE_TTL
+from ..models import Realty
+from .cache import REALTY_CARDS_VERSION_KEY, get_realty_card_version_key
+from .realty import get_listing_cards
+
+
+REALTY_CARD_TEMPLATE = 'realty/realty/card.html'
+
+
+def get_realty_cards(
+        realty_ids: Iterable[int],
+        *,
+        template_name: str = REALTY_CARD_TEMPLATE,
+        context: Optional[Dict[str, Any]] = None,
+) -> List[SafeString]:
+    """Return rendered cards of the realty with the given `realty_ids` (in the same order).
+
+    Cards are cached by the realty id, the realty card version and the global cards version
+    (also by the template and its `context`), so a page of cached cards costs two cache multi-gets:
+    one for the versions and one for the cards. Missing cards are rendered from a single `get_listing_cards()`
+    query and cached by a single multi-set. Ids of deleted realty are skipped.
+    """
+    realty_ids = list(realty_ids)
+    if not realty_ids:
+        return []
+    context = context or {}
+
+    version_keys = {realty_id: get_realty_card_version_key(realty_id) for realty_id in realty_ids}
+    versions = cache.get_many([REALTY_CARDS_VERSION_KEY, *version_keys.values()])
+    cards_version = versions.get(REALTY_CARDS_VERSION_KEY, 0)
+    variant = hashlib.md5(json.dumps([template_name, context], sort_keys=True, default=str).encode()).hexdigest()
+    card_keys = {
+        realty_id: f"realty:card:{variant}:{realty_id}:{versions.get(version_key, 0)}:{cards_version}"
+        for realty_id, version_key in version_keys.items()
+    }
+
+    cards: Dict[str, str] = cache.get_many(list(card_keys.values()))
+    missing_ids = [realty_id for realty_id, card_key in card_keys.items() if card_key not in cards]
+    if missing_ids:
+        rendered_cards = {
+            card_keys[realty.id]: render_to_string(template_name, {**context, 'realty': realty})
+            for realty in get_listing_cards(Realty.objects.filter(id__in=missing_ids))
+        }
+        cache.set_many(rendered_cards, REALTY_CARD_CACHE_TTL)
+        cards.update(rendered_cards)
+
+    return [mark_safe(cards[card_keys[realty_id]]) for realty_id in realty_ids if card_keys[realty_id] in cards]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import uuid
+from typing import Dict, List
+
+from django.db.models import Count, Sum
+
+from configs.redis_conf import redis_instance
+
+from ..constants import CITY_POPULARITY_NEW_REALTY_SCORE, CITY_POPULARITY_VISIT_SCORE
+from ..models import Realty
+
+
+CITIES_POPULARITY_KEY = 'realty:cities:popularity'
+
+
+def increment_city_popularity(city: str, score: float = CITY_POPULARITY_VISIT_SCORE) -> float:
+    return float(redis_instance.zincrby(CITIES_POPULARITY_KEY, score, city))
+
+
+def get_most_popular_cities(cities_count: int) -> List[str]:
+    """Return `cities_count` cities with the highest popularity (by realty visits and new realty)."""
+    if cities_count < 1:
+        return []
+    return list(redis_instance.zrevrange(CITIES_POPULARITY_KEY, 0, cities_count - 1))
+
+
+def rebuild_cities_popularity() -> int:
+    """Rebuild cities popularity ranking from DB (available realty count and their visits).
+
+    Returns:
+        int: number of ranked cities
+    """
+    cities_scores: Dict[str, float] = {
+        city: visits_count * CITY_POPULARITY_VISIT_SCORE + realty_count * CITY_POPULARITY_NEW_REALTY_SCORE
+        for city, visits_count, realty_count in Realty.available.order_by().values(
+            'location__city',
+        ).annotate(
+            total_visits_count=Sum('visits_count'),
+            realty_count=Count('id'),
+        ).values_list('location__city', 'total_visits_count', 'realty_count')
+    }
+
+    if not cities_scores:
+        redis_instance.delete(CITIES_POPULARITY_KEY)
+        return 0
+
+    # build the new ranking aside and swap it atomically
+    rebuild_key = f"{CITIES_POPULARITY_KEY}:rebuild:{uuid.uuid4().hex}"
+    pipe = redis_instance.pipeline(transaction=True)
+    pipe.zadd(rebuild_key, cities_scores)
+    pipe.rename(rebuild_key, CITIES_POPULARITY_KEY)
+    pipe.execute()
+    return len(cities_scores)
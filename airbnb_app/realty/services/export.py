@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import itertools
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from ..constants import REALTY_EXPORT_CHUNK_SIZE
+from ..models import Realty
+
+
+# exported columns and their lookups (a flat projection of realty with its location)
+REALTY_EXPORT_COLUMNS: Dict[str, str] = {
+    'id': 'id',
+    'name': 'name',
+    'slug': 'slug',
+    'description': 'description',
+    'realty_type': 'realty_type',
+    'beds_count': 'beds_count',
+    'max_guests_count': 'max_guests_count',
+    'price_per_night': 'price_per_night',
+    'created': 'created',
+    'updated': 'updated',
+    'country': 'location__country',
+    'city': 'location__city',
+    'street': 'location__street',
+    'latitude': 'location__latitude',
+    'longitude': 'location__longitude',
+    'host_id': 'host_id',
+}
+
+
+class EchoBuffer:
+    """File-like object, that returns written values instead of buffering them (for `csv.writer`)."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_realty_export_rows(
+        realty_qs: 'QuerySet[Realty]',
+        *,
+        chunk_size: int = REALTY_EXPORT_CHUNK_SIZE,
+) -> Iterator[Tuple[Any, ...]]:
+    """Iterate over export rows of `realty_qs` ordered by id.
+
+    Rows are read by a server-side cursor `chunk_size` rows at a time, so memory usage doesn't depend
+    on the number of rows (and model instances aren't created).
+    """
+    return realty_qs.order_by('id').values_list(*REALTY_EXPORT_COLUMNS.values()).iterator(chunk_size=chunk_size)
+
+
+def _join_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[str]:
+    lines = iter(lines)
+    while chunk := ''.join(itertools.islice(lines, chunk_size)):
+        yield chunk
+
+
+def iter_realty_ndjson(realty_qs: 'QuerySet[Realty]', *, chunk_size: int = REALTY_EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Stream `realty_qs` as newline delimited JSON (an object per line), `chunk_size` lines per chunk."""
+    columns = tuple(REALTY_EXPORT_COLUMNS)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = (
+        f"{encoder.encode(dict(zip(columns, row)))}\n"
+        for row in iter_realty_export_rows(realty_qs, chunk_size=chunk_size)
+    )
+    return _join_chunks(lines, chunk_size)
+
+
+def iter_realty_csv(realty_qs: 'QuerySet[Realty]', *, chunk_size: int = REALTY_EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Stream `realty_qs` as CSV with a header, `chunk_size` lines per chunk (the header is sent at once)."""
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(REALTY_EXPORT_COLUMNS)
+    lines = (
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime.datetime) else value
+            for value in row
+        ])
+        for row in iter_realty_export_rows(realty_qs, chunk_size=chunk_size)
+    )
+    yield from _join_chunks(lines, chunk_size)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TypedDict
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import QueryDict
+
+from ..constants import FACETS_PRICE_BUCKET_SIZE, REALTY_RESULTS_CACHE_TTL
+from ..models import Realty, RealtyTypeChoices
+from .cache import get_catalogue_version, get_results_fingerprint
+from .realty import get_filtered_available_realty
+
+
+class PriceFacet(TypedDict):
+    min_price: int
+    max_price: int
+    count: int
+
+
+class RealtyFacets(TypedDict):
+    total: int
+    realty_type: Dict[str, int]
+    amenities: Dict[int, int]
+    beds_count: Dict[int, int]
+    guests_count: Dict[int, int]
+    price_per_night: List[PriceFacet]
+
+
+# Every grouping set is a separate facet, so all facets are counted by a single scan of the filtered realty.
+# Amenities are joined for their own facet only, hence `COUNT(DISTINCT ...)`.
+REALTY_FACETS_SQL = """
+    SELECT
+        realty.realty_type,
+        realty_amenities.amenity_id,
+        realty.beds_count,
+        realty.max_guests_count,
+        realty.price_per_night / {price_bucket_size},
+        GROUPING(realty.realty_type),
+        GROUPING(realty_amenities.amenity_id),
+        GROUPING(realty.beds_count),
+        GROUPING(realty.max_guests_count),
+        GROUPING(realty.price_per_night / {price_bucket_size}),
+        COUNT(DISTINCT realty.id)
+    FROM {realty_table} AS realty
+    LEFT JOIN {amenities_table} AS realty_amenities ON realty_amenities.realty_id = realty.id
+    WHERE realty.id IN ({realty_ids_sql})
+    GROUP BY GROUPING SETS (
+        (),
+        (realty.realty_type),
+        (realty_amenities.amenity_id),
+        (realty.beds_count),
+        (realty.max_guests_count),
+        (realty.price_per_night / {price_bucket_size})
+    )
+"""
+
+
+def get_realty_facets(realty_qs: 'QuerySet[Realty]') -> RealtyFacets:
+    """Count `realty_qs` by realty type, amenities, beds count, guests count and price buckets.
+
+    All counts are calculated by a single `GROUP BY GROUPING SETS` query.
+    """
+    realty_ids_sql, params = realty_qs.order_by().values('id').query.sql_with_params()
+    sql = REALTY_FACETS_SQL.format(
+        price_bucket_size=int(FACETS_PRICE_BUCKET_SIZE),
+        realty_table=connection.ops.quote_name(Realty._meta.db_table),
+        amenities_table=connection.ops.quote_name(Realty.amenities.through._meta.db_table),
+        realty_ids_sql=realty_ids_sql,
+    )
+
+    facets = RealtyFacets(
+        total=0,
+        realty_type={realty_type: 0 for realty_type in RealtyTypeChoices.values},
+        amenities={},
+        beds_count={},
+        guests_count={},
+        price_per_night=[],
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    for (
+            realty_type, amenity_id, beds_count, guests_count, price_bucket,
+            is_not_type, is_not_amenity, is_not_beds, is_not_guests, is_not_price,
+            count,
+    ) in rows:
+        if not is_not_type:
+            facets['realty_type'][realty_type] = count
+        elif not is_not_amenity:
+            if amenity_id is not None:  # realty without amenities
+                facets['amenities'][amenity_id] = count
+        elif not is_not_beds:
+            facets['beds_count'][beds_count] = count
+        elif not is_not_guests:
+            facets['guests_count'][guests_count] = count
+        elif not is_not_price:
+            facets['price_per_night'].append(PriceFacet(
+                min_price=price_bucket * FACETS_PRICE_BUCKET_SIZE,
+                max_price=(price_bucket + 1) * FACETS_PRICE_BUCKET_SIZE - 1,
+                count=count,
+            ))
+        else:
+            facets['total'] = count
+
+    facets['price_per_night'].sort(key=lambda price_facet: price_facet['min_price'])
+    return facets
+
+
+def get_cached_realty_facets(query_params: QueryDict) -> RealtyFacets:
+    """Return facet counts of available realty filtered by the `query_params`.
+
+    Facets are cached with the search/list results, i.e. by the query parameters' fingerprint and catalogue version.
+    """
+    fingerprint = get_results_fingerprint('facets', dict(query_params.lists()))
+    version = get_catalogue_version()
+
+    facets: Optional[RealtyFacets] = cache.get(fingerprint, version=version)
+    if facets is None:
+        facets = get_realty_facets(
+            get_filtered_available_realty(
+                query_params,
+                query=query_params.get('q', None),
+                city_slug=query_params.get('city_slug', None),
+            ),
+        )
+        cache.set(fingerprint, facets, REALTY_RESULTS_CACHE_TTL, version=version)
+    return facets
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import math
+from decimal import Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional, TypedDict
+
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+from django.urls import reverse
+
+from ..constants import REALTY_MAP_MAX_MARKERS
+from ..models import Realty
+
+
+# mean radius of the Earth (in km)
+EARTH_RADIUS_KM = 6371.0088
+
+# length of a latitude degree (in km)
+LATITUDE_DEGREE_KM = 111.32
+
+
+class RealtyMapMarker(TypedDict):
+    id: int
+    name: str
+    url: str
+    realty_type: str
+    price_per_night: int
+    latitude: float
+    longitude: float
+
+
+class BoundingBox(NamedTuple):
+    """Map viewport: `west` and `east` are longitudes, `south` and `north` are latitudes."""
+
+    west: Decimal
+    south: Decimal
+    east: Decimal
+    north: Decimal
+
+
+def parse_bbox(value: str) -> BoundingBox:
+    """Parse a bounding box in the `west,south,east,north` format (e.g. `37.3,55.5,37.9,56.0`).
+
+    Raises:
+        ValueError: if `value` isn't a valid bounding box
+    """
+    try:
+        bbox = BoundingBox(*(Decimal(coordinate.strip()) for coordinate in value.split(',')))
+    except (TypeError, InvalidOperation):
+        raise ValueError("Bounding box should be in the `west,south,east,north` format")
+
+    if not all(coordinate.is_finite() for coordinate in bbox):
+        raise ValueError("Bounding box coordinates should be finite numbers")
+    if not all(-180 <= longitude <= 180 for longitude in (bbox.west, bbox.east)):
+        raise ValueError("Longitude should be between -180 and 180")
+    if not all(-90 <= latitude <= 90 for latitude in (bbox.south, bbox.north)):
+        raise ValueError("Latitude should be between -90 and 90")
+    if bbox.south > bbox.north:
+        raise ValueError("South latitude should be less than or equal to the north one")
+    return bbox
+
+
+def get_bbox_around(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """Return the smallest bounding box that contains a circle of `radius_km` around the point."""
+    latitude_delta = radius_km / LATITUDE_DEGREE_KM
+    south, north = max(latitude - latitude_delta, -90), min(latitude + latitude_delta, 90)
+
+    latitude_cos = math.cos(math.radians(max(abs(south), abs(north))))
+    longitude_delta = radius_km / (LATITUDE_DEGREE_KM * latitude_cos) if latitude_cos > 0 else 180
+    if longitude_delta >= 180:  # circle covers a pole
+        west, east = -180, 180
+    else:
+        west, east = longitude - longitude_delta, longitude + longitude_delta
+        # wrap around the antimeridian
+        west = west + 360 if west < -180 else west
+        east = east - 360 if east > 180 else east
+
+    return BoundingBox(*(Decimal(str(round(coordinate, 6))) for coordinate in (west, south, east, north)))
+
+
+def get_realty_in_bbox(bbox: BoundingBox, realty_qs: Optional['QuerySet[Realty]'] = None) -> 'QuerySet[Realty]':
+    """Filter available realty (or `realty_qs`) located inside the `bbox`.
+
+    Uses the `(latitude, longitude)` index of addresses.
+    """
+    if realty_qs is None:
+        realty_qs = Realty.available.all()
+
+    longitude_condition = Q(location__longitude__range=(bbox.west, bbox.east))
+    if bbox.west > bbox.east:  # bounding box crosses the antimeridian
+        longitude_condition = Q(location__longitude__gte=bbox.west) | Q(location__longitude__lte=bbox.east)
+
+    return realty_qs.filter(longitude_condition, location__latitude__range=(bbox.south, bbox.north))
+
+
+def get_realty_within_radius(
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        realty_qs: Optional['QuerySet[Realty]'] = None,
+) -> 'QuerySet[Realty]':
+    """Filter available realty (or `realty_qs`) within `radius_km` of the point, ordered by `distance` (in km).
+
+    Candidates are taken by the (indexed) bounding box of the circle, the exact (haversine) distance
+    is calculated for them only.
+    """
+    realty_qs = get_realty_in_bbox(get_bbox_around(latitude, longitude, radius_km), realty_qs)
+
+    realty_latitude = Radians(Cast(F('location__latitude'), FloatField()))
+    realty_longitude = Radians(Cast(F('location__longitude'), FloatField()))
+    point_latitude = Value(math.radians(latitude), output_field=FloatField())
+    point_longitude = Value(math.radians(longitude), output_field=FloatField())
+
+    haversine = (
+        Power(Sin((realty_latitude - point_latitude) / 2), 2) +
+        Cos(point_latitude) * Cos(realty_latitude) * Power(Sin((realty_longitude - point_longitude) / 2), 2)
+    )
+    return realty_qs.annotate(
+        distance=2 * EARTH_RADIUS_KM * ASin(Sqrt(haversine)),
+    ).filter(distance__lte=radius_km).order_by('distance')
+
+
+def get_realty_map_markers(
+        bbox: BoundingBox,
+        realty_qs: Optional['QuerySet[Realty]'] = None,
+        *,
+        limit: int = REALTY_MAP_MAX_MARKERS,
+) -> List[RealtyMapMarker]:
+    """Return map markers of available realty (or `realty_qs`) inside the `bbox` (at most `limit` markers)."""
+    realty_rows = get_realty_in_bbox(bbox, realty_qs).order_by().values_list(
+        'id', 'name', 'slug', 'realty_type', 'price_per_night', 'location__latitude', 'location__longitude',
+    )[:limit]
+    return [
+        RealtyMapMarker(
+            id=realty_id,
+            name=name,
+            url=reverse('realty:detail', kwargs={'pk': realty_id, 'slug': slug}),
+            realty_type=realty_type,
+            price_per_night=price_per_night,
+            latitude=float(latitude),
+            longitude=float(longitude),
+        )
+        for realty_id, name, slug, realty_type, price_per_night, latitude, longitude in realty_rows
+    ]
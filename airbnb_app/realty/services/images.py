@@ -12,6 +12,11 @@ def get_image_by_id(image_id: Union[int, str]) -> 'CustomDeleteQueryset[RealtyIm
     return RealtyImage.objects.filter(id=image_id)
 
 
+def get_realty_image_url(image_path: str) -> str:
+    """Return url of the RealtyImage with the given `image_path` (without fetching the image object)."""
+    return RealtyImage._meta.get_field('image').storage.url(image_path)
+
+
 def update_images_order(new_order: List[ImageOrder]) -> None:
     """Update images order with the given `new_order`."""
     for image_order in new_order:
@@ -1,23 +1,46 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple, Union
+import itertools
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict, Union
 
 from django.conf import settings
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db.models import F, QuerySet
+from django.db import DatabaseError, connection
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.http import QueryDict
+from django.utils import timezone
 
+from addresses.models import Address
 from common.session_handler import SessionHandler
 from configs.redis_conf import redis_instance
 from hosts.models import RealtyHost
 
-from ..constants import REALTY_FORM_SESSION_PREFIX
-from ..models import Amenity, Realty
+from ..constants import (
+    CITY_POPULARITY_VISIT_SCORE, REALTY_DAILY_VISITORS_TTL, REALTY_FORM_SESSION_PREFIX, REALTY_TRENDING_BUCKET_TTL,
+    REALTY_VISITS_FLUSH_BATCH_SIZE,
+)
+from ..filters import RealtyShortFilter
+from ..models import Amenity, Realty, RealtyImage, RealtyView
+from .amenities import get_amenity_catalogue
+from .bitmaps import get_candidate_realty_ids, is_realty_bitmap_index_enabled
+from .cache import bump_realty_cards_version
+from .cities import CITIES_POPULARITY_KEY
+from .trending import get_visits_bucket, get_visits_bucket_key
+from .visitors import get_daily_visitors_key
+from .visits_buffer import is_realty_visits_buffer_enabled, realty_visits_buffer
 
 
-def get_amenity_ids_from_session(session_handler: SessionHandler) -> Optional[QuerySet[int]]:
+logger = logging.getLogger(__name__)
+
+
+def get_amenity_ids_from_session(session_handler: SessionHandler) -> Optional[List[int]]:
     amenities = session_handler.get_session().get(f"{REALTY_FORM_SESSION_PREFIX}_amenities", None)
     if amenities:
-        amenities = Amenity.objects.filter(name__in=[*amenities]).values_list('id', flat=True)
+        ids_by_name = get_amenity_catalogue().ids_by_name
+        amenities = [ids_by_name[name] for name in amenities if name in ids_by_name]
     return amenities
 
 
@@ -33,6 +56,13 @@ def get_available_realty_by_host(realty_host: RealtyHost) -> 'QuerySet[Realty]':
     return Realty.available.filter(host=realty_host)
 
 
+def get_realty_editable_by_user(user: settings.AUTH_USER_MODEL) -> 'QuerySet[Realty]':
+    """Return realty, that the `user` can edit (realty of the user's host, or all realty for superusers)."""
+    if user.is_superuser:
+        return Realty.objects.all()
+    return Realty.objects.filter(host__user=user)
+
+
 def get_available_realty_by_ids(ids: list[int | str]) -> 'QuerySet[Realty]':
     return Realty.available.filter(id__in=ids)
 
@@ -67,6 +97,20 @@ def get_n_latest_available_realty_ids(realty_count: int) -> 'QuerySet[Realty]':
     return Realty.available.values_list('id', flat=True)[:realty_count]
 
 
+def get_available_flat_realty() -> 'QuerySet[RealtyView]':
+    """Return flat (denormalized) rows of all available realty from the `realty_view` materialized view."""
+    return RealtyView.objects.filter(is_available=True)
+
+
+def refresh_realty_view(concurrently: bool = True) -> None:
+    """Refresh `realty_view` materialized view.
+
+    A concurrent refresh doesn't lock out readers of the view.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY' if concurrently else ''} realty_view")
+
+
 def get_available_realty_count_by_city(city: str) -> int:
     return Realty.available.filter(location__city__iexact=city).count()
 
@@ -75,6 +119,7 @@ def get_available_realty_search_results(query: Optional[str] = None) -> 'QuerySe
     """Get all available realty filtered by a `query`.
 
     If `query` isn't passed, return all available realty objects.
+    Realty is matched against the stored (GIN-indexed) `search_vector`, so only matched rows are ranked.
 
     Args:
         query(Optional[str]): search query
@@ -83,19 +128,207 @@ def get_available_realty_search_results(query: Optional[str] = None) -> 'QuerySe
         CustomDeleteQueryset[Realty]: filtered realty
     """
     if query:
-        search_vector = (
-            SearchVector('name', weight='A') +
-            SearchVector('location__city', weight='B') +
-            SearchVector('description', weight='B')
-        )
         search_query = SearchQuery(query.lower())
 
-        return Realty.available.annotate(
-            rank=SearchRank(search_vector, search_query),
+        return Realty.available.filter(
+            search_vector=search_query,
+        ).annotate(
+            rank=SearchRank(F('search_vector'), search_query),
         ).filter(rank__gte=0.2).order_by('-rank')
     return Realty.available.all()
 
 
+def get_filtered_available_realty(
+        query_params: QueryDict,
+        *,
+        query: Optional[str] = None,
+        city_slug: Optional[str] = None,
+) -> 'QuerySet[Realty]':
+    """Get all available realty filtered by the search `query`, the `city_slug` and the filter form `query_params`.
+
+    Args:
+        query_params(QueryDict): query parameters (`realty_type`, `beds_count`, `guests_count`, `amenities`)
+        query(Optional[str]): search query
+        city_slug(Optional[str]): slug of the realty city
+
+    Returns:
+        CustomDeleteQueryset[Realty]: filtered realty
+    """
+    available_realty = get_available_realty_search_results(query)
+
+    if city_slug:
+        available_realty = get_available_realty_by_city_slug(city_slug=city_slug, realty_qs=available_realty)
+
+    realty_types: List[str] = query_params.getlist('realty_type', None)
+    amenity_ids = [int(amenity_id) for amenity_id in query_params.getlist('amenities') if amenity_id.isdigit()]
+
+    candidate_ids = None
+    if is_realty_bitmap_index_enabled() and (realty_types or amenity_ids):
+        # None if too many realty match (they are filtered by SQL then)
+        candidate_ids = get_candidate_realty_ids(realty_types=realty_types, amenity_ids=amenity_ids)
+
+    if candidate_ids is not None:
+        # types and amenities are matched by Redis bitmaps instead of the `realty_type` filter and amenities joins
+        available_realty = available_realty.filter(id__in=candidate_ids)
+        query_params = query_params.copy()
+        query_params.pop('amenities', None)
+    elif realty_types:
+        available_realty = get_available_realty_filtered_by_type(
+            realty_types=realty_types,
+            realty_qs=available_realty,
+        )
+
+    return RealtyShortFilter(data=query_params, queryset=available_realty).qs
+
+
+def update_realty_search_vector(realty_qs: 'QuerySet[Realty]') -> int:
+    """Rebuild the stored `search_vector` of realty objects from `realty_qs`.
+
+    Returns:
+        int: number of updated realty objects
+    """
+    location_city = Address.objects.filter(pk=OuterRef('location_id')).values('city')[:1]
+    return realty_qs.order_by().update(
+        search_vector=(
+            SearchVector('name', weight='A') +
+            SearchVector(Subquery(location_city), weight='B') +
+            SearchVector('description', weight='B')
+        ),
+    )
+
+
+def get_listing_cards(realty_qs: 'QuerySet[Realty]') -> 'QuerySet[Realty]':
+    """Project `realty_qs` onto the fields that are rendered in a realty card.
+
+    Every realty object gets `first_image_path` (path of the first image by `order`)
+    and `amenities_count` annotations, `location` is joined and amenities are prefetched,
+    so rendering a page of cards costs a constant number of queries.
+
+    Args:
+        realty_qs(QuerySet[Realty]): realty to build cards from
+
+    Returns:
+        QuerySet[Realty]: realty 'cards'
+    """
+    first_image_path = RealtyImage.objects.filter(
+        realty_id=OuterRef('pk'),
+    ).order_by('order').values('image')[:1]
+    amenities_count = Realty.amenities.through.objects.filter(
+        realty_id=OuterRef('pk'),
+    ).order_by().values('realty_id').annotate(count=Count('pk')).values('count')
+
+    return realty_qs.select_related(
+        'location',
+    ).prefetch_related(
+        Prefetch('amenities', queryset=Amenity.objects.only('id', 'name')),
+    ).only(
+        'id', 'name', 'slug', 'created', 'realty_type', 'beds_count', 'max_guests_count', 'price_per_night',
+        'visits_count', 'location__street',
+    ).annotate(
+        first_image_path=Subquery(first_image_path),
+        amenities_count=Coalesce(Subquery(amenities_count, output_field=IntegerField()), 0),
+    )
+
+
+def get_realty_details(realty_qs: 'QuerySet[Realty]') -> 'QuerySet[Realty]':
+    """Load everything that is rendered on the realty detail page together with the realty.
+
+    `location` and `host__user__profile` are joined, ordered images and amenities are prefetched,
+    so the detail page is rendered by a single realty fetch (+ 2 prefetch queries).
+    """
+    return realty_qs.select_related(
+        'location', 'host__user__profile',
+    ).prefetch_related(
+        Prefetch('images', queryset=RealtyImage.objects.order_by('order')),
+        'amenities',
+    )
+
+
+def get_realty_api_details(
+        realty_qs: 'QuerySet[Realty]',
+        *,
+        fields: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+) -> 'QuerySet[Realty]':
+    """Load everything that `RealtySerializer` renders together with the realty.
+
+    `location` and `host__user__profile` are joined and amenities are prefetched,
+    so any number of realty is serialized by 2 queries.
+    With `fields` (a sparse fieldset), only their columns are loaded, and only relations from `expand` are joined
+    (relations that aren't expanded are loaded as ids, amenities aren't prefetched if they aren't requested).
+    """
+    if fields is None:
+        return realty_qs.select_related(
+            'location', 'host__user__profile',
+        ).prefetch_related(
+            Prefetch('amenities', queryset=Amenity.objects.only('id', 'name')),
+        )
+
+    fields = set(fields)
+    expand = set(fields.intersection(('location', 'host', 'amenities')) if expand is None else expand)
+    realty_qs = realty_qs.only('id', *fields.difference(('amenities',)))
+    if 'location' in fields and 'location' in expand:
+        realty_qs = realty_qs.select_related('location')
+    if 'host' in fields and 'host' in expand:
+        realty_qs = realty_qs.select_related('host__user__profile')
+    if 'amenities' in fields:
+        amenity_fields = ('id', 'name') if 'amenities' in expand else ('id',)
+        realty_qs = realty_qs.prefetch_related(Prefetch('amenities', queryset=Amenity.objects.only(*amenity_fields)))
+    return realty_qs
+
+
+def get_realty_amenity_ids(realty_ids: List[int]) -> Dict[int, List[int]]:
+    """Return amenity ids of every realty with the given `realty_ids` by a single query (without joining amenities)."""
+    amenity_ids: Dict[int, List[int]] = {realty_id: [] for realty_id in realty_ids}
+    for realty_id, amenity_id in Realty.amenities.through.objects.filter(
+            realty_id__in=realty_ids,
+    ).order_by('realty_id', 'amenity_id').values_list('realty_id', 'amenity_id'):
+        amenity_ids[realty_id].append(amenity_id)
+    return amenity_ids
+
+
+def register_realty_visit(realty: Realty, visitor_id: str) -> int:
+    """Count a detail page visit in a single Redis round trip.
+
+    Increments the visits counter, adds the visitor to today's unique visitors,
+    counts the visit in the current trending bucket and increments popularity of the realty city.
+    If `REALTY_VISITS_BUFFER_ENABLED` is set, the visit is buffered in the process memory instead
+    and written to Redis with other visits by the buffer (see `RealtyVisitsBuffer`) without network I/O.
+
+    Returns:
+        int: realty visits count that hasn't been flushed to DB yet
+        (with the buffer enabled, it's known as of the last flush of this process, see `RealtyVisitsBuffer.add()`)
+    """
+    if is_realty_visits_buffer_enabled():
+        return realty_visits_buffer.add(realty, visitor_id)
+
+    daily_visitors_key = get_daily_visitors_key(realty.id, timezone.localdate())
+    visits_bucket_key = get_visits_bucket_key(get_visits_bucket())
+
+    pipe = redis_instance.pipeline(transaction=False)
+    pipe.incr(f"realty:{str(realty.id)}:views_count")
+    pipe.pfadd(daily_visitors_key, visitor_id)
+    pipe.expire(daily_visitors_key, REALTY_DAILY_VISITORS_TTL)
+    pipe.zincrby(visits_bucket_key, 1, realty.id)
+    pipe.expire(visits_bucket_key, REALTY_TRENDING_BUCKET_TTL)
+    pipe.zincrby(CITIES_POPULARITY_KEY, CITY_POPULARITY_VISIT_SCORE, realty.location.city)
+    cached_visits_count, *_ = pipe.execute()
+
+    return int(cached_visits_count)
+
+
+def register_realty_visit_by_id(realty_id: Union[int, str], visitor_id: str) -> Optional[int]:
+    """Count a detail page visit of the available realty with `realty_id` (e.g. the page is served from cache).
+
+    Returns:
+        Optional[int]: realty visits count that hasn't been flushed to DB yet (None if the realty isn't available)
+    """
+    realty = Realty.available.select_related('location').only('id', 'location__city').filter(pk=realty_id).first()
+    if realty is None:
+        return None
+    return register_realty_visit(realty, visitor_id)
+
+
 def update_realty_visits_count(realty_id: Union[int, str]) -> int:
     return int(redis_instance.incr(f"realty:{str(realty_id)}:views_count"))
 
@@ -105,13 +338,80 @@ def get_cached_realty_visits_count_by_realty_id(realty_id: Union[int, str]) -> i
     return int(views_count) if views_count is not None else 0
 
 
-def update_realty_visits_from_redis() -> None:
-    for key in redis_instance.scan_iter(match="realty:*:views_count"):
-        realty_id = int(key.split(":")[1])
-        visits_count = redis_instance.get(name=key)
-        Realty.objects.filter(
-            id=realty_id,
-        ).update(
-            visits_count=F('visits_count') + visits_count,
+class VisitsFlushStats(TypedDict):
+    keys_flushed: int
+    visits_flushed: int
+    realty_updated: int
+    duration: float
+
+
+def update_realty_visits_count_in_db(visits_by_realty_id: Dict[int, int]) -> int:
+    """Add `visits_by_realty_id` counts to the realty `visits_count` by a single `UPDATE ... FROM (VALUES ...)`.
+
+    Returns:
+        int: number of updated realty
+    """
+    if not visits_by_realty_id:
+        return 0
+
+    values_sql = ", ".join(["(%s::integer, %s::integer)"] * len(visits_by_realty_id))
+    params = [number for realty_visits in visits_by_realty_id.items() for number in realty_visits]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Realty._meta.db_table} AS realty "
+            f"SET visits_count = realty.visits_count + visits.visits_count "
+            f"FROM (VALUES {values_sql}) AS visits (realty_id, visits_count) "
+            f"WHERE realty.id = visits.realty_id",
+            params,
         )
-        redis_instance.set(name=key, value=0)
+        return cursor.rowcount
+
+
+def update_realty_visits_from_redis(*, batch_size: int = REALTY_VISITS_FLUSH_BATCH_SIZE) -> VisitsFlushStats:
+    """Move visit counters from Redis to the realty `visits_count` in DB.
+
+    Counters are taken and deleted atomically (GET + DEL of every key in a MULTI/EXEC transaction per batch
+    of keys, that works on any Redis version), so visits that happen during the flush are not lost,
+    they are just left for the next flush.
+    Every batch is saved by a single UPDATE statement.
+    """
+    started_at = time.monotonic()
+    stats = VisitsFlushStats(keys_flushed=0, visits_flushed=0, realty_updated=0, duration=0.0)
+
+    keys = redis_instance.scan_iter(match="realty:*:views_count", count=batch_size)
+    for keys_batch in iter(lambda: list(itertools.islice(keys, batch_size)), []):
+        pipe = redis_instance.pipeline(transaction=True)
+        for key in keys_batch:
+            pipe.get(key)
+            pipe.delete(key)
+        visits_counts = pipe.execute()[::2]
+
+        visits_by_realty_id: Dict[int, int] = {}
+        for key, visits_count in zip(keys_batch, visits_counts):
+            if visits_count is not None and int(visits_count) > 0:
+                visits_by_realty_id[int(key.split(":")[1])] = int(visits_count)
+
+        try:
+            stats['realty_updated'] += update_realty_visits_count_in_db(visits_by_realty_id)
+        except DatabaseError:
+            # return counters back, so they are flushed next time
+            pipe = redis_instance.pipeline(transaction=False)
+            for realty_id, visits_count in visits_by_realty_id.items():
+                pipe.incrby(f"realty:{realty_id}:views_count", visits_count)
+            pipe.execute()
+            raise
+        # cards on the list pages show `visits_count`
+        bump_realty_cards_version(visits_by_realty_id)
+
+        stats['keys_flushed'] += len(keys_batch)
+        stats['visits_flushed'] += sum(visits_by_realty_id.values())
+
+    stats['duration'] = time.monotonic() - started_at
+    logger.info(
+        msg=f"Realty visits have been flushed to DB | "
+            f"Keys: {stats['keys_flushed']} | "
+            f"Visits: {stats['visits_flushed']} | "
+            f"Updated realty: {stats['realty_updated']} | "
+            f"Duration: {stats['duration']:.3f}s",
+    )
+    return stats
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import datetime
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, F, IntegerField, Max
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from ..constants import (
+    REALTY_SITEMAP_CACHE_TTL, REALTY_SITEMAP_CHANGEFREQ, REALTY_SITEMAP_CHUNK_SIZE, REALTY_SITEMAP_CURSOR_ITERSIZE,
+    REALTY_SITEMAP_PRIORITY,
+)
+from ..models import Realty
+
+
+REALTY_SITEMAP_INDEX_KEY = 'realty:sitemap:index'
+
+
+class RenderedSitemap(TypedDict):
+    content: str
+    last_modified: Optional[datetime.datetime]
+
+
+class RenderedSitemapIndex(RenderedSitemap):
+    chunks: List[int]
+
+
+class SitemapsBuildStats(TypedDict):
+    chunks_rendered: int
+    urls_rendered: int
+
+
+def get_realty_sitemap_chunk_key(chunk: int) -> str:
+    return f"realty:sitemap:chunk:{chunk}"
+
+
+def get_realty_sitemap_chunk_ids_range(chunk: int) -> Tuple[int, int]:
+    """Return the first and the last realty id of the sitemap `chunk` (chunks are split by id ranges)."""
+    return chunk * REALTY_SITEMAP_CHUNK_SIZE, (chunk + 1) * REALTY_SITEMAP_CHUNK_SIZE - 1
+
+
+def get_site_root() -> str:
+    return f"{settings.DEFAULT_PROTOCOL}://{Site.objects.get_current().domain}"
+
+
+def get_realty_sitemap_chunks() -> Dict[int, datetime.datetime]:
+    """Return sitemap chunks with available realty and the last modification of each chunk by a single query."""
+    return dict(
+        Realty.available.order_by().annotate(
+            chunk=ExpressionWrapper(F('id') / REALTY_SITEMAP_CHUNK_SIZE, output_field=IntegerField()),
+        ).values('chunk').annotate(
+            last_modified=Max('updated'),
+        ).order_by('chunk').values_list('chunk', 'last_modified'),
+    )
+
+
+def render_realty_sitemap_chunk(chunk: int, *, site_root: Optional[str] = None) -> Tuple[RenderedSitemap, int]:
+    """Render the sitemap of available realty in the `chunk`.
+
+    Rows (`id`, `slug`, `updated`) are fetched by a server-side cursor, so model instances aren't created.
+
+    Returns:
+        Tuple[RenderedSitemap, int]: the rendered sitemap and the number of its URLs
+    """
+    site_root = site_root or get_site_root()
+    urlset = []
+    last_modified = None
+    for realty_id, slug, updated in Realty.available.filter(
+            id__range=get_realty_sitemap_chunk_ids_range(chunk),
+    ).order_by('id').values_list('id', 'slug', 'updated').iterator(chunk_size=REALTY_SITEMAP_CURSOR_ITERSIZE):
+        urlset.append({
+            'location': f"{site_root}{reverse('realty:detail', kwargs={'pk': realty_id, 'slug': slug})}",
+            'lastmod': updated,
+            'changefreq': REALTY_SITEMAP_CHANGEFREQ,
+            'priority': REALTY_SITEMAP_PRIORITY,
+        })
+        last_modified = updated if last_modified is None else max(last_modified, updated)
+
+    sitemap = RenderedSitemap(
+        content=render_to_string('sitemap.xml', {'urlset': urlset}),
+        last_modified=last_modified,
+    )
+    return sitemap, len(urlset)
+
+
+def render_realty_sitemap_index(
+        chunks: Dict[int, datetime.datetime],
+        *,
+        site_root: Optional[str] = None,
+) -> RenderedSitemapIndex:
+    site_root = site_root or get_site_root()
+    sitemaps = [
+        {
+            'location': f"{site_root}{reverse('realty:sitemap_chunk', kwargs={'chunk': chunk})}",
+            'lastmod': last_modified,
+        }
+        for chunk, last_modified in chunks.items()
+    ]
+    return RenderedSitemapIndex(
+        content=render_to_string('realty/sitemaps/index.xml', {'sitemaps': sitemaps}),
+        last_modified=max(chunks.values(), default=None),
+        chunks=list(chunks),
+    )
+
+
+def build_realty_sitemaps() -> SitemapsBuildStats:
+    """Render the sitemap index and all its chunks and cache them.
+
+    Chunks are cached before the index, so the index never refers to a chunk that hasn't been rendered.
+    """
+    site_root = get_site_root()
+    chunks = get_realty_sitemap_chunks()
+    stats = SitemapsBuildStats(chunks_rendered=0, urls_rendered=0)
+    for chunk in chunks:
+        sitemap, urls_count = render_realty_sitemap_chunk(chunk, site_root=site_root)
+        cache.set(get_realty_sitemap_chunk_key(chunk), sitemap, REALTY_SITEMAP_CACHE_TTL)
+        stats['chunks_rendered'] += 1
+        stats['urls_rendered'] += urls_count
+    cache.set(
+        REALTY_SITEMAP_INDEX_KEY,
+        render_realty_sitemap_index(chunks, site_root=site_root),
+        REALTY_SITEMAP_CACHE_TTL,
+    )
+    return stats
+
+
+def get_realty_sitemap_index() -> RenderedSitemapIndex:
+    """Return the pre-rendered sitemap index (it's rendered and cached if it hasn't been pre-rendered yet)."""
+    sitemap_index: Optional[RenderedSitemapIndex] = cache.get(REALTY_SITEMAP_INDEX_KEY)
+    if sitemap_index is None:
+        sitemap_index = render_realty_sitemap_index(get_realty_sitemap_chunks())
+        cache.set(REALTY_SITEMAP_INDEX_KEY, sitemap_index, REALTY_SITEMAP_CACHE_TTL)
+    return sitemap_index
+
+
+def get_realty_sitemap_chunk(chunk: int) -> Optional[RenderedSitemap]:
+    """Return the pre-rendered sitemap `chunk` (None if the chunk isn't in the sitemap index)."""
+    if chunk not in get_realty_sitemap_index()['chunks']:
+        return None
+
+    chunk_key = get_realty_sitemap_chunk_key(chunk)
+    sitemap: Optional[RenderedSitemap] = cache.get(chunk_key)
+    if sitemap is None:
+        sitemap, _ = render_realty_sitemap_chunk(chunk)
+        cache.set(chunk_key, sitemap, REALTY_SITEMAP_CACHE_TTL)
+    return sitemap
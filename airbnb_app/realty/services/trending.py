@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import datetime
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, TypedDict
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from configs.redis_conf import redis_instance
+
+from ..constants import (
+    REALTY_TRENDING_BUCKET_SIZE, REALTY_TRENDING_BUCKET_TTL, REALTY_TRENDING_COUNT, REALTY_TRENDING_HALF_LIFE,
+    REALTY_TRENDING_MIN_SCORE,
+)
+from ..models import Realty
+from .cache import get_realty_by_ordered_ids
+
+
+REALTY_TRENDING_KEY = 'realty:trending'
+
+# the last visits bucket that has been added to the trending ranking
+REALTY_TRENDING_LAST_BUCKET_KEY = f"{REALTY_TRENDING_KEY}:last_bucket"
+
+# the moment (timestamp) trending scores are computed for, i.e. the moment of the previous update
+REALTY_TRENDING_UPDATED_KEY = f"{REALTY_TRENDING_KEY}:updated"
+
+
+class TrendingUpdateStats(TypedDict):
+    buckets_processed: int
+    visits_processed: int
+    rankings_updated: int
+
+
+def get_trending_key(city_slug: Optional[str] = None) -> str:
+    """Return key of the trending ranking of all realty (or realty in the city with `city_slug`)."""
+    if city_slug is None:
+        return REALTY_TRENDING_KEY
+    return f"{REALTY_TRENDING_KEY}:city:{city_slug}"
+
+
+def get_visits_bucket(moment: Optional[datetime.datetime] = None) -> int:
+    """Return number of the visits bucket the `moment` (now by default) falls into."""
+    return int((moment or timezone.now()).timestamp()) // REALTY_TRENDING_BUCKET_SIZE
+
+
+def get_visits_bucket_key(bucket: int) -> str:
+    return f"{REALTY_TRENDING_KEY}:visits:{bucket}"
+
+
+def get_visits_bucket_timestamp(bucket: int) -> int:
+    """Return timestamp of the end of the visits `bucket` (visits of the bucket are counted as of this moment)."""
+    return (bucket + 1) * REALTY_TRENDING_BUCKET_SIZE
+
+
+def get_trending_decay(age: float) -> float:
+    """Return how much a trending score decays during `age` seconds."""
+    return 0.5 ** (max(age, 0) / REALTY_TRENDING_HALF_LIFE)
+
+
+def update_trending_realty(now: Optional[datetime.datetime] = None) -> TrendingUpdateStats:
+    """Add visits of closed buckets to the trending ranking of all realty and the rankings of every city.
+
+    The trending score is an exponentially decayed visits count: every visit adds 1 to the score,
+    and the score halves every `REALTY_TRENDING_HALF_LIFE` seconds. Existing scores are decayed
+    by the time passed since the previous update and bucket visits are added with the decay of their age
+    (the time passed since the end of their bucket), both by a single `ZUNIONSTORE ... WEIGHTS` per ranking,
+    so all rankings are updated in one transaction.
+    """
+    now = now or timezone.now()
+    current_bucket = get_visits_bucket(now)
+    oldest_bucket = current_bucket - REALTY_TRENDING_BUCKET_TTL // REALTY_TRENDING_BUCKET_SIZE
+    last_bucket, updated = redis_instance.mget(REALTY_TRENDING_LAST_BUCKET_KEY, REALTY_TRENDING_UPDATED_KEY)
+    first_bucket = oldest_bucket if last_bucket is None else max(int(last_bucket) + 1, oldest_bucket)
+    buckets = range(first_bucket, current_bucket)
+
+    stats = TrendingUpdateStats(buckets_processed=len(buckets), visits_processed=0, rankings_updated=0)
+    if not buckets:
+        return stats
+
+    pipe = redis_instance.pipeline(transaction=False)
+    for bucket in buckets:
+        pipe.zrange(get_visits_bucket_key(bucket), 0, -1, withscores=True)
+
+    scores_increments: Dict[int, float] = defaultdict(float)
+    for bucket, bucket_visits in zip(buckets, pipe.execute()):
+        bucket_decay = get_trending_decay(now.timestamp() - get_visits_bucket_timestamp(bucket))
+        for realty_id, visits_count in bucket_visits:
+            scores_increments[int(realty_id)] += visits_count * bucket_decay
+            stats['visits_processed'] += int(visits_count)
+
+    cities_increments: Dict[str, Dict[int, float]] = defaultdict(dict)
+    for realty_id, city_slug in Realty.objects.filter(
+            id__in=list(scores_increments),
+    ).values_list('id', 'location__city_slug'):
+        cities_increments[city_slug][realty_id] = scores_increments[realty_id]
+    # rankings of cities without new visits are decayed too
+    for key in redis_instance.scan_iter(match=get_trending_key('*')):
+        cities_increments.setdefault(key.rsplit(':', 1)[-1], {})
+
+    scores_decay = 1 if updated is None else get_trending_decay(now.timestamp() - float(updated))
+    increments_key = f"{REALTY_TRENDING_KEY}:increments:{uuid.uuid4().hex}"
+    pipe = redis_instance.pipeline(transaction=True)
+    for ranking_key, increments in (
+            (get_trending_key(), scores_increments),
+            *((get_trending_key(city_slug), increments) for city_slug, increments in cities_increments.items()),
+    ):
+        if increments:
+            pipe.zadd(increments_key, increments)
+            pipe.zunionstore(ranking_key, {ranking_key: scores_decay, increments_key: 1})
+            pipe.delete(increments_key)
+        else:
+            pipe.zunionstore(ranking_key, {ranking_key: scores_decay})
+        pipe.zremrangebyscore(ranking_key, '-inf', f"({REALTY_TRENDING_MIN_SCORE}")
+        stats['rankings_updated'] += 1
+    pipe.delete(*(get_visits_bucket_key(bucket) for bucket in buckets))
+    pipe.mset({REALTY_TRENDING_LAST_BUCKET_KEY: current_bucket - 1, REALTY_TRENDING_UPDATED_KEY: now.timestamp()})
+    pipe.execute()
+
+    return stats
+
+
+def get_trending_realty_ids(count: int = REALTY_TRENDING_COUNT, *, city_slug: Optional[str] = None) -> List[int]:
+    """Return ids of `count` realty with the highest trending score (in the city with `city_slug`)."""
+    if count < 1:
+        return []
+    return [int(realty_id) for realty_id in redis_instance.zrevrange(get_trending_key(city_slug), 0, count - 1)]
+
+
+def get_trending_realty(
+        count: int = REALTY_TRENDING_COUNT,
+        *,
+        city_slug: Optional[str] = None,
+        realty_qs: Optional['QuerySet[Realty]'] = None,
+) -> 'QuerySet[Realty]':
+    """Return available trending realty (from `realty_qs`) ordered by the trending score.
+
+    Top ids are taken from the ranking (sorted set) and hydrated by a single query.
+    """
+    return get_realty_by_ordered_ids(get_trending_realty_ids(count, city_slug=city_slug), realty_qs)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import hmac
+import itertools
+from typing import Dict, List, Optional, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest
+from django.utils import timezone
+
+from configs.redis_conf import redis_instance
+
+from ..constants import (
+    REALTY_DAILY_VISITORS_TTL, REALTY_MONTHLY_VISITORS_TTL, REALTY_VISITORS_ROLLUP_BATCH_SIZE,
+    REALTY_WEEKLY_VISITORS_TTL,
+)
+from ..models import Realty, RealtyDailyStats
+
+
+def get_daily_visitors_key(realty_id: Union[int, str], day: datetime.date) -> str:
+    return f"realty:{realty_id}:visitors:day:{day.isoformat()}"
+
+
+def get_weekly_visitors_key(realty_id: Union[int, str], day: datetime.date) -> str:
+    return f"realty:{realty_id}:visitors:week:{day.strftime('%G-W%V')}"
+
+
+def get_monthly_visitors_key(realty_id: Union[int, str], day: datetime.date) -> str:
+    return f"realty:{realty_id}:visitors:month:{day.strftime('%Y-%m')}"
+
+
+def get_visitor_id(request: HttpRequest) -> str:
+    """Return anonymized id of the visitor (user, session or IP address with user agent)."""
+    if request.user.is_authenticated:
+        visitor = f"user:{request.user.pk}"
+    elif request.session.session_key:
+        visitor = f"session:{request.session.session_key}"
+    else:
+        forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        ip_address = forwarded_for.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+        visitor = f"ip:{ip_address}:{request.META.get('HTTP_USER_AGENT', '')}"
+    return hmac.new(settings.SECRET_KEY.encode(), visitor.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def track_realty_visitor(realty_id: Union[int, str], visitor_id: str, day: Optional[datetime.date] = None) -> None:
+    """Add the visitor to the realty daily unique visitors HyperLogLog."""
+    key = get_daily_visitors_key(realty_id, day or timezone.localdate())
+    pipe = redis_instance.pipeline(transaction=False)
+    pipe.pfadd(key, visitor_id)
+    pipe.expire(key, REALTY_DAILY_VISITORS_TTL)
+    pipe.execute()
+
+
+def get_realty_unique_visitors_count(realty_id: Union[int, str], day: Optional[datetime.date] = None) -> int:
+    return int(redis_instance.pfcount(get_daily_visitors_key(realty_id, day or timezone.localdate())))
+
+
+def rollup_realty_unique_visitors(
+        day: datetime.date,
+        *,
+        batch_size: int = REALTY_VISITORS_ROLLUP_BATCH_SIZE,
+) -> int:
+    """Merge daily unique visitors HyperLogLogs of the `day` into weekly and monthly ones and save counts to DB.
+
+    Rollup of the same day can be run several times, HyperLogLog merges are idempotent.
+
+    Returns:
+        int: number of saved RealtyDailyStats
+    """
+    saved_count = 0
+    keys = redis_instance.scan_iter(match=get_daily_visitors_key('*', day), count=batch_size)
+    for keys_batch in iter(lambda: list(itertools.islice(keys, batch_size)), []):
+        realty_ids: List[int] = [int(key.split(':')[1]) for key in keys_batch]
+
+        pipe = redis_instance.pipeline(transaction=False)
+        for realty_id, daily_key in zip(realty_ids, keys_batch):
+            weekly_key, monthly_key = get_weekly_visitors_key(realty_id, day), get_monthly_visitors_key(realty_id, day)
+            pipe.pfmerge(weekly_key, weekly_key, daily_key)
+            pipe.expire(weekly_key, REALTY_WEEKLY_VISITORS_TTL)
+            pipe.pfmerge(monthly_key, monthly_key, daily_key)
+            pipe.expire(monthly_key, REALTY_MONTHLY_VISITORS_TTL)
+        pipe.execute()
+
+        pipe = redis_instance.pipeline(transaction=False)
+        for realty_id, daily_key in zip(realty_ids, keys_batch):
+            pipe.pfcount(daily_key)
+            pipe.pfcount(get_weekly_visitors_key(realty_id, day))
+            pipe.pfcount(get_monthly_visitors_key(realty_id, day))
+        counts = pipe.execute()
+
+        existing_realty_ids = set(Realty.objects.filter(id__in=realty_ids).values_list('id', flat=True))
+        stats: Dict[int, RealtyDailyStats] = {
+            realty_id: RealtyDailyStats(
+                realty_id=realty_id,
+                date=day,
+                unique_visitors=daily_count,
+                week_unique_visitors=weekly_count,
+                month_unique_visitors=monthly_count,
+            )
+            for realty_id, (daily_count, weekly_count, monthly_count) in zip(realty_ids, zip(*[iter(counts)] * 3))
+            if realty_id in existing_realty_ids
+        }
+        with transaction.atomic():
+            RealtyDailyStats.objects.filter(date=day, realty_id__in=stats.keys()).delete()
+            RealtyDailyStats.objects.bulk_create(stats.values())
+        saved_count += len(stats)
+
+    return saved_count
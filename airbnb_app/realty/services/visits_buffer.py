@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import DefaultDict, Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from django.conf import settings
+from django.utils import timezone
+
+from configs.redis_conf import redis_instance
+
+from ..constants import (
+    CITY_POPULARITY_VISIT_SCORE, REALTY_DAILY_VISITORS_TTL, REALTY_TRENDING_BUCKET_TTL,
+    REALTY_VISITS_BUFFER_FLUSH_INTERVAL, REALTY_VISITS_BUFFER_FLUSH_SIZE,
+)
+from ..models import Realty
+from .cities import CITIES_POPULARITY_KEY
+from .trending import get_visits_bucket, get_visits_bucket_key
+from .visitors import get_daily_visitors_key
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_realty_visits_buffer_enabled() -> bool:
+    return bool(getattr(settings, 'REALTY_VISITS_BUFFER_ENABLED', False))
+
+
+class RealtyVisitsBuffer:
+    """Process-local buffer of realty visits.
+
+    Visits are aggregated in memory (counters per realty, visitors per day, trending buckets and cities)
+    and flushed to Redis by a single pipeline: by a background thread every `flush_interval` seconds
+    or as soon as `flush_size` visits are buffered, and on the process exit.
+
+    Visits counts are known without network I/O: counters of flushed visits (replies of the flush `INCRBY`s)
+    are kept by the process, so visits flushed by other processes are known after the next flush of the realty.
+    """
+
+    def __init__(
+            self,
+            *,
+            flush_interval: float = REALTY_VISITS_BUFFER_FLUSH_INTERVAL,
+            flush_size: int = REALTY_VISITS_BUFFER_FLUSH_SIZE,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._init_process_state()
+        # threads and locks don't survive fork (e.g. gunicorn `preload_app`), so every worker gets its own
+        os.register_at_fork(after_in_child=self._init_process_state)
+
+    def _init_process_state(self) -> None:
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._flushed_views_counts: Dict[int, int] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._visits_count = 0
+        self._views_counts: Counter[int] = Counter()
+        self._visitors: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._trending_visits: DefaultDict[str, Counter[int]] = defaultdict(Counter)
+        self._cities_visits: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return self._visits_count
+
+    def add(self, realty: Realty, visitor_id: str) -> int:
+        """Buffer a realty visit (no network I/O).
+
+        Returns:
+            int: visits of the realty that haven't been flushed to DB yet
+            (flushed to Redis, as of the last flush of this process, and buffered in this process)
+        """
+        daily_visitors_key = get_daily_visitors_key(realty.id, timezone.localdate())
+        visits_bucket_key = get_visits_bucket_key(get_visits_bucket())
+
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name='realty-visits-buffer', daemon=True)
+                self._flusher.start()
+
+            self._views_counts[realty.id] += 1
+            self._visitors[daily_visitors_key].add(visitor_id)
+            self._trending_visits[visits_bucket_key][realty.id] += 1
+            self._cities_visits[realty.location.city] += 1
+            self._visits_count += 1
+            if self._visits_count >= self.flush_size:
+                self._flush_requested.set()
+            return self._flushed_views_counts.get(realty.id, 0) + self._views_counts[realty.id]
+
+    def flush(self) -> int:
+        """Write buffered visits to Redis by a single pipeline.
+
+        If Redis fails, visits are returned to the buffer, so they are written by the next flush.
+
+        Returns:
+            int: number of flushed visits
+        """
+        with self._lock:
+            visits_count = self._visits_count
+            views_counts, visitors = self._views_counts, self._visitors
+            trending_visits, cities_visits = self._trending_visits, self._cities_visits
+            self._reset()
+
+        if not visits_count:
+            return 0
+
+        pipe = redis_instance.pipeline(transaction=False)
+        for realty_id, views_count in views_counts.items():
+            pipe.incrby(f"realty:{realty_id}:views_count", views_count)
+        for daily_visitors_key, visitor_ids in visitors.items():
+            pipe.pfadd(daily_visitors_key, *visitor_ids)
+            pipe.expire(daily_visitors_key, REALTY_DAILY_VISITORS_TTL)
+        for visits_bucket_key, bucket_visits in trending_visits.items():
+            for realty_id, bucket_visits_count in bucket_visits.items():
+                pipe.zincrby(visits_bucket_key, bucket_visits_count, realty_id)
+            pipe.expire(visits_bucket_key, REALTY_TRENDING_BUCKET_TTL)
+        for city, city_visits_count in cities_visits.items():
+            pipe.zincrby(CITIES_POPULARITY_KEY, city_visits_count * CITY_POPULARITY_VISIT_SCORE, city)
+
+        try:
+            flushed_views_counts = pipe.execute()[:len(views_counts)]
+        except RedisError:
+            with self._lock:
+                self._visits_count += visits_count
+                self._views_counts.update(views_counts)
+                for daily_visitors_key, visitor_ids in visitors.items():
+                    self._visitors[daily_visitors_key].update(visitor_ids)
+                for visits_bucket_key, bucket_visits in trending_visits.items():
+                    self._trending_visits[visits_bucket_key].update(bucket_visits)
+                self._cities_visits.update(cities_visits)
+            raise
+
+        with self._lock:
+            self._flushed_views_counts.update(zip(views_counts, map(int, flushed_views_counts)))
+        return visits_count
+
+    def _run_flusher(self) -> None:
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Buffered realty visits haven't been flushed to Redis")
+
+
+realty_visits_buffer = RealtyVisitsBuffer()
+
+
+def flush_realty_visits_buffer() -> int:
+    """Flush visits buffered by this process (e.g. on the web worker shutdown)."""
+    return realty_visits_buffer.flush()
+
+
+atexit.register(flush_realty_visits_buffer)
@@ -0,0 +1,276 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from addresses.models import Address
+from common.decorators import disable_for_loaddata
+from common.page_cache import page_served_from_cache
+from hosts.models import RealtyHost
+
+from .constants import CITY_POPULARITY_NEW_REALTY_SCORE, REALTY_VIEW_REFRESH_DELAY
+from .models import Amenity, Realty, RealtyImage
+from .services.amenities import invalidate_amenity_catalogue
+from .services.bitmaps import (
+    is_realty_bitmap_index_enabled, remove_amenity_bitmap, remove_realty_from_bitmaps, update_many_realty_bitmaps,
+    update_realty_amenities_bitmaps, update_realty_availability_bitmap, update_realty_bitmaps,
+)
+from .services.bulk import realty_bulk_created, realty_bulk_updated
+from .services.cache import bump_catalogue_version, invalidate_host_realty, invalidate_rendered_realty
+from .services.cities import increment_city_popularity
+from .services.realty import register_realty_visit_by_id, update_realty_search_vector
+from .services.visitors import get_visitor_id
+from .tasks import refresh_realty_materialized_view
+
+
+# Realty fields that are included into the `search_vector`
+REALTY_SEARCH_FIELDS = frozenset(('name', 'description', 'location'))
+
+
+@receiver(post_save, sender=Realty)
+@disable_for_loaddata
+def update_search_vector_on_realty_change(sender, instance: Realty, update_fields=None, **kwargs):
+    if update_fields is not None and not REALTY_SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_realty_search_vector(Realty.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Address)
+@disable_for_loaddata
+def update_search_vector_on_address_change(sender, instance: Address, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'city' not in update_fields):
+        return
+    update_realty_search_vector(Realty.objects.filter(location=instance))
+
+
+@receiver(post_save, sender=Realty)
+@receiver(post_delete, sender=Realty)
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_catalogue_on_change(sender, **kwargs):
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(m2m_changed, sender=Realty.amenities.through)
+def invalidate_catalogue_on_amenities_change(sender, action: str, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=Realty)
+@receiver(post_delete, sender=Realty)
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@disable_for_loaddata
+def schedule_realty_view_refresh(sender, **kwargs):
+    transaction.on_commit(
+        lambda: refresh_realty_materialized_view.apply_async(countdown=REALTY_VIEW_REFRESH_DELAY),
+    )
+
+
+@receiver(post_save, sender=Realty)
+@disable_for_loaddata
+def update_bitmaps_on_realty_change(sender, instance: Realty, **kwargs):
+    if is_realty_bitmap_index_enabled():
+        update_realty_bitmaps(instance)
+
+
+@receiver(post_delete, sender=Realty)
+def update_bitmaps_on_realty_delete(sender, instance: Realty, **kwargs):
+    if is_realty_bitmap_index_enabled():
+        remove_realty_from_bitmaps(instance.pk)
+
+
+@receiver(post_delete, sender=Amenity)
+def update_bitmaps_on_amenity_delete(sender, instance: Amenity, **kwargs):
+    if is_realty_bitmap_index_enabled():
+        remove_amenity_bitmap(instance.pk)
+
+
+@receiver(m2m_changed, sender=Realty.amenities.through)
+def update_bitmaps_on_amenities_change(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    if not is_realty_bitmap_index_enabled() or action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if action == 'pre_clear':  # `pk_set` isn't passed on clear, so related objects are taken before clearing
+        related_manager = instance.realty if reverse else instance.amenities
+        pk_set = set(related_manager.values_list('id', flat=True))
+
+    realty_ids, amenity_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    update_realty_amenities_bitmaps(realty_ids, amenity_ids, has_amenity=(action == 'post_add'))
+
+
+@receiver(post_save, sender=Realty)
+@disable_for_loaddata
+def update_city_popularity_on_realty_create(sender, instance: Realty, created: bool, **kwargs):
+    if created and instance.location_id is not None:
+        city = instance.location.city
+        transaction.on_commit(lambda: increment_city_popularity(city, CITY_POPULARITY_NEW_REALTY_SCORE))
+
+
+@receiver(post_save, sender=Realty)
+@receiver(post_delete, sender=Realty)
+def invalidate_rendered_realty_on_change(sender, instance: Realty, **kwargs):
+    realty_id = instance.pk
+    transaction.on_commit(lambda: invalidate_rendered_realty([realty_id]))
+
+
+@receiver(post_save, sender=RealtyImage)
+@receiver(post_delete, sender=RealtyImage)
+def invalidate_rendered_realty_on_image_change(sender, instance: RealtyImage, **kwargs):
+    realty_id = instance.realty_id
+    transaction.on_commit(lambda: invalidate_rendered_realty([realty_id]))
+
+
+@receiver(post_save, sender=Address)
+def invalidate_rendered_realty_on_address_change(sender, instance: Address, created: bool, **kwargs):
+    # deleted address deletes its realty (and invalidates its card and pages)
+    if created:
+        return
+    realty_ids = list(Realty.objects.filter(location=instance).values_list('id', flat=True))
+    transaction.on_commit(lambda: invalidate_rendered_realty(realty_ids))
+
+
+@receiver(post_save, sender=RealtyHost)
+def invalidate_host_realty_on_host_change(sender, instance: RealtyHost, created: bool, **kwargs):
+    # a new host has no realty yet
+    if created:
+        return
+    realty_ids = list(Realty.objects.filter(host=instance).values_list('id', flat=True))
+    transaction.on_commit(lambda: invalidate_host_realty(realty_ids))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_host_realty_on_user_change(sender, instance, created: bool, **kwargs):
+    # users are saved on every login, but only some of their fields are rendered with realty
+    if created or not instance.host_fields_tracker.changed():
+        return
+    realty_ids = list(Realty.objects.filter(host__user=instance).values_list('id', flat=True))
+    transaction.on_commit(lambda: invalidate_host_realty(realty_ids))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_host_realty_on_profile_change(sender, instance: Profile, created: bool, **kwargs):
+    # profiles are saved on every user save, but only some of their fields are rendered with realty
+    if created or not instance.host_fields_tracker.changed():
+        return
+    realty_ids = list(Realty.objects.filter(host__user_id=instance.user_id).values_list('id', flat=True))
+    transaction.on_commit(lambda: invalidate_host_realty(realty_ids))
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_rendered_realty_on_amenity_change(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_rendered_realty())
+
+
+@receiver(m2m_changed, sender=Realty.amenities.through)
+def invalidate_rendered_realty_on_amenities_change(
+        sender, instance, action: str, reverse: bool, pk_set=None, **kwargs,
+):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        realty_ids = [instance.pk]
+    elif pk_set is not None:
+        realty_ids = list(pk_set)
+    else:  # realty of the cleared amenity are unknown
+        realty_ids = None
+    transaction.on_commit(lambda: invalidate_rendered_realty(realty_ids))
+
+
+@receiver(page_served_from_cache)
+def register_visit_on_cached_detail_page(sender, request, resolver_match, **kwargs):
+    # the detail view isn't called for cached pages, so the visit is counted here
+    if resolver_match.view_name == 'realty:detail':
+        register_realty_visit_by_id(resolver_match.kwargs['pk'], get_visitor_id(request))
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_amenity_catalogue_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_amenity_catalogue)
+
+
+@receiver(realty_bulk_created)
+def update_search_vector_on_realty_bulk_create(sender, realty: List[Realty], **kwargs):
+    update_realty_search_vector(Realty.objects.filter(pk__in=[obj.pk for obj in realty]))
+
+
+@receiver(realty_bulk_created)
+def invalidate_catalogue_on_realty_bulk_create(sender, **kwargs):
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(realty_bulk_created)
+def schedule_realty_view_refresh_on_bulk_create(sender, **kwargs):
+    transaction.on_commit(
+        lambda: refresh_realty_materialized_view.apply_async(countdown=REALTY_VIEW_REFRESH_DELAY),
+    )
+
+
+@receiver(realty_bulk_created)
+def update_bitmaps_on_realty_bulk_create(sender, realty: List[Realty], amenity_ids: Dict[int, List[int]], **kwargs):
+    if not is_realty_bitmap_index_enabled():
+        return
+
+    update_many_realty_bitmaps(realty)
+    realty_ids_by_amenity_id = defaultdict(list)
+    for realty_id, realty_amenity_ids in amenity_ids.items():
+        for amenity_id in realty_amenity_ids:
+            realty_ids_by_amenity_id[amenity_id].append(realty_id)
+    for amenity_id, realty_ids in realty_ids_by_amenity_id.items():
+        update_realty_amenities_bitmaps(realty_ids, [amenity_id], has_amenity=True)
+
+
+@receiver(realty_bulk_created)
+def update_city_popularity_on_realty_bulk_create(sender, realty: List[Realty], **kwargs):
+    realty_count_by_city = Counter(obj.location.city for obj in realty)
+
+    def increment_cities_popularity():
+        for city, realty_count in realty_count_by_city.items():
+            increment_city_popularity(city, CITY_POPULARITY_NEW_REALTY_SCORE * realty_count)
+
+    transaction.on_commit(increment_cities_popularity)
+
+
+@receiver(realty_bulk_created)
+def invalidate_rendered_realty_on_bulk_create(sender, realty: List[Realty], **kwargs):
+    realty_ids = [obj.pk for obj in realty]
+    transaction.on_commit(lambda: invalidate_rendered_realty(realty_ids))
+
+
+@receiver(realty_bulk_updated)
+def invalidate_catalogue_on_realty_bulk_update(sender, **kwargs):
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(realty_bulk_updated)
+def schedule_realty_view_refresh_on_bulk_update(sender, **kwargs):
+    transaction.on_commit(
+        lambda: refresh_realty_materialized_view.apply_async(countdown=REALTY_VIEW_REFRESH_DELAY),
+    )
+
+
+@receiver(realty_bulk_updated)
+def update_bitmaps_on_realty_bulk_update(sender, realty: List[Realty], fields: Set[str], **kwargs):
+    if not is_realty_bitmap_index_enabled() or 'is_available' not in fields:
+        return
+
+    for is_available in (True, False):
+        realty_ids = [obj.pk for obj in realty if obj.is_available == is_available]
+        if realty_ids:
+            update_realty_availability_bitmap(realty_ids, is_available=is_available)
+
+
+@receiver(realty_bulk_updated)
+def invalidate_rendered_realty_on_bulk_update(sender, realty: List[Realty], **kwargs):
+    realty_ids = [obj.pk for obj in realty]
+    transaction.on_commit(lambda: invalidate_rendered_realty(realty_ids))
@@ -1,14 +1,87 @@
+import datetime
+from typing import Optional
+
+from django.utils import timezone
+
 from airbnb.celery import app
 
-from .services.realty import update_realty_visits_from_redis
+from .constants import REALTY_VIEW_REFRESH_DELAY
+from .services.cities import rebuild_cities_popularity
+from .services.realty import refresh_realty_view, update_realty_visits_from_redis
+from .services.sitemaps import build_realty_sitemaps
+from .services.trending import update_trending_realty
+from .services.visitors import rollup_realty_unique_visitors
 
 
 @app.task(
     queue='default',
-    time_limit=30,
-    soft_time_limit=20,
-    lock_ttl=60,
+    time_limit=4 * 60,
+    soft_time_limit=3 * 60,
+    lock_ttl=4 * 60,
 )
 def update_realty_visits_count_from_redis(*args, **kwargs):
     """Updates `visits_count` value in DB from Redis."""
-    update_realty_visits_from_redis()
+    return update_realty_visits_from_redis()
+
+
+@app.task(
+    queue='default',
+    time_limit=4 * 60,
+    soft_time_limit=3 * 60,
+    lock_ttl=4 * 60,
+)
+def update_trending_realty_ranking(*args, **kwargs):
+    """Adds recent realty visits to the (time-decayed) trending ranking in Redis."""
+    return update_trending_realty()
+
+
+@app.task(
+    queue='default',
+    time_limit=5 * 60,
+    soft_time_limit=4 * 60,
+    lock_ttl=REALTY_VIEW_REFRESH_DELAY,
+)
+def refresh_realty_materialized_view(*args, **kwargs):
+    """Refreshes `realty_view` materialized view.
+
+    The task is locked for `REALTY_VIEW_REFRESH_DELAY` seconds after it has been scheduled,
+    so a burst of realty changes leads to a single refresh.
+    """
+    refresh_realty_view(concurrently=True)
+
+
+@app.task(
+    queue='default',
+    time_limit=30 * 60,
+    soft_time_limit=25 * 60,
+    lock_ttl=30 * 60,
+)
+def rollup_realty_unique_visitors_stats(day: Optional[str] = None, *args, **kwargs):
+    """Rolls up realty unique visitors of the `day` (ISO date, yesterday by default) and saves them to DB."""
+    if day is None:
+        rollup_day = timezone.localdate() - datetime.timedelta(days=1)
+    else:
+        rollup_day = datetime.date.fromisoformat(day)
+    return rollup_realty_unique_visitors(rollup_day)
+
+
+@app.task(
+    queue='default',
+    time_limit=5 * 60,
+    soft_time_limit=4 * 60,
+    lock_ttl=5 * 60,
+)
+def rebuild_cities_popularity_ranking(*args, **kwargs):
+    """Rebuilds cities popularity ranking (Redis sorted set) from DB."""
+    return rebuild_cities_popularity()
+
+
+@app.task(
+    queue='default',
+    time_limit=15 * 60,
+    soft_time_limit=12 * 60,
+    lock_ttl=15 * 60,
+)
+def render_realty_sitemaps(*args, **kwargs):
+    """Pre-renders the sitemap index and its chunks to cache, so crawlers don't query DB."""
+    return build_realty_sitemaps()
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from model_bakery import baker
 
 from django.test import TestCase
@@ -120,3 +122,18 @@ class RealtyAdminActionsTests(TestCase):
         self.client.post(self.test_url, data, follow=True)
 
         self.assertFalse(realty_qs.filter(is_available=True).exists())
+
+    @mock.patch('realty.signals.refresh_realty_materialized_view')
+    @mock.patch('realty.signals.invalidate_rendered_realty')
+    def test_actions_invalidate_rendered_realty(self, invalidate_rendered_realty_mock: mock.MagicMock, *args):
+        """Admin actions invalidate cards and cached pages of the selected realty (like `save()` does)."""
+        self.client.login(username='test_action@gmail.com', password='test')
+        realty_ids = sorted(Realty.objects.filter(is_available=False).values_list('id', flat=True))
+        data = {
+            'action': 'make_realty_available',
+            '_selected_action': realty_ids,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.test_url, data, follow=True)
+
+        invalidate_rendered_realty_mock.assert_called_once_with(realty_ids)
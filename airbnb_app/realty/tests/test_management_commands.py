@@ -1,5 +1,7 @@
 from io import StringIO
+from unittest import mock
 
+import fakeredis
 from model_bakery import baker
 
 from django.core.management import call_command, color_style, load_command_class
@@ -83,3 +85,61 @@ class PopulateRealtyTests(TestCase):
 
         with self.assertRaises(ValueError):
             call_command('populaterealty', 0, stdout=output)
+
+
+class UpdateSearchVectorsTests(TestCase):
+    def setUp(self) -> None:
+        output = StringIO()
+        call_command('populaterealty', 3, stdout=output)
+        Realty.objects.update(search_vector=None)
+
+    def test_command_output(self):
+        """Test that command prints the number of updated search vectors."""
+        output = StringIO()
+        color_styles = color_style(force_color=True)
+        expected_output = color_styles.SUCCESS("Successfully updated 3 search vectors")
+
+        call_command('updatesearchvectors', '--batch-size', 2, stdout=output)
+
+        self.assertIn(expected_output, output.getvalue())
+
+    def test_search_vectors_are_rebuilt(self):
+        """Test that all realty objects get `search_vector` back."""
+        output = StringIO()
+        call_command('updatesearchvectors', stdout=output)
+
+        self.assertFalse(Realty.objects.filter(search_vector__isnull=True).exists())
+
+    def test_raises_exception_if_batch_size_less_then_one(self):
+        """If `batch_size` is less than 1, a ValueError should be raised."""
+        output = StringIO()
+
+        with self.assertRaises(ValueError):
+            call_command('updatesearchvectors', '--batch-size', 0, stdout=output)
+
+
+class RebuildRealtyBitmapsTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        output = StringIO()
+        call_command('populaterealty', 3, stdout=output)
+
+    @mock.patch('realty.services.bitmaps.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_command_output(self):
+        """Test that command prints the number of indexed realty."""
+        output = StringIO()
+        color_styles = color_style(force_color=True)
+        expected_output = color_styles.SUCCESS("Successfully indexed 3 realty")
+
+        call_command('rebuildrealtybitmaps', '--batch-size', 2, stdout=output)
+
+        self.assertIn(expected_output, output.getvalue())
+
+    def test_raises_exception_if_batch_size_less_then_one(self):
+        """If `batch_size` is less than 1, a ValueError should be raised."""
+        output = StringIO()
+
+        with self.assertRaises(ValueError):
+            call_command('rebuildrealtybitmaps', '--batch-size', 0, stdout=output)
@@ -1,29 +1,70 @@
+import datetime
 import shutil
 import tempfile
+from decimal import Decimal
 from unittest import mock
 
 import fakeredis
+from redis.exceptions import RedisError
 
-from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import CustomUser
 from addresses.models import Address
+from common.request_stats import collect_request_stats, instrument_redis_client
 from common.session_handler import SessionHandler
 from common.testing_utils import create_valid_image
 from hosts.models import RealtyHost
 
 from ..constants import REALTY_FORM_KEYS_COLLECTOR_NAME, REALTY_FORM_SESSION_PREFIX
-from ..models import Amenity, Realty, RealtyImage, RealtyTypeChoices
-from ..services.images import get_image_by_id, get_images_by_realty_id, update_images_order
+from ..forms import RealtyFiltersForm, RealtyGeneralInfoForm
+from ..models import Amenity, Realty, RealtyDailyStats, RealtyImage, RealtyTypeChoices, RealtyView
+from ..services.amenities import (
+    AMENITY_CATALOGUE_CHANNEL, AmenityCatalogueCache, get_amenity_catalogue, load_amenity_catalogue,
+)
+from ..services.autocomplete import (
+    get_autocomplete_cache_key, get_autocomplete_suggestions, normalize_autocomplete_query,
+)
+from ..services.bitmaps import get_bitmap_ids, get_candidate_realty_ids, rebuild_realty_bitmaps
+from ..services.cache import (
+    CachedRealtyIds, bump_catalogue_version, bump_realty_cards_version, get_cached_realty_count,
+    get_cached_realty_results, get_catalogue_version, get_realty_by_ordered_ids, get_results_fingerprint,
+)
+from ..services.cards import get_realty_cards
+from ..services.cities import get_most_popular_cities, increment_city_popularity, rebuild_cities_popularity
+from ..services.facets import get_cached_realty_facets, get_realty_facets
+from ..services.geo import BoundingBox, get_realty_in_bbox, get_realty_map_markers, get_realty_within_radius, parse_bbox
+from ..services.images import get_image_by_id, get_images_by_realty_id, get_realty_image_url, update_images_order
 from ..services.order import ImageOrder, convert_response_to_orders
 from ..services.realty import (
-    get_all_available_realty, get_amenity_ids_from_session, get_available_realty_by_city_slug,
-    get_available_realty_by_host, get_available_realty_by_ids, get_available_realty_count_by_city,
-    get_available_realty_filtered_by_type, get_available_realty_search_results,
-    get_cached_realty_visits_count_by_realty_id, get_last_realty, get_n_latest_available_realty,
-    get_n_latest_available_realty_ids, get_or_create_realty_host_by_user, update_realty_visits_count,
-    update_realty_visits_from_redis,
+    get_all_available_realty, get_amenity_ids_from_session, get_available_flat_realty,
+    get_available_realty_by_city_slug, get_available_realty_by_host, get_available_realty_by_ids,
+    get_available_realty_count_by_city, get_available_realty_filtered_by_type, get_available_realty_search_results,
+    get_cached_realty_visits_count_by_realty_id, get_filtered_available_realty, get_last_realty, get_listing_cards,
+    get_n_latest_available_realty, get_n_latest_available_realty_ids, get_or_create_realty_host_by_user,
+    get_realty_details, refresh_realty_view, register_realty_visit, update_realty_visits_count,
+    update_realty_visits_count_in_db, update_realty_visits_from_redis,
+)
+from ..services.sitemaps import (
+    build_realty_sitemaps, get_realty_sitemap_chunk, get_realty_sitemap_chunks, get_realty_sitemap_index,
+    render_realty_sitemap_chunk,
+)
+from ..services.trending import (
+    get_trending_decay, get_trending_realty, get_trending_realty_ids, get_visits_bucket, get_visits_bucket_key,
+    update_trending_realty,
+)
+from ..services.visitors import (
+    get_daily_visitors_key, get_realty_unique_visitors_count, get_visitor_id, rollup_realty_unique_visitors,
+    track_realty_visitor,
 )
+from ..services.visits_buffer import RealtyVisitsBuffer
 
 
 MEDIA_ROOT = tempfile.mkdtemp()
@@ -266,6 +307,37 @@ class RealtyServicesRealtyTests(TestCase):
             [Realty.objects.get(slug='realty-1')],
         )
 
+    def test_refresh_realty_view(self):
+        """refresh_realty_view() refreshes `realty_view` materialized view with the latest realty."""
+        refresh_realty_view(concurrently=False)
+
+        self.assertSetEqual(
+            set(RealtyView.objects.values_list('id', flat=True)),
+            set(Realty.objects.values_list('id', flat=True)),
+        )
+
+    def test_refresh_realty_view_concurrently(self):
+        """refresh_realty_view() picks up realty changes with a concurrent refresh."""
+        refresh_realty_view(concurrently=False)
+        Realty.objects.filter(slug='realty-1').update(price_per_night=100)
+
+        refresh_realty_view()
+
+        realty_row = RealtyView.objects.get(id=Realty.objects.get(slug='realty-1').id)
+        self.assertEqual(realty_row.price_per_night, 100)
+        self.assertEqual(realty_row.city, 'Moscow')
+        self.assertEqual(realty_row.email, 'user1@gmail.com')
+
+    def test_get_available_flat_realty(self):
+        """get_available_flat_realty() returns flat rows of available realty only."""
+        Realty.objects.filter(slug='realty-3').update(is_available=False)
+        refresh_realty_view(concurrently=False)
+
+        self.assertSetEqual(
+            set(get_available_flat_realty().values_list('id', flat=True)),
+            set(Realty.available.values_list('id', flat=True)),
+        )
+
     @mock.patch('realty.services.realty.redis_instance',
                 fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
     def test_get_cached_realty_visits_count_by_id(self):
@@ -309,6 +381,1135 @@ class RealtyServicesRealtyTests(TestCase):
 
         self.assertEqual(realty.visits_count, visits_count)
 
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_update_realty_visits_from_redis_bulk(self):
+        """update_realty_visits_from_redis() moves counters of all realty by a single UPDATE per batch."""
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        redis_instance.flushall()
+        realty1, realty2 = Realty.objects.order_by('id')[:2]
+        redis_instance.set(f"realty:{realty1.id}:views_count", 3)
+        redis_instance.set(f"realty:{realty2.id}:views_count", 7)
+
+        with self.assertNumQueries(1):
+            stats = update_realty_visits_from_redis(batch_size=10)
+
+        realty1.refresh_from_db()
+        realty2.refresh_from_db()
+        self.assertEqual((realty1.visits_count, realty2.visits_count), (3, 7))
+        self.assertEqual((stats['keys_flushed'], stats['visits_flushed'], stats['realty_updated']), (2, 10, 2))
+        self.assertFalse(redis_instance.keys("realty:*:views_count"))
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_update_realty_visits_from_redis_restores_counters_on_db_error(self):
+        """update_realty_visits_from_redis() returns counters back to Redis if DB update fails."""
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        redis_instance.flushall()
+        realty = Realty.objects.first()
+        redis_instance.set(f"realty:{realty.id}:views_count", 5)
+
+        with mock.patch('realty.services.realty.update_realty_visits_count_in_db', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                update_realty_visits_from_redis()
+
+        self.assertEqual(get_cached_realty_visits_count_by_realty_id(realty.id), 5)
+
+    def test_update_realty_visits_count_in_db(self):
+        """update_realty_visits_count_in_db() adds visits to `visits_count` of the given realty."""
+        realty = Realty.objects.first()
+
+        self.assertEqual(update_realty_visits_count_in_db({realty.id: 4}), 1)
+        self.assertEqual(update_realty_visits_count_in_db({realty.id: 2, 0: 1}), 1)
+        self.assertEqual(update_realty_visits_count_in_db({}), 0)
+
+        realty.refresh_from_db()
+        self.assertEqual(realty.visits_count, 6)
+
+    def test_get_realty_details(self):
+        """get_realty_details() fetches realty with its location, host, images and amenities by 3 queries."""
+        with self.assertNumQueries(3):
+            realty = get_realty_details(get_all_available_realty()).get(slug='realty-1')
+            self.assertEqual(realty.location.city, 'Moscow')
+            self.assertEqual(realty.host.user.first_name, 'John')
+            self.assertListEqual(list(realty.images.all()), [])
+            self.assertListEqual(list(realty.amenities.all()), [])
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_register_realty_visit(self):
+        """register_realty_visit() counts the visit, visitor, trending and city popularity in a single round trip."""
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        redis_instance.flushall()
+        realty = Realty.objects.get(slug='realty-1')
+        instrument_redis_client()
+
+        with collect_request_stats() as stats:
+            self.assertEqual(register_realty_visit(realty, 'visitor-1'), 1)
+        self.assertEqual(register_realty_visit(realty, 'visitor-1'), 2)
+
+        self.assertEqual((stats.redis_round_trips, stats.redis_commands), (1, 6))
+        self.assertEqual(get_cached_realty_visits_count_by_realty_id(realty.id), 2)
+        self.assertEqual(redis_instance.pfcount(get_daily_visitors_key(realty.id, timezone.localdate())), 1)
+        self.assertEqual(redis_instance.zscore('realty:cities:popularity', 'Moscow'), 2)
+
+
+class RealtyServicesVisitorsTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        self.redis_instance = fakeredis.FakeStrictRedis(
+            server=self.redis_server, charset="utf-8", decode_responses=True,
+        )
+        self.redis_instance.flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_location = Address.objects.create(
+            country='Russia',
+            city='Moscow',
+            street='Arbat, 20',
+        )
+        self.realty = Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.APARTMENTS,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=test_location,
+            host=RealtyHost.objects.create(user=test_user),
+        )
+
+    def test_get_visitor_id(self):
+        """get_visitor_id() returns the same anonymized id for the same visitor."""
+        request_factory = RequestFactory()
+        request1 = request_factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT='Firefox')
+        request2 = request_factory.get('/', REMOTE_ADDR='10.0.0.2', HTTP_USER_AGENT='Firefox')
+        for request in (request1, request2):
+            request.user = AnonymousUser()
+            request.session = SessionStore()
+
+        self.assertEqual(get_visitor_id(request1), get_visitor_id(request1))
+        self.assertNotEqual(get_visitor_id(request1), get_visitor_id(request2))
+        self.assertNotIn('10.0.0.1', get_visitor_id(request1))
+
+    @mock.patch('realty.services.visitors.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_track_realty_visitor(self):
+        """track_realty_visitor() counts unique visitors per day."""
+        day = datetime.date(2026, 10, 14)
+
+        for visitor_id in ('visitor-1', 'visitor-2', 'visitor-1'):
+            track_realty_visitor(self.realty.id, visitor_id, day)
+
+        self.assertEqual(get_realty_unique_visitors_count(self.realty.id, day), 2)
+        self.assertEqual(get_realty_unique_visitors_count(self.realty.id, day + datetime.timedelta(days=1)), 0)
+        self.assertGreater(self.redis_instance.ttl(f"realty:{self.realty.id}:visitors:day:2026-10-14"), 0)
+
+    @mock.patch('realty.services.visitors.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_rollup_realty_unique_visitors(self):
+        """rollup_realty_unique_visitors() saves daily, week-to-date and month-to-date unique visitors."""
+        monday, tuesday = datetime.date(2026, 10, 12), datetime.date(2026, 10, 13)
+        track_realty_visitor(self.realty.id, 'visitor-1', monday)
+        track_realty_visitor(self.realty.id, 'visitor-2', monday)
+        track_realty_visitor(self.realty.id, 'visitor-2', tuesday)
+        track_realty_visitor(self.realty.id, 'visitor-3', tuesday)
+        track_realty_visitor(0, 'visitor-1', tuesday)  # deleted realty
+
+        self.assertEqual(rollup_realty_unique_visitors(monday), 1)
+        self.assertEqual(rollup_realty_unique_visitors(tuesday, batch_size=1), 1)
+        # the same day can be rolled up again
+        self.assertEqual(rollup_realty_unique_visitors(tuesday), 1)
+
+        stats = RealtyDailyStats.objects.get(realty=self.realty, date=tuesday)
+        self.assertEqual(
+            (stats.unique_visitors, stats.week_unique_visitors, stats.month_unique_visitors),
+            (2, 3, 3),
+        )
+        self.assertEqual(RealtyDailyStats.objects.count(), 2)
+
+
+class RealtyServicesVisitsBufferTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index, city in enumerate(('Moscow', 'Rome'), start=1):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=True,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Country', city=city, street='Street, 1'),
+                host=test_host,
+            )
+        self.visits_buffer = RealtyVisitsBuffer(flush_interval=60, flush_size=100)
+
+    @mock.patch('realty.services.visits_buffer.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_flush(self):
+        """RealtyVisitsBuffer.flush() writes all buffered visits to Redis by a single pipeline."""
+        realty1, realty2 = Realty.objects.get(slug='realty-1'), Realty.objects.get(slug='realty-2')
+        self.assertEqual(self.visits_buffer.add(realty1, 'visitor-1'), 1)
+        self.assertEqual(self.visits_buffer.add(realty1, 'visitor-1'), 2)
+        self.assertEqual(self.visits_buffer.add(realty2, 'visitor-2'), 1)
+        instrument_redis_client()
+
+        with collect_request_stats() as stats:
+            self.assertEqual(self.visits_buffer.flush(), 3)
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+
+        self.assertEqual(stats.redis_round_trips, 1)
+        self.assertEqual(len(self.visits_buffer), 0)
+        self.assertEqual(redis_instance.get(f"realty:{realty1.id}:views_count"), '2')
+        self.assertEqual(redis_instance.pfcount(get_daily_visitors_key(realty1.id, timezone.localdate())), 1)
+        self.assertEqual(redis_instance.zscore(get_visits_bucket_key(get_visits_bucket()), realty1.id), 2)
+        self.assertEqual(redis_instance.zscore('realty:cities:popularity', 'Rome'), 1)
+        self.assertEqual(self.visits_buffer.flush(), 0)
+
+    def test_flush_keeps_visits_on_redis_error(self):
+        """RealtyVisitsBuffer.flush() returns visits to the buffer if Redis fails."""
+        realty = Realty.objects.get(slug='realty-1')
+        self.visits_buffer.add(realty, 'visitor-1')
+
+        with mock.patch('realty.services.visits_buffer.redis_instance') as redis_mock:
+            redis_mock.pipeline.return_value.execute.side_effect = RedisError
+            with self.assertRaises(RedisError):
+                self.visits_buffer.flush()
+
+        self.assertEqual(len(self.visits_buffer), 1)
+        self.assertEqual(self.visits_buffer.add(realty, 'visitor-1'), 2)
+
+    @override_settings(REALTY_VISITS_BUFFER_ENABLED=True)
+    @mock.patch('realty.services.visits_buffer.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_register_realty_visit_buffered(self):
+        """register_realty_visit() buffers the visit without Redis calls and counts visits flushed by the process."""
+        realty = Realty.objects.get(slug='realty-1')
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        # visits flushed by other processes
+        redis_instance.set(f"realty:{realty.id}:views_count", 5)
+        instrument_redis_client()
+
+        with mock.patch('realty.services.realty.realty_visits_buffer', self.visits_buffer):
+            with collect_request_stats() as stats:
+                self.assertEqual(register_realty_visit(realty, 'visitor-1'), 1)
+            self.assertEqual(stats.redis_round_trips, 0)
+
+            self.visits_buffer.flush()
+            with collect_request_stats() as stats:
+                # flushed visits (as of the last flush) and visits buffered by this process
+                self.assertEqual(register_realty_visit(realty, 'visitor-1'), 7)
+            self.assertEqual(stats.redis_round_trips, 0)
+
+        self.assertEqual(len(self.visits_buffer), 1)
+
+
+class RealtyServicesCitiesTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index, (city, visits_count, is_available) in enumerate([
+            ('Moscow', 5, True),
+            ('Rome', 30, True),
+            ('Rome', 0, True),
+            ('Paris', 100, False),
+        ], start=1):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=is_available,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                visits_count=visits_count,
+                location=Address.objects.create(country='Country', city=city, street='Street, 1'),
+                host=test_host,
+            )
+
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_increment_city_popularity(self):
+        """increment_city_popularity() increments city score in the ranking."""
+        increment_city_popularity('Moscow')
+        increment_city_popularity('Rome', 2)
+        increment_city_popularity('Moscow', 5)
+
+        self.assertListEqual(get_most_popular_cities(2), ['Moscow', 'Rome'])
+        self.assertListEqual(get_most_popular_cities(1), ['Moscow'])
+        self.assertListEqual(get_most_popular_cities(0), [])
+
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_rebuild_cities_popularity(self):
+        """rebuild_cities_popularity() ranks cities of available realty by visits and realty count."""
+        increment_city_popularity('Paris', 1000)
+
+        self.assertEqual(rebuild_cities_popularity(), 2)
+        self.assertListEqual(get_most_popular_cities(10), ['Rome', 'Moscow'])
+
+
+class RealtyServicesTrendingTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index, (city, is_available) in enumerate([
+            ('Moscow', True),
+            ('Rome', True),
+            ('Rome', True),
+            ('Paris', False),
+        ], start=1):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=is_available,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Country', city=city, street='Street, 1'),
+                host=test_host,
+            )
+        # the end of a visits bucket
+        self.now = timezone.make_aware(datetime.datetime(2022, 1, 1, 12, 0))
+
+    def add_visits(self, realty_slug: str, visits_count: int, bucket: int) -> None:
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        redis_instance.zincrby(get_visits_bucket_key(bucket), visits_count, Realty.objects.get(slug=realty_slug).id)
+
+    @mock.patch('realty.services.trending.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_update_trending_realty(self):
+        """update_trending_realty() adds visits of closed buckets to the global and city rankings with decay."""
+        current_bucket = get_visits_bucket(self.now)
+        self.add_visits('realty-1', 3, current_bucket - 2)
+        self.add_visits('realty-2', 2, current_bucket - 1)
+        self.add_visits('realty-3', 1, current_bucket - 1)
+        self.add_visits('realty-3', 10, current_bucket)  # the current bucket isn't closed yet
+
+        stats = update_trending_realty(self.now)
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+
+        self.assertEqual((stats['visits_processed'], stats['rankings_updated']), (6, 3))
+        self.assertListEqual(
+            get_trending_realty_ids(3),
+            [Realty.objects.get(slug=slug).id for slug in ('realty-1', 'realty-2', 'realty-3')],
+        )
+        self.assertAlmostEqual(
+            redis_instance.zscore('realty:trending', Realty.objects.get(slug='realty-1').id),
+            3 * get_trending_decay(5 * 60),
+        )
+        self.assertListEqual(
+            get_trending_realty_ids(3, city_slug='rome'),
+            [Realty.objects.get(slug=slug).id for slug in ('realty-2', 'realty-3')],
+        )
+        self.assertFalse(redis_instance.exists(get_visits_bucket_key(current_bucket - 1)))
+        self.assertTrue(redis_instance.exists(get_visits_bucket_key(current_bucket)))
+
+    @mock.patch('realty.services.trending.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_update_trending_realty_decays_scores(self):
+        """update_trending_realty() decays scores by the time passed since the previous update."""
+        current_bucket = get_visits_bucket(self.now)
+        self.add_visits('realty-1', 4, current_bucket - 1)
+        update_trending_realty(self.now)
+
+        self.assertEqual(update_trending_realty(self.now)['buckets_processed'], 0)
+
+        self.add_visits('realty-2', 2, current_bucket)
+        update_trending_realty(self.now + datetime.timedelta(hours=6))
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+
+        # 6 hours is the half-life of a trending score
+        realty1, realty2 = Realty.objects.get(slug='realty-1'), Realty.objects.get(slug='realty-2')
+        self.assertAlmostEqual(redis_instance.zscore('realty:trending', realty1.id), 2)
+        self.assertAlmostEqual(redis_instance.zscore('realty:trending:city:moscow', realty1.id), 2)
+        # visits of the bucket, that has ended 5 minutes after the previous update, have decayed by their age
+        self.assertAlmostEqual(
+            redis_instance.zscore('realty:trending', realty2.id), 2 * get_trending_decay(6 * 60 * 60 - 5 * 60),
+        )
+
+    def test_get_trending_decay(self):
+        """get_trending_decay() halves a score every half-life and doesn't grow it for negative ages."""
+        self.assertEqual(get_trending_decay(0), 1)
+        self.assertAlmostEqual(get_trending_decay(6 * 60 * 60), 0.5)
+        self.assertAlmostEqual(get_trending_decay(12 * 60 * 60), 0.25)
+        self.assertEqual(get_trending_decay(-60), 1)
+
+    @mock.patch('realty.services.trending.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_get_trending_realty(self):
+        """get_trending_realty() returns available trending realty in the ranking order by a single query."""
+        current_bucket = get_visits_bucket(self.now)
+        self.add_visits('realty-4', 10, current_bucket - 1)
+        self.add_visits('realty-3', 5, current_bucket - 1)
+        self.add_visits('realty-1', 1, current_bucket - 1)
+        update_trending_realty(self.now)
+
+        with self.assertNumQueries(1):
+            self.assertListEqual(
+                [realty.slug for realty in get_trending_realty(3)], ['realty-3', 'realty-1'],
+            )
+        self.assertListEqual([realty.slug for realty in get_trending_realty(1, city_slug='moscow')], ['realty-1'])
+        self.assertListEqual(list(get_trending_realty(0)), [])
+
+
+class RealtyServicesAutocompleteTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        test_location1 = Address.objects.create(
+            country='Russia',
+            city='Moscow',
+            street='Arbat, 20',
+        )
+        Realty.objects.create(
+            name='Cozy loft near Arbat',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.APARTMENTS,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=test_location1,
+            host=test_host,
+        )
+        test_location2 = Address.objects.create(
+            country='Italy',
+            city='Rome',
+            street='Via Bari, 2',
+        )
+        Realty.objects.create(
+            name='Hidden villa',
+            description='Desc 2',
+            is_available=False,
+            realty_type=RealtyTypeChoices.HOUSE,
+            beds_count=2,
+            max_guests_count=2,
+            price_per_night=40,
+            location=test_location2,
+            host=test_host,
+        )
+
+    def test_normalize_autocomplete_query(self):
+        """normalize_autocomplete_query() lowercases the query and collapses whitespaces."""
+        self.assertEqual(normalize_autocomplete_query('  Cozy   LOFT '), 'cozy loft')
+
+    def test_get_autocomplete_cache_key(self):
+        """get_autocomplete_cache_key() returns a short key without whitespaces for any query."""
+        cache_key = get_autocomplete_cache_key(normalize_autocomplete_query(f"  Cozy   {'LOFT ' * 100}"))
+
+        self.assertLessEqual(len(cache_key), 60)
+        self.assertNotIn(' ', cache_key)
+        self.assertEqual(cache_key, get_autocomplete_cache_key(f"cozy {'loft ' * 99}loft"))
+
+    def test_get_autocomplete_suggestions_misspelled_city(self):
+        """get_autocomplete_suggestions() returns cities that are similar to the misspelled query."""
+        suggestions = get_autocomplete_suggestions('Moskow')
+
+        self.assertListEqual([city['name'] for city in suggestions['cities']], ['Moscow'])
+
+    def test_get_autocomplete_suggestions_realty_name(self):
+        """get_autocomplete_suggestions() returns available realty with similar names."""
+        suggestions = get_autocomplete_suggestions('loft')
+
+        self.assertListEqual([realty['name'] for realty in suggestions['realty']], ['Cozy loft near Arbat'])
+
+    def test_get_autocomplete_suggestions_skips_unavailable_realty(self):
+        """get_autocomplete_suggestions() doesn't suggest unavailable realty (and their cities)."""
+        suggestions = get_autocomplete_suggestions('rome villa')
+
+        self.assertListEqual(suggestions['cities'], [])
+        self.assertListEqual(suggestions['realty'], [])
+
+    def test_get_autocomplete_suggestions_short_query(self):
+        """get_autocomplete_suggestions() returns no suggestions for too short queries."""
+        with self.assertNumQueries(0):
+            suggestions = get_autocomplete_suggestions('m')
+
+        self.assertDictEqual(suggestions, {'cities': [], 'realty': []})
+
+    def test_get_autocomplete_suggestions_cached(self):
+        """get_autocomplete_suggestions() caches suggestions by the normalized query."""
+        suggestions = get_autocomplete_suggestions('Moskow')
+
+        with self.assertNumQueries(0):
+            self.assertDictEqual(get_autocomplete_suggestions('  moskow'), suggestions)
+
+
+class RealtyServicesCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index in range(1, 4):
+            test_location = Address.objects.create(
+                country='Russia',
+                city='Moscow',
+                street=f'Arbat, {realty_index}',
+            )
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description=f'Desc {realty_index}',
+                is_available=True,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=realty_index,
+                max_guests_count=2,
+                price_per_night=40,
+                location=test_location,
+                host=test_host,
+            )
+
+    def test_get_results_fingerprint_normalized(self):
+        """get_results_fingerprint() doesn't depend on the values' order, query case and blank/unknown parameters."""
+        self.assertEqual(
+            get_results_fingerprint('search', {'q': ['Moscow '], 'realty_type': ['House', 'Hotel']}),
+            get_results_fingerprint(
+                'search', {'realty_type': ['Hotel', 'House', 'House'], 'q': ['moscow'], 'beds_count': [''], 'x': ['1']},
+            ),
+        )
+
+    def test_get_results_fingerprint_differs(self):
+        """get_results_fingerprint() differs for different scopes and parameters."""
+        fingerprint = get_results_fingerprint('search', {'q': ['moscow']})
+
+        self.assertNotEqual(fingerprint, get_results_fingerprint('list', {'q': ['moscow']}))
+        self.assertNotEqual(fingerprint, get_results_fingerprint('search', {'q': ['rome']}))
+
+    def test_get_cached_realty_results(self):
+        """get_cached_realty_results() returns ordered ids with the total and caches them."""
+        fingerprint = get_results_fingerprint('list', {})
+        realty_qs = Realty.available.order_by('beds_count')
+
+        results = get_cached_realty_results(fingerprint, realty_qs)
+
+        self.assertDictEqual(results, {'ids': list(realty_qs.values_list('id', flat=True)), 'total': 3})
+        with self.assertNumQueries(0):
+            self.assertDictEqual(get_cached_realty_results(fingerprint, realty_qs), results)
+
+    def test_get_cached_realty_results_max_ids(self):
+        """get_cached_realty_results() caches only `max_ids` ids, but the total count of realty."""
+        results = get_cached_realty_results(get_results_fingerprint('list', {}), Realty.available.all(), max_ids=2)
+
+        self.assertEqual(len(results['ids']), 2)
+        self.assertEqual(results['total'], 3)
+
+    def test_cached_realty_ids(self):
+        """Ids within cached results are taken by CachedRealtyIds from the cache, ids past them from the DB."""
+        realty_qs = Realty.available.order_by('beds_count')
+        all_ids = list(realty_qs.values_list('id', flat=True))
+        realty_ids = CachedRealtyIds(
+            get_cached_realty_results(get_results_fingerprint('list', {}), realty_qs, max_ids=2),
+            realty_qs,
+        )
+
+        self.assertEqual(len(realty_ids), 3)
+        with self.assertNumQueries(0):
+            self.assertListEqual(realty_ids[:2], all_ids[:2])
+            self.assertEqual(realty_ids[1], all_ids[1])
+        with self.assertNumQueries(1):
+            self.assertListEqual(realty_ids[1:3], all_ids[1:3])
+        self.assertEqual(realty_ids[-1], all_ids[-1])
+        with self.assertRaises(IndexError):
+            realty_ids[3]
+
+    def test_get_cached_realty_count(self):
+        """get_cached_realty_count() returns count of realty and caches it."""
+        fingerprint = get_results_fingerprint('list', {})
+
+        self.assertEqual(get_cached_realty_count(fingerprint, Realty.available.all()), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_realty_count(fingerprint, Realty.available.all()), 3)
+
+    def test_cached_results_invalidated_on_realty_change(self):
+        """Cached results are invalidated when Realty changes."""
+        fingerprint = get_results_fingerprint('list', {})
+        get_cached_realty_results(fingerprint, Realty.available.all())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Realty.objects.filter(slug='realty-1').first().delete()
+
+        self.assertEqual(get_cached_realty_results(fingerprint, Realty.available.all())['total'], 2)
+
+    def test_catalogue_version_bumped_on_amenities_change(self):
+        """Catalogue version is bumped when realty amenities change."""
+        version = get_catalogue_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Realty.objects.get(slug='realty-1').amenities.add(Amenity.objects.create(name='wifi'))
+
+        self.assertGreater(get_catalogue_version(), version)
+
+    def test_bump_catalogue_version(self):
+        """bump_catalogue_version() increments catalogue version."""
+        version = get_catalogue_version()
+        self.assertEqual(bump_catalogue_version(), version + 1)
+
+    def test_get_realty_by_ordered_ids(self):
+        """get_realty_by_ordered_ids() returns realty in the order of the given `ids`."""
+        ids = list(Realty.available.order_by('beds_count').values_list('id', flat=True))
+
+        self.assertListEqual([realty.id for realty in get_realty_by_ordered_ids(ids)], ids)
+        self.assertListEqual(list(get_realty_by_ordered_ids([])), [])
+
+
+class RealtyServicesCardsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index in range(1, 4):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=True,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Russia', city='Moscow', street=f'Street, {realty_index}'),
+                host=test_host,
+            )
+        self.realty_ids = list(Realty.objects.order_by('-id').values_list('id', flat=True))
+
+    def test_get_realty_cards(self):
+        """get_realty_cards() renders cards in the order of ids and takes them from cache next time."""
+        with self.assertNumQueries(2):  # cards and their amenities
+            cards = get_realty_cards(self.realty_ids)
+
+        self.assertEqual(len(cards), 3)
+        self.assertIn('Realty 3', cards[0])
+        self.assertIn('Realty 1', cards[2])
+        with self.assertNumQueries(0):
+            self.assertListEqual(get_realty_cards(self.realty_ids), cards)
+
+    def test_get_realty_cards_skips_missing_realty(self):
+        """get_realty_cards() skips ids of realty that doesn't exist."""
+        self.assertEqual(len(get_realty_cards([*self.realty_ids, 0])), 3)
+        self.assertListEqual(get_realty_cards([]), [])
+
+    def test_get_realty_cards_context(self):
+        """get_realty_cards() caches cards rendered with different context separately."""
+        card = get_realty_cards(self.realty_ids[:1])[0]
+        card_with_views = get_realty_cards(self.realty_ids[:1], context={'show_views_count': True})[0]
+
+        self.assertNotIn('view', card)
+        self.assertIn('0 views', card_with_views)
+
+    def test_bump_realty_cards_version(self):
+        """bump_realty_cards_version() invalidates cards of the given realty (or all cards)."""
+        get_realty_cards(self.realty_ids)
+        Realty.objects.filter(id__in=self.realty_ids).update(price_per_night=99)
+
+        bump_realty_cards_version(self.realty_ids[:1])
+        cards = get_realty_cards(self.realty_ids)
+        self.assertIn('99$', cards[0])
+        self.assertNotIn('99$', cards[1])
+
+        bump_realty_cards_version()
+        self.assertTrue(all('99$' in card for card in get_realty_cards(self.realty_ids)))
+
+
+class RealtyServicesAmenityCatalogueTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        self.wifi = Amenity.objects.create(name='wifi')
+        self.kitchen = Amenity.objects.create(name='kitchen')
+        self.catalogue_cache = AmenityCatalogueCache()
+
+    def test_load_amenity_catalogue(self):
+        """load_amenity_catalogue() returns id<->name maps and form choices by a single query."""
+        with self.assertNumQueries(1):
+            catalogue = load_amenity_catalogue()
+
+        self.assertDictEqual(catalogue.names_by_id, {self.wifi.id: 'wifi', self.kitchen.id: 'kitchen'})
+        self.assertDictEqual(catalogue.ids_by_name, {'wifi': self.wifi.id, 'kitchen': self.kitchen.id})
+        self.assertListEqual(catalogue.choices, [(self.wifi.id, 'wifi'), (self.kitchen.id, 'kitchen')])
+
+    @mock.patch('realty.services.amenities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_catalogue_cache(self):
+        """AmenityCatalogueCache.get() loads the catalogue once per process."""
+        self.catalogue_cache.get()
+
+        with self.assertNumQueries(0):
+            catalogue = self.catalogue_cache.get()
+
+        self.assertEqual(catalogue.ids_by_name['wifi'], self.wifi.id)
+
+    @mock.patch('realty.services.amenities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_catalogue_cache_invalidated_by_other_process(self):
+        """AmenityCatalogueCache.get() reloads the catalogue after an invalidation is published by any process."""
+        self.catalogue_cache.get()
+        breakfast = Amenity.objects.create(name='breakfast')
+
+        fakeredis.FakeStrictRedis(server=self.redis_server).publish(AMENITY_CATALOGUE_CHANNEL, 'invalidate')
+
+        with self.assertNumQueries(1):
+            catalogue = self.catalogue_cache.get()
+        self.assertEqual(catalogue.ids_by_name['breakfast'], breakfast.id)
+
+    @override_settings(AMENITY_CATALOGUE_CACHE_ENABLED=True)
+    @mock.patch('realty.services.amenities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_amenity_change_invalidates_catalogue(self):
+        """Amenity change invalidates the cached catalogue (after the transaction is committed)."""
+        with mock.patch('realty.services.amenities.amenity_catalogue_cache', self.catalogue_cache):
+            get_amenity_catalogue()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.wifi.name = 'fast wifi'
+                self.wifi.save()
+
+            self.assertEqual(get_amenity_catalogue().names_by_id[self.wifi.id], 'fast wifi')
+
+    @override_settings(AMENITY_CATALOGUE_CACHE_ENABLED=True)
+    @mock.patch('realty.services.amenities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_forms_render_without_amenity_queries(self):
+        """Forms with amenities render choices from the cached catalogue."""
+        with mock.patch('realty.services.amenities.amenity_catalogue_cache', self.catalogue_cache):
+            get_amenity_catalogue()
+
+            with self.assertNumQueries(0):
+                filters_form_html = RealtyFiltersForm().as_p()
+                RealtyGeneralInfoForm().as_p()
+
+        self.assertIn('kitchen', filters_form_html)
+
+
+class RealtyServicesSitemapsTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        test_host = RealtyHost.objects.create(
+            user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+        )
+        for realty_index in range(1, 4):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=realty_index != 3,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Country', city='Moscow', street=f'Street, {realty_index}'),
+                host=test_host,
+            )
+        self.realty1, self.realty2 = Realty.objects.get(slug='realty-1'), Realty.objects.get(slug='realty-2')
+
+    @mock.patch('realty.services.sitemaps.REALTY_SITEMAP_CHUNK_SIZE', 1)
+    def test_get_realty_sitemap_chunks(self):
+        """get_realty_sitemap_chunks() returns chunks of available realty with their last modification."""
+        with self.assertNumQueries(1):
+            chunks = get_realty_sitemap_chunks()
+
+        self.assertDictEqual(chunks, {self.realty1.id: self.realty1.updated, self.realty2.id: self.realty2.updated})
+
+    def test_render_realty_sitemap_chunk(self):
+        """render_realty_sitemap_chunk() renders URLs of available realty in the chunk."""
+        sitemap, urls_count = render_realty_sitemap_chunk(0, site_root='https://example.com')
+
+        self.assertEqual(urls_count, 2)
+        self.assertIn(f"<loc>https://example.com{self.realty1.get_absolute_url()}</loc>", sitemap['content'])
+        self.assertNotIn('realty-3', sitemap['content'])
+        self.assertEqual(sitemap['last_modified'], max(self.realty1.updated, self.realty2.updated))
+
+    @mock.patch('realty.services.sitemaps.REALTY_SITEMAP_CHUNK_SIZE', 1)
+    def test_build_realty_sitemaps(self):
+        """build_realty_sitemaps() pre-renders the sitemap index and all chunks, so they are served without DB."""
+        stats = build_realty_sitemaps()
+
+        self.assertDictEqual(stats, {'chunks_rendered': 2, 'urls_rendered': 2})
+        with self.assertNumQueries(0):
+            sitemap_index = get_realty_sitemap_index()
+            sitemap = get_realty_sitemap_chunk(self.realty2.id)
+        self.assertListEqual(sitemap_index['chunks'], [self.realty1.id, self.realty2.id])
+        self.assertIn(reverse('realty:sitemap_chunk', kwargs={'chunk': self.realty2.id}), sitemap_index['content'])
+        self.assertIn(self.realty2.get_absolute_url(), sitemap['content'])
+
+    def test_get_realty_sitemap_chunk_unknown(self):
+        """get_realty_sitemap_chunk() returns None for chunks that aren't in the sitemap index."""
+        self.assertIsNone(get_realty_sitemap_chunk(100))
+
+
+class RealtyServicesFacetsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        self.wifi = Amenity.objects.create(name='wifi')
+        self.kitchen = Amenity.objects.create(name='kitchen')
+        for realty_index, (realty_type, price_per_night) in enumerate([
+            (RealtyTypeChoices.HOUSE, 40),
+            (RealtyTypeChoices.HOUSE, 120),
+            (RealtyTypeChoices.HOTEL, 70),
+        ], start=1):
+            test_location = Address.objects.create(
+                country='Russia',
+                city='Moscow' if realty_index < 3 else 'Kazan',
+                street=f'Arbat, {realty_index}',
+            )
+            realty = Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description=f'Desc {realty_index}',
+                is_available=True,
+                realty_type=realty_type,
+                beds_count=realty_index,
+                max_guests_count=2,
+                price_per_night=price_per_night,
+                location=test_location,
+                host=test_host,
+            )
+            realty.amenities.add(self.wifi)
+            if realty_index == 1:
+                realty.amenities.add(self.kitchen)
+
+    def test_get_realty_facets(self):
+        """get_realty_facets() counts realty by type, amenities, beds, guests and price buckets in one query."""
+        with self.assertNumQueries(1):
+            facets = get_realty_facets(Realty.available.all())
+
+        self.assertDictEqual(facets, {
+            'total': 3,
+            'realty_type': {
+                RealtyTypeChoices.HOUSE: 2,
+                RealtyTypeChoices.HOTEL: 1,
+                RealtyTypeChoices.APARTMENTS: 0,
+            },
+            'amenities': {self.wifi.id: 3, self.kitchen.id: 1},
+            'beds_count': {1: 1, 2: 1, 3: 1},
+            'guests_count': {2: 3},
+            'price_per_night': [
+                {'min_price': 0, 'max_price': 49, 'count': 1},
+                {'min_price': 50, 'max_price': 99, 'count': 1},
+                {'min_price': 100, 'max_price': 149, 'count': 1},
+            ],
+        })
+
+    def test_get_realty_facets_filtered(self):
+        """get_realty_facets() counts only realty of the given queryset."""
+        facets = get_realty_facets(Realty.available.filter(realty_type=RealtyTypeChoices.HOUSE))
+
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(facets['realty_type'][RealtyTypeChoices.HOTEL], 0)
+        self.assertDictEqual(facets['amenities'], {self.wifi.id: 2, self.kitchen.id: 1})
+
+    def test_get_cached_realty_facets(self):
+        """get_cached_realty_facets() filters realty by the query parameters and caches facets."""
+        query_params = QueryDict(f'city_slug=moscow&amenities={self.kitchen.id}')
+
+        facets = get_cached_realty_facets(query_params)
+
+        self.assertEqual(facets['total'], 1)
+        with self.assertNumQueries(0):
+            self.assertDictEqual(get_cached_realty_facets(query_params), facets)
+
+    def test_cached_realty_facets_invalidated_on_realty_change(self):
+        """Cached facets are invalidated when Realty changes."""
+        get_cached_realty_facets(QueryDict())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Realty.objects.filter(slug='realty-1').first().delete()
+
+        self.assertEqual(get_cached_realty_facets(QueryDict())['total'], 2)
+
+
+class RealtyServicesGeoTests(TestCase):
+    def setUp(self) -> None:
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        self.realty = {}
+        for city, latitude, longitude in [
+            ('Moscow', Decimal('55.755826'), Decimal('37.617300')),
+            ('Podolsk', Decimal('55.424075'), Decimal('37.554442')),
+            ('Anadyr', Decimal('64.733115'), Decimal('177.508924')),
+            ('Nome', Decimal('64.501114'), Decimal('-165.406376')),
+        ]:
+            test_location = Address.objects.create(
+                country='Russia',
+                city=city,
+                street='Lenina, 1',
+                latitude=latitude,
+                longitude=longitude,
+            )
+            self.realty[city] = Realty.objects.create(
+                name=f'Realty in {city}',
+                description='Desc',
+                is_available=True,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=test_location,
+                host=test_host,
+            )
+
+    def test_parse_bbox(self):
+        """parse_bbox() parses `west,south,east,north` coordinates."""
+        self.assertEqual(
+            parse_bbox('37.3, 55.5,37.9,56'),
+            BoundingBox(Decimal('37.3'), Decimal('55.5'), Decimal('37.9'), Decimal('56')),
+        )
+
+    def test_parse_bbox_invalid(self):
+        """parse_bbox() raises ValueError if bounding box is invalid."""
+        for value in ('', '37.3,55.5,37.9', 'a,b,c,d', '37.3,55.5,37.9,NaN', '37.3,95,37.9,96', '37.3,56,37.9,55'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_bbox(value)
+
+    def test_get_realty_in_bbox(self):
+        """get_realty_in_bbox() returns realty located inside the bounding box."""
+        self.assertListEqual(
+            list(get_realty_in_bbox(parse_bbox('37.3,55.5,37.9,56'))),
+            [self.realty['Moscow']],
+        )
+
+    def test_get_realty_in_bbox_crossing_antimeridian(self):
+        """get_realty_in_bbox() handles bounding boxes that cross the antimeridian."""
+        self.assertListEqual(
+            list(get_realty_in_bbox(parse_bbox('170,60,-160,70')).order_by('id')),
+            [self.realty['Anadyr'], self.realty['Nome']],
+        )
+
+    def test_get_realty_within_radius(self):
+        """get_realty_within_radius() returns realty within the radius ordered by distance."""
+        nearby_realty = list(get_realty_within_radius(55.75, 37.62, 50))
+
+        self.assertListEqual(nearby_realty, [self.realty['Moscow'], self.realty['Podolsk']])
+        self.assertAlmostEqual(nearby_realty[1].distance, 37, delta=1)
+        self.assertFalse(get_realty_within_radius(55.75, 37.62, 10).filter(id=self.realty['Podolsk'].id).exists())
+
+    def test_get_realty_map_markers(self):
+        """get_realty_map_markers() returns markers of realty inside the bounding box."""
+        realty = self.realty['Moscow']
+
+        self.assertListEqual(
+            get_realty_map_markers(parse_bbox('37.3,55.5,37.9,56')),
+            [
+                {
+                    'id': realty.id,
+                    'name': realty.name,
+                    'url': realty.get_absolute_url(),
+                    'realty_type': realty.realty_type,
+                    'price_per_night': realty.price_per_night,
+                    'latitude': 55.755826,
+                    'longitude': 37.6173,
+                },
+            ],
+        )
+
+
+@override_settings(REALTY_BITMAP_INDEX_ENABLED=True)
+class RealtyServicesBitmapsTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        self.redis_instance = fakeredis.FakeStrictRedis(
+            server=self.redis_server, charset="utf-8", decode_responses=True,
+        )
+        self.redis_instance.flushall()
+        redis_patcher = mock.patch('realty.services.bitmaps.redis_instance', self.redis_instance)
+        redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+        redis_binary_patcher = mock.patch(
+            'realty.services.bitmaps.redis_binary_instance',
+            fakeredis.FakeStrictRedis(server=self.redis_server, decode_responses=False),
+        )
+        redis_binary_patcher.start()
+        self.addCleanup(redis_binary_patcher.stop)
+
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        self.wifi = Amenity.objects.create(name='wifi')
+        self.kitchen = Amenity.objects.create(name='kitchen')
+        self.realty = []
+        for realty_index, (realty_type, is_available) in enumerate([
+            (RealtyTypeChoices.HOUSE, True),
+            (RealtyTypeChoices.HOTEL, True),
+            (RealtyTypeChoices.HOUSE, False),
+        ], start=1):
+            test_location = Address.objects.create(
+                country='Russia',
+                city='Moscow',
+                street=f'Arbat, {realty_index}',
+            )
+            self.realty.append(Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description=f'Desc {realty_index}',
+                is_available=is_available,
+                realty_type=realty_type,
+                beds_count=realty_index,
+                max_guests_count=2,
+                price_per_night=40,
+                location=test_location,
+                host=test_host,
+            ))
+        self.realty[0].amenities.add(self.wifi, self.kitchen)
+        self.realty[1].amenities.add(self.kitchen)
+        self.realty[2].amenities.add(self.wifi)
+
+    def test_get_bitmap_ids(self):
+        """get_bitmap_ids() returns offsets of set bits."""
+        self.assertListEqual(get_bitmap_ids(b'\x80\x01'), [0, 15])
+        self.assertListEqual(get_bitmap_ids(b'\x00\n\x00\x00\xff'), [12, 14, *range(32, 40)])
+        self.assertListEqual(get_bitmap_ids(b''), [])
+
+    def test_get_candidate_realty_ids_by_type(self):
+        """get_candidate_realty_ids() returns ids of available realty of any of the given types."""
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=[RealtyTypeChoices.HOUSE]),
+            [self.realty[0].id],
+        )
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=[RealtyTypeChoices.HOUSE, RealtyTypeChoices.HOTEL]),
+            [self.realty[0].id, self.realty[1].id],
+        )
+
+    def test_get_candidate_realty_ids_by_type_and_amenities(self):
+        """get_candidate_realty_ids() intersects realty types with amenities."""
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=[RealtyTypeChoices.HOTEL], amenity_ids=[self.wifi.id]),
+            [],
+        )
+        self.assertListEqual(
+            get_candidate_realty_ids(amenity_ids=[self.wifi.id]),
+            [self.realty[0].id],
+        )
+        self.assertFalse(self.redis_instance.keys('realty:bitmaps:candidates:*'))
+
+    def test_get_candidate_realty_ids_max_count(self):
+        """get_candidate_realty_ids() returns None if there are more candidates than `max_count`."""
+        realty_types = [RealtyTypeChoices.HOUSE, RealtyTypeChoices.HOTEL]
+
+        self.assertIsNone(get_candidate_realty_ids(realty_types=realty_types, max_count=1))
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=realty_types, max_count=2),
+            [self.realty[0].id, self.realty[1].id],
+        )
+
+    def test_bitmaps_updated_on_realty_change(self):
+        """Bitmaps are updated when Realty is changed or deleted."""
+        self.realty[2].is_available = True
+        self.realty[2].save()
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=[RealtyTypeChoices.HOUSE]),
+            [self.realty[0].id, self.realty[2].id],
+        )
+
+        self.realty[0].delete()
+        self.assertListEqual(get_candidate_realty_ids(amenity_ids=[self.wifi.id]), [self.realty[2].id])
+
+    def test_bitmaps_updated_on_amenities_change(self):
+        """Bitmaps are updated when realty amenities are added, removed or cleared."""
+        self.realty[0].amenities.remove(self.kitchen)
+        self.assertListEqual(get_candidate_realty_ids(amenity_ids=[self.kitchen.id]), [self.realty[1].id])
+
+        self.wifi.realty.add(self.realty[1])
+        self.assertListEqual(
+            get_candidate_realty_ids(amenity_ids=[self.wifi.id]),
+            [self.realty[0].id, self.realty[1].id],
+        )
+
+        self.realty[1].amenities.clear()
+        self.assertListEqual(get_candidate_realty_ids(amenity_ids=[self.wifi.id]), [self.realty[0].id])
+
+    def test_rebuild_realty_bitmaps(self):
+        """rebuild_realty_bitmaps() rebuilds all bitmaps from the database."""
+        self.redis_instance.flushall()
+        self.redis_instance.setbit('realty:bitmaps:amenity:999', self.realty[1].id, 1)
+
+        self.assertEqual(rebuild_realty_bitmaps(batch_size=2), 3)
+
+        self.assertListEqual(get_candidate_realty_ids(amenity_ids=[self.wifi.id]), [self.realty[0].id])
+        self.assertListEqual(
+            get_candidate_realty_ids(realty_types=[RealtyTypeChoices.HOTEL], amenity_ids=[self.kitchen.id]),
+            [self.realty[1].id],
+        )
+        self.assertFalse(self.redis_instance.exists('realty:bitmaps:amenity:999'))
+        self.assertFalse(self.redis_instance.keys('realty:bitmaps:rebuild:*'))
+
+    def test_get_filtered_available_realty_with_bitmaps(self):
+        """get_filtered_available_realty() filters realty types and amenities by bitmaps."""
+        query_params = QueryDict(f'realty_type=House&realty_type=Hotel&amenities={self.kitchen.id}&beds_count=2')
+
+        self.assertListEqual(list(get_filtered_available_realty(query_params)), [self.realty[1]])
+
+    @mock.patch('realty.services.realty.get_candidate_realty_ids', return_value=None)
+    def test_get_filtered_available_realty_with_too_many_candidates(self, *args):
+        """get_filtered_available_realty() filters realty by SQL if too many realty match the bitmaps."""
+        query_params = QueryDict(f'realty_type=House&realty_type=Hotel&amenities={self.kitchen.id}&beds_count=2')
+
+        self.assertListEqual(list(get_filtered_available_realty(query_params)), [self.realty[1]])
+
 
 @override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class RealtyServicesImagesTests(TestCase):
@@ -405,6 +1606,46 @@ class RealtyServicesImagesTests(TestCase):
             [RealtyImage.objects.get(id=test_image_id)],
         )
 
+    def test_get_realty_image_url(self):
+        """get_realty_image_url() returns the same url as the RealtyImage object."""
+        test_image = RealtyImage.objects.first()
+        self.assertEqual(get_realty_image_url(test_image.image.name), test_image.image.url)
+
+    def test_get_listing_cards(self):
+        """get_listing_cards() annotates realty with the first image path and amenities count."""
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+        test_realty.amenities.add(
+            Amenity.objects.create(name='wifi'),
+            Amenity.objects.create(name='kitchen'),
+        )
+
+        realty_card = get_listing_cards(Realty.objects.filter(slug='realty-1')).get()
+
+        self.assertEqual(realty_card.first_image_path, test_realty.images.first().image.name)
+        self.assertEqual(realty_card.amenities_count, 2)
+
+    def test_get_listing_cards_no_images(self):
+        """get_listing_cards() sets `first_image_path` to None if realty has no images."""
+        RealtyImage.objects.filter(realty__slug='image-test').delete()
+
+        realty_card = get_listing_cards(Realty.objects.filter(slug='image-test')).get()
+
+        self.assertIsNone(realty_card.first_image_path)
+        self.assertEqual(realty_card.amenities_count, 0)
+
+    def test_get_listing_cards_constant_queries(self):
+        """get_listing_cards() renders all card fields in a constant number of queries."""
+        for realty in Realty.objects.all():
+            realty.amenities.add(Amenity.objects.get_or_create(name='wifi')[0])
+
+        with self.assertNumQueries(2):  # realty (with location) + amenities
+            for realty_card in get_listing_cards(Realty.objects.all()):
+                _ = (
+                    realty_card.first_image_path,
+                    realty_card.location.street,
+                    [amenity.name for amenity in realty_card.amenities.all()],
+                )
+
     def test_update_images_order(self):
         test_realty: Realty = Realty.objects.get(slug='realty-1')
         test_image1: RealtyImage = test_realty.images.all()[0]
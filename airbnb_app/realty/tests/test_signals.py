@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from addresses.models import Address
+from hosts.models import RealtyHost
+
+from ..models import Amenity, Realty, RealtyTypeChoices
+from ..services.cache import get_realty_validators
+from ..services.cards import get_realty_cards
+from ..services.realty import get_available_realty_search_results
+
+
+class RealtySignalsTests(TestCase):
+    def setUp(self) -> None:
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        test_location = Address.objects.create(
+            country='Russia',
+            city='Moscow',
+            street='Arbat, 20',
+        )
+        Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.APARTMENTS,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=test_location,
+            host=test_host,
+        )
+
+    def test_search_vector_is_set_for_new_realty(self):
+        """Test that `search_vector` is filled when a new Realty is created."""
+        self.assertIsNotNone(Realty.objects.get(slug='realty-1').search_vector)
+
+    def test_search_vector_is_updated_on_realty_change(self):
+        """Test that `search_vector` is rebuilt when Realty's name changes."""
+        test_realty = Realty.objects.get(slug='realty-1')
+        test_realty.name = 'Cozy loft'
+        test_realty.save()
+
+        self.assertListEqual(list(get_available_realty_search_results('loft')), [test_realty])
+
+    def test_search_vector_is_updated_on_address_change(self):
+        """Test that `search_vector` is rebuilt when the city of Realty's location changes."""
+        test_realty = Realty.objects.get(slug='realty-1')
+        test_realty.location.city = 'Kazan'
+        test_realty.location.save()
+
+        self.assertListEqual(list(get_available_realty_search_results('Kazan')), [test_realty])
+        self.assertListEqual(list(get_available_realty_search_results('Moscow')), [])
+
+    def test_card_is_invalidated_on_realty_change(self):
+        """Test that cached realty card is re-rendered after the realty change."""
+        cache.clear()
+        realty = Realty.objects.get(slug='realty-1')
+        get_realty_cards([realty.id])
+
+        realty.name = 'Renamed realty'
+        with self.captureOnCommitCallbacks(execute=True):
+            realty.save()
+
+        self.assertIn('Renamed realty', get_realty_cards([realty.id])[0])
+
+    def test_cards_are_invalidated_on_amenity_change(self):
+        """Test that cached realty cards are re-rendered after amenities change."""
+        cache.clear()
+        realty = Realty.objects.get(slug='realty-1')
+        amenity = Amenity.objects.create(name='wifi')
+        get_realty_cards([realty.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            realty.amenities.add(amenity)
+        self.assertIn('wifi', get_realty_cards([realty.id])[0])
+
+        amenity.name = 'kitchen'
+        with self.captureOnCommitCallbacks(execute=True):
+            amenity.save()
+        self.assertIn('kitchen', get_realty_cards([realty.id])[0])
+
+    def test_validators_change_on_host_change(self):
+        """Test that realty ETag changes after the host's profile image or name change (they're rendered with it)."""
+        cache.clear()
+        realty = Realty.objects.get(slug='realty-1')
+        etag = get_realty_validators(realty.id)['etag']
+
+        profile = realty.host.user.profile
+        profile.profile_image = 'profile_images/host.jpg'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        profile_etag = get_realty_validators(realty.id)['etag']
+        self.assertNotEqual(profile_etag, etag)
+
+        user = realty.host.user
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=['last_login'])
+        self.assertEqual(get_realty_validators(realty.id)['etag'], profile_etag)
+
+        user.first_name = 'Jack'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=['first_name'])
+        self.assertNotEqual(get_realty_validators(realty.id)['etag'], profile_etag)
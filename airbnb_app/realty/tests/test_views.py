@@ -5,8 +5,12 @@ from unittest import mock
 
 import fakeredis
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from accounts.models import CustomUser
 from addresses.forms import AddressForm
@@ -18,9 +22,15 @@ from common.testing_utils import create_valid_image
 from hosts.models import RealtyHost
 
 from .. import views
+from ..api.pagination import RealtyKeysetPagination
 from ..constants import MAX_REALTY_IMAGES_COUNT, REALTY_FORM_KEYS_COLLECTOR_NAME, REALTY_FORM_SESSION_PREFIX
 from ..forms import RealtyForm, RealtyGeneralInfoForm, RealtyImageFormSet, RealtyTypeForm
 from ..models import Amenity, Realty, RealtyImage, RealtyTypeChoices
+from ..services.cache import bump_realty_cards_version
+from ..services.cities import get_most_popular_cities
+from ..services.realty import get_cached_realty_visits_count_by_realty_id
+from ..services.sitemaps import build_realty_sitemaps
+from ..services.visitors import get_realty_unique_visitors_count
 
 
 MEDIA_ROOT = tempfile.mkdtemp()
@@ -28,6 +38,8 @@ MEDIA_ROOT = tempfile.mkdtemp()
 
 class RealtySearchResultsViewTests(TestCase):
     def setUp(self) -> None:
+        # cached results are invalidated on commit, so results of other tests are kept in the cache
+        cache.clear()
         test_user1 = CustomUser.objects.create_user(
             email='user1@gmail.com',
             first_name='John',
@@ -150,6 +162,16 @@ class RealtySearchResultsViewTests(TestCase):
             transform=lambda x: x,
         )
 
+    @mock.patch.object(views.RealtySearchResultsView, 'paginate_by', 3)
+    def test_results_are_paginated(self):
+        """Search results are paginated, `realty_count` is the count of all results."""
+        response = self.client.get(reverse('realty:search'), {'page': 2})
+
+        self.assertEqual(response.context['realty_count'], 4)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(len(response.context['realty_list']), 1)
+        self.assertEqual(len(response.context['realty_cards']), 1)
+
     def test_get_queryset_if_query_params_with_realty_type(self):
         """Test that if there is not only `q` query parameter, but also other filters/query parameters in the URL,
         queryset includes only valid search results.
@@ -167,6 +189,8 @@ class RealtySearchResultsViewTests(TestCase):
 
 class RealtyListViewTests(TestCase):
     def setUp(self) -> None:
+        # cached results are invalidated on commit, so results of other tests are kept in the cache
+        cache.clear()
         test_user1 = CustomUser.objects.create_user(
             email='user1@gmail.com',
             first_name='John',
@@ -287,6 +311,39 @@ class RealtyListViewTests(TestCase):
             transform=lambda x: x,
         )
 
+    def test_keyset_pagination_next_page(self):
+        """Test that `next_cursor` of the page points to the next 3 realty objects."""
+        response = self.client.get(reverse('realty:all'))
+        next_cursor = response.context['page_obj'].next_cursor
+
+        response = self.client.get(f"{reverse('realty:all')}?cursor={next_cursor}")
+
+        self.assertQuerysetEqual(
+            response.context['realty_list'],
+            Realty.available.order_by('-created', '-id')[3:6],
+            transform=lambda x: x,
+        )
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+    def test_keyset_pagination_previous_page(self):
+        """Test that `previous_cursor` of the second page points back to the first page."""
+        response = self.client.get(reverse('realty:all'))
+        first_page = list(response.context['realty_list'])
+        next_cursor = response.context['page_obj'].next_cursor
+
+        response = self.client.get(f"{reverse('realty:all')}?cursor={next_cursor}")
+        previous_cursor = response.context['page_obj'].previous_cursor
+        response = self.client.get(f"{reverse('realty:all')}?cursor={previous_cursor}")
+
+        self.assertListEqual(list(response.context['realty_list']), first_page)
+        self.assertFalse(response.context['page_obj'].has_previous())
+        self.assertTrue(response.context['page_obj'].has_next())
+
+    def test_keyset_pagination_invalid_cursor(self):
+        """Test that invalid cursor leads to the 404 page."""
+        response = self.client.get(f"{reverse('realty:all')}?cursor=invalid")
+        self.assertEqual(response.status_code, 404)
+
     def test_get_queryset_if_query_params(self):
         """Test that if there are some query parameters in the URL, queryset includes only filtered results."""
         realty_type_param = RealtyTypeChoices.HOTEL
@@ -431,6 +488,82 @@ class RealtyDetailViewTests(TestCase):
         # views count should change
         self.assertEqual(int(response.context['realty_views_count']), 4)
 
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    @mock.patch('realty.services.visitors.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_unique_visitors_tracked(self):
+        """Test that repeated visits of the same visitor are counted once in unique visitors."""
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+
+        for _ in range(3):
+            self.client.get(reverse('realty:detail', kwargs={'pk': test_realty.pk, 'slug': test_realty.slug}))
+
+        self.assertEqual(get_realty_unique_visitors_count(test_realty.id), 1)
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    @mock.patch('realty.services.visitors.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    @mock.patch('realty.services.cities.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_city_popularity_incremented(self):
+        """Test that realty visit increments its city popularity."""
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+
+        self.client.get(reverse('realty:detail', kwargs={'pk': test_realty.pk, 'slug': test_realty.slug}))
+
+        self.assertListEqual(get_most_popular_cities(1), ['Moscow'])
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_queries_count(self):
+        """Test that realty with its location, host, images and amenities is fetched by 3 queries.
+
+        One more query takes the realty validators (ETag and Last-Modified).
+        """
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                reverse('realty:detail', kwargs={'pk': test_realty.pk, 'slug': test_realty.slug}),
+            )
+
+        self.assertEqual(response['X-Request-DB-Queries'], '4')
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_not_modified(self):
+        """Conditional request is answered with `304 Not Modified` without rendering, but the visit is counted."""
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+        url = reverse('realty:detail', kwargs={'pk': test_realty.pk, 'slug': test_realty.slug})
+        response = self.client.get(url)
+        visits_count = get_cached_realty_visits_count_by_realty_id(test_realty.pk)
+
+        with self.assertNumQueries(2):  # validators and the visited realty city
+            not_modified_response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response['ETag'], response['ETag'])
+        self.assertEqual(get_cached_realty_visits_count_by_realty_id(test_realty.pk), visits_count + 1)
+
+    @mock.patch('realty.services.realty.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_realty_cards_version_modifies_page(self):
+        """Realty cards version bump (e.g. on image changes) changes the page ETag, though `updated` isn't changed."""
+        test_realty: Realty = Realty.objects.get(slug='realty-1')
+        url = reverse('realty:detail', kwargs={'pk': test_realty.pk, 'slug': test_realty.slug})
+        response = self.client.get(url)
+
+        bump_realty_cards_version([test_realty.pk])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
 
 @override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class RealtyEditViewTests(TestCase):
@@ -1775,3 +1908,674 @@ class RealtyImageOrderViewTests(TestCase):
         # new order
         self.assertEqual(self.image1.order, 1)
         self.assertEqual(self.image2.order, 0)
+
+
+class RealtyMapViewTests(TestCase):
+    def setUp(self) -> None:
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        test_location = Address.objects.create(
+            country='Russia',
+            city='Moscow',
+            street='Arbat, 20',
+            latitude=55.752,
+            longitude=37.592,
+        )
+        self.test_realty = Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.APARTMENTS,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=test_location,
+            host=test_host,
+        )
+
+    def test_view_returns_markers_inside_bbox(self):
+        """Test that view returns markers of realty inside the map viewport."""
+        response = self.client.get(reverse('realty:map'), {'bbox': '37.3,55.5,37.9,56'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([marker['id'] for marker in response.json()['markers']], [self.test_realty.id])
+
+    def test_view_applies_list_filters(self):
+        """Test that markers are filtered by the list filters."""
+        response = self.client.get(reverse('realty:map'), {'bbox': '37.3,55.5,37.9,56', 'beds_count': 2})
+
+        self.assertListEqual(response.json()['markers'], [])
+
+    def test_view_bad_request_if_bbox_is_invalid(self):
+        """Test that view returns 400 if `bbox` is missing or invalid."""
+        response = self.client.get(reverse('realty:map'), {'bbox': '37.3,55.5'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bbox', response.json())
+
+
+class RealtyTrendingViewTests(TestCase):
+    redis_server = fakeredis.FakeServer()
+
+    def setUp(self) -> None:
+        fakeredis.FakeStrictRedis(server=self.redis_server).flushall()
+        test_user = CustomUser.objects.create_user(
+            email='user1@gmail.com',
+            first_name='John',
+            last_name='Doe',
+            password='test',
+        )
+        test_host = RealtyHost.objects.create(user=test_user)
+        for realty_index, city in enumerate(('Moscow', 'Rome'), start=1):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=True,
+                realty_type=RealtyTypeChoices.APARTMENTS,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Country', city=city, street='Street, 1'),
+                host=test_host,
+            )
+
+    @mock.patch('realty.services.trending.redis_instance',
+                fakeredis.FakeStrictRedis(server=redis_server, charset="utf-8", decode_responses=True))
+    def test_view_lists_trending_realty(self):
+        """Test that view lists realty in the trending ranking order (optionally in a city)."""
+        redis_instance = fakeredis.FakeStrictRedis(server=self.redis_server, charset="utf-8", decode_responses=True)
+        redis_instance.zadd('realty:trending', {Realty.objects.get(slug='realty-1').id: 1})
+        redis_instance.zadd('realty:trending', {Realty.objects.get(slug='realty-2').id: 5})
+        redis_instance.zadd('realty:trending:city:moscow', {Realty.objects.get(slug='realty-1').id: 1})
+
+        response = self.client.get(reverse('realty:trending'))
+        city_response = self.client.get(reverse('realty:trending_by_city', kwargs={'city_slug': 'moscow'}))
+
+        self.assertTemplateUsed(response, 'realty/realty/trending.html')
+        self.assertListEqual([realty.slug for realty in response.context['realty_list']], ['realty-2', 'realty-1'])
+        self.assertListEqual([realty.slug for realty in city_response.context['realty_list']], ['realty-1'])
+        self.assertIn('Realty 1', city_response.context['realty_cards'][0])
+        self.assertEqual(city_response.context['city'], 'Moscow')
+
+
+class RealtySitemapViewsTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.HOTEL,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+            host=RealtyHost.objects.create(
+                user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+            ),
+        )
+        self.realty = Realty.objects.get(slug='realty-1')
+        build_realty_sitemaps()
+
+    def test_sitemap_index(self):
+        """Sitemap index refers to sitemap chunks and is served with `Last-Modified`."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('realty:sitemap'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertEqual(response['Last-Modified'], http_date(int(self.realty.updated.timestamp())))
+        self.assertContains(response, reverse('realty:sitemap_chunk', kwargs={'chunk': 0}))
+
+    def test_sitemap_chunk(self):
+        """Sitemap chunk contains realty URLs."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('realty:sitemap_chunk', kwargs={'chunk': 0}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.realty.get_absolute_url())
+
+    def test_sitemap_not_modified(self):
+        """Sitemap isn't sent again if it hasn't been modified since the crawler's last visit."""
+        response = self.client.get(reverse('realty:sitemap'))
+
+        response = self.client.get(reverse('realty:sitemap'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_sitemap_chunk(self):
+        """Unknown sitemap chunks aren't found."""
+        response = self.client.get(reverse('realty:sitemap_chunk', kwargs={'chunk': 100}))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class RealtyApiConditionalGetTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.HOTEL,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+            host=RealtyHost.objects.create(
+                user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+            ),
+        )
+        self.realty = Realty.objects.get(slug='realty-1')
+
+    def test_detail_not_modified(self):
+        """Realty API object is answered with `304 Not Modified` by its ETag or Last-Modified (without serializing)."""
+        url = reverse('api:realty_detail', kwargs={'pk': self.realty.pk})
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+
+        with self.assertNumQueries(1):
+            etag_response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+        last_modified_response = self.client.get(
+            url, HTTP_ACCEPT='application/json', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(etag_response.status_code, 304)
+        self.assertEqual(last_modified_response.status_code, 304)
+
+    def test_detail_modified(self):
+        """Realty API object ETag changes with the realty."""
+        url = reverse('api:realty_detail', kwargs={'pk': self.realty.pk})
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+
+        self.realty.price_per_night = 50
+        self.realty.save()
+
+        response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_by_catalogue_version(self):
+        """Realty API list ETag changes with the catalogue version (bumped on listing writes)."""
+        url = reverse('api:realty_list')
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+
+        with self.assertNumQueries(0):
+            not_modified_response = self.client.get(
+                url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+        self.assertEqual(not_modified_response.status_code, 304)
+
+        self.realty.name = 'New name'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.realty.save()
+
+        response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_etags_change_on_host_change(self):
+        """Realty API list and object ETags change with the host data, that is rendered with realty."""
+        list_url = reverse('api:realty_list')
+        detail_url = reverse('api:realty_detail', kwargs={'pk': self.realty.pk})
+        list_response = self.client.get(list_url, HTTP_ACCEPT='application/json')
+        detail_response = self.client.get(detail_url, HTTP_ACCEPT='application/json')
+
+        user = self.realty.host.user
+        user.email = 'host@gmail.com'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        list_response = self.client.get(
+            list_url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=list_response['ETag'],
+        )
+        detail_response = self.client.get(
+            detail_url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=detail_response['ETag'],
+        )
+        self.assertEqual(list_response.status_code, 200)
+        self.assertEqual(detail_response.status_code, 200)
+        self.assertEqual(detail_response.json()['host']['user']['email'], 'host@gmail.com')
+
+
+class RealtyListApiSerializationTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        wifi, kitchen = Amenity.objects.create(name='wifi'), Amenity.objects.create(name='kitchen')
+        for realty_index in range(1, 4):
+            host = RealtyHost.objects.create(
+                user=CustomUser.objects.create_user(email=f'user{realty_index}@gmail.com', password='test'),
+            )
+            realty = Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc',
+                is_available=True,
+                realty_type=RealtyTypeChoices.HOTEL,
+                beds_count=1,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Russia', city='Moscow', street=f'Arbat, {realty_index}'),
+                host=host,
+            )
+            realty.amenities.add(wifi, *([kitchen] if realty_index > 1 else []))
+
+    def test_list_queries_count(self):
+        """Realty with location, host, user, profile and amenities are listed by 2 queries."""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api:realty_list'), HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['host']['user']['email'], 'user3@gmail.com')
+
+    def test_fast_list(self):
+        """Fast serialization (from `.values()` rows) has the same representation as `RealtySerializer`."""
+        url = reverse('api:realty_list')
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+
+        with self.assertNumQueries(3):  # realty rows, amenity ids and the amenity catalogue
+            fast_response = self.client.get(f"{url}?fast=1", HTTP_ACCEPT='application/json')
+
+        self.assertEqual(fast_response.status_code, 200)
+        self.assertListEqual(fast_response.json()['results'], response.json()['results'])
+
+    def test_fast_list_next_page(self):
+        """Fast serialization is paginated by the same cursors."""
+        url = reverse('api:realty_list')
+        next_url = self.client.get(f"{url}?fast=1", HTTP_ACCEPT='application/json').json()['next']
+
+        response = self.client.get(next_url, HTTP_ACCEPT='application/json')
+
+        self.assertListEqual([realty['name'] for realty in response.json()['results']], ['Realty 1'])
+
+
+@mock.patch.object(RealtyKeysetPagination, 'page_size', 2)
+class RealtyListApiPaginationTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.host = RealtyHost.objects.create(
+            user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+        )
+        for realty_index in range(1, 6):
+            self.create_realty(realty_index)
+
+    def create_realty(self, realty_index: int) -> Realty:
+        return Realty.objects.create(
+            name=f'Realty {realty_index}',
+            description='Desc',
+            is_available=True,
+            realty_type=RealtyTypeChoices.HOTEL,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street=f'Arbat, {realty_index}'),
+            host=self.host,
+        )
+
+    def get_page(self, url: str) -> dict:
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_are_followed_by_cursors(self):
+        """Realty API list is paginated by `next`/`previous` cursors (without `count`), newest realty first,
+        and realty created between requests don't shift the following pages.
+        """
+        first_page = self.get_page(reverse('api:realty_list'))
+        self.assertNotIn('count', first_page)
+        self.assertIsNone(first_page['previous'])
+        self.assertListEqual([realty['name'] for realty in first_page['results']], ['Realty 5', 'Realty 4'])
+
+        self.create_realty(6)
+
+        second_page = self.get_page(first_page['next'])
+        self.assertListEqual([realty['name'] for realty in second_page['results']], ['Realty 3', 'Realty 2'])
+
+        last_page = self.get_page(second_page['next'])
+        self.assertListEqual([realty['name'] for realty in last_page['results']], ['Realty 1'])
+        self.assertIsNone(last_page['next'])
+
+        self.create_realty(7)
+
+        previous_page = self.get_page(second_page['previous'])
+        self.assertListEqual([realty['name'] for realty in previous_page['results']], ['Realty 5', 'Realty 4'])
+        # realty created after the first page are before it
+        newest_page = self.get_page(previous_page['previous'])
+        self.assertListEqual([realty['name'] for realty in newest_page['results']], ['Realty 7', 'Realty 6'])
+        self.assertIsNone(newest_page['previous'])
+
+    def test_invalid_cursor(self):
+        """Realty API list answers `404 Not Found` to an invalid cursor."""
+        response = self.client.get(reverse('api:realty_list'), {'cursor': 'invalid'}, HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class RealtyApiFieldsetTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        wifi = Amenity.objects.create(name='wifi')
+        self.realty = Realty.objects.create(
+            name='Realty 1',
+            description='Desc 1',
+            is_available=True,
+            realty_type=RealtyTypeChoices.HOTEL,
+            beds_count=1,
+            max_guests_count=2,
+            price_per_night=40,
+            location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+            host=RealtyHost.objects.create(
+                user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'),
+            ),
+        )
+        self.realty.amenities.add(wifi)
+        self.wifi = wifi
+
+    def get_results(self, **params) -> list:
+        response = self.client.get(reverse('api:realty_list'), params, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_sparse_fields(self):
+        """Only requested fields are fetched (by a single query without joins) and returned."""
+        with CaptureQueriesContext(connection) as queries:
+            results = self.get_results(fields='id,name,price_per_night')
+
+        self.assertListEqual(results, [{'id': self.realty.pk, 'name': 'Realty 1', 'price_per_night': 40}])
+        realty_queries = [query['sql'] for query in queries if 'realty_realty' in query['sql']]
+        self.assertEqual(len(realty_queries), 1)
+        self.assertNotIn('JOIN', realty_queries[0])
+        self.assertNotIn('description', realty_queries[0])
+
+    def test_relations_by_ids(self):
+        """Relations that aren't expanded are returned by ids."""
+        results = self.get_results(fields='id,location,host,amenities', expand='location')
+
+        self.assertEqual(results[0]['location']['city'], 'Moscow')
+        self.assertEqual(results[0]['host'], self.realty.host_id)
+        self.assertListEqual(results[0]['amenities'], [self.wifi.pk])
+
+    def test_expand(self):
+        """Expanded relations are returned even if they aren't in `fields`."""
+        results = self.get_results(fields='id', expand='host,amenities')
+
+        self.assertListEqual(list(results[0]), ['id', 'host', 'amenities'])
+        self.assertEqual(results[0]['host']['user']['email'], 'user1@gmail.com')
+        self.assertListEqual(results[0]['amenities'], [{'id': self.wifi.pk, 'name': 'wifi'}])
+
+    def test_fast_sparse_fields(self):
+        """Fast serialization supports sparse fieldsets."""
+        params = {'fields': 'id,name,host,amenities', 'expand': 'amenities'}
+
+        self.assertListEqual(self.get_results(fast=1, **params), self.get_results(**params))
+
+    def test_unknown_fields(self):
+        response = self.client.get(
+            reverse('api:realty_list'), {'fields': 'id,password', 'expand': 'name'}, HTTP_ACCEPT='application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertSetEqual(set(response.json()), {'fields', 'expand'})
+
+    def test_detail_fieldset(self):
+        """Realty API object supports sparse fieldsets (and its ETag depends on them)."""
+        url = reverse('api:realty_detail', kwargs={'pk': self.realty.pk})
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        fieldset_response = self.client.get(
+            url, {'fields': 'id,name', 'expand': 'location'},
+            HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+
+        self.assertNotIn('id', response.json())
+        self.assertEqual(fieldset_response.status_code, 200)
+        self.assertListEqual(list(fieldset_response.json()), ['id', 'name', 'location'])
+        self.assertEqual(fieldset_response.json()['location']['city'], 'Moscow')
+
+
+class RealtyExportApiViewTests(TestCase):
+
+    def setUp(self) -> None:
+        host = RealtyHost.objects.create(user=CustomUser.objects.create_user(email='user1@gmail.com', password='test'))
+        for realty_index, beds_count in enumerate((1, 2, 3), start=1):
+            Realty.objects.create(
+                name=f'Realty {realty_index}',
+                description='Desc, "quoted"',
+                is_available=True,
+                realty_type=RealtyTypeChoices.HOTEL,
+                beds_count=beds_count,
+                max_guests_count=2,
+                price_per_night=40,
+                location=Address.objects.create(country='Russia', city='Moscow', street=f'Arbat, {realty_index}'),
+                host=host,
+            )
+
+    def test_ndjson_export(self):
+        """Realty is streamed as an object per line ordered by id."""
+        response = self.client.get(reverse('api:realty_export'), {'format': 'ndjson'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="realty.ndjson"')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertListEqual([row['name'] for row in rows], ['Realty 1', 'Realty 2', 'Realty 3'])
+        self.assertEqual(rows[0]['city'], 'Moscow')
+        self.assertEqual(rows[0]['description'], 'Desc, "quoted"')
+
+    def test_csv_export(self):
+        """Realty is streamed as CSV with a header."""
+        response = self.client.get(reverse('api:realty_export'), {'format': 'csv'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,name,slug,description,'))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Realty 1,realty-1,"Desc, ""quoted""",', lines[1])
+
+    def test_filtered_export(self):
+        """Realty list filters are applied to the export."""
+        response = self.client.get(reverse('api:realty_export'), {'format': 'ndjson', 'beds_count': 2})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertListEqual([row['name'] for row in rows], ['Realty 2'])
+
+
+class RealtyBulkCreateApiViewTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        CustomUser.objects.create_superuser(email='admin@gmail.com', password='test')
+        CustomUser.objects.create_user(email='user1@gmail.com', password='test')
+        Amenity.objects.create(name='wifi')
+
+    @staticmethod
+    def get_item(name: str, **kwargs) -> dict:
+        return {
+            'name': name,
+            'description': 'Desc',
+            'is_available': True,
+            'realty_type': RealtyTypeChoices.HOTEL,
+            'beds_count': 2,
+            'max_guests_count': 3,
+            'price_per_night': 40,
+            'location': {'country': 'Russia', 'city': 'Moscow', 'street': 'Arbat, 20'},
+            'amenities': [{'name': 'wifi'}, {'name': 'kitchen'}],
+            **kwargs,
+        }
+
+    def post(self, data):
+        return self.client.post(reverse('api:realty_bulk'), json.dumps(data), content_type='application/json')
+
+    @mock.patch('realty.signals.increment_city_popularity')
+    def test_bulk_create(self, increment_city_popularity):
+        """Realty, their locations and amenities are created in bulk."""
+        self.client.login(email='admin@gmail.com', password='test')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([self.get_item('Realty 1'), self.get_item('Realty 2', amenities=[])])
+
+        self.assertEqual(response.status_code, 201)
+        first_realty, second_realty = [Realty.objects.get(pk=realty_id) for realty_id in response.json()['ids']]
+        self.assertEqual(first_realty.slug, 'realty-1')
+        self.assertEqual(first_realty.host.user.email, 'admin@gmail.com')
+        self.assertEqual(first_realty.location.city_slug, 'moscow')
+        self.assertIsNotNone(first_realty.search_vector)
+        self.assertSetEqual(set(first_realty.amenities.values_list('name', flat=True)), {'wifi', 'kitchen'})
+        self.assertFalse(second_realty.amenities.exists())
+        self.assertEqual(Amenity.objects.count(), 2)
+        increment_city_popularity.assert_called_once_with('Moscow', mock.ANY)
+
+    def test_bulk_create_queries_count(self):
+        """Queries count doesn't depend on the number of items."""
+        self.client.login(email='admin@gmail.com', password='test')
+        self.post([self.get_item('Realty 0')])  # create the `kitchen` amenity and the realty host
+        items = [self.get_item(f'Realty {realty_index}') for realty_index in range(1, 11)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLess(len(queries), 20)
+
+    def test_invalid_items(self):
+        """Errors are returned for each item and nothing is created if any item is invalid."""
+        self.client.login(email='admin@gmail.com', password='test')
+
+        response = self.post([self.get_item('Realty 1'), self.get_item('Realty 2', beds_count=100)])
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertDictEqual(errors[0], {})
+        self.assertIn('beds_count', errors[1])
+        self.assertFalse(Realty.objects.exists())
+
+    def test_not_a_list(self):
+        self.client.login(email='admin@gmail.com', password='test')
+
+        response = self.post(self.get_item('Realty 1'))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_permissions(self):
+        """Only users able to add realty can create realty in bulk."""
+        self.assertIn(self.post([self.get_item('Realty 1')]).status_code, (401, 403))
+
+        self.client.login(email='user1@gmail.com', password='test')  # no profile image and confirmed email
+        self.assertEqual(self.post([self.get_item('Realty 1')]).status_code, 403)
+        self.assertFalse(Realty.objects.exists())
+
+
+class RealtyBulkUpdateApiViewTests(TestCase):
+
+    def setUp(self) -> None:
+        cache.clear()
+        CustomUser.objects.create_superuser(email='admin@gmail.com', password='test')
+        for host_index in range(1, 3):
+            host = RealtyHost.objects.create(
+                user=CustomUser.objects.create_user(email=f'user{host_index}@gmail.com', password='test'),
+            )
+            for realty_index in range(1, 3):
+                Realty.objects.create(
+                    name=f'Realty {host_index}-{realty_index}',
+                    description='Desc',
+                    is_available=True,
+                    realty_type=RealtyTypeChoices.HOTEL,
+                    beds_count=1,
+                    max_guests_count=2,
+                    price_per_night=40,
+                    location=Address.objects.create(country='Russia', city='Moscow', street='Arbat, 20'),
+                    host=host,
+                )
+        self.first_realty = Realty.objects.get(slug='realty-1-1')
+        self.second_realty = Realty.objects.get(slug='realty-1-2')
+        self.other_realty = Realty.objects.get(slug='realty-2-1')
+
+    def patch(self, data):
+        return self.client.patch(reverse('api:realty_bulk'), json.dumps(data), content_type='application/json')
+
+    @mock.patch('realty.signals.invalidate_rendered_realty')
+    def test_bulk_update(self, invalidate_rendered_realty):
+        """Only given fields of the host's realty are updated, rendered realty is invalidated once."""
+        self.client.login(email='user1@gmail.com', password='test')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.patch([
+                {'id': self.first_realty.pk, 'is_available': False},
+                {'id': self.second_realty.pk, 'price_per_night': 55},
+            ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(sorted(response.json()['ids']), sorted([self.first_realty.pk, self.second_realty.pk]))
+        first_realty = Realty.objects.get(pk=self.first_realty.pk)
+        second_realty = Realty.objects.get(pk=self.second_realty.pk)
+        self.assertFalse(first_realty.is_available)
+        self.assertEqual(first_realty.price_per_night, 40)
+        self.assertTrue(second_realty.is_available)
+        self.assertEqual(second_realty.price_per_night, 55)
+        self.assertGreater(first_realty.updated, self.first_realty.updated)
+        invalidate_rendered_realty.assert_called_once()
+        self.assertSetEqual(
+            set(invalidate_rendered_realty.call_args.args[0]), {self.first_realty.pk, self.second_realty.pk},
+        )
+
+    def test_bulk_update_queries_count(self):
+        """Queries count doesn't depend on the number of items."""
+        self.client.login(email='admin@gmail.com', password='test')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch([
+                {'id': realty_id, 'price_per_night': 50} for realty_id in Realty.objects.values_list('id', flat=True)
+            ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 10)
+
+    def test_not_owner(self):
+        """Errors are returned for realty of other hosts and nothing is updated."""
+        self.client.login(email='user1@gmail.com', password='test')
+
+        response = self.patch([
+            {'id': self.first_realty.pk, 'price_per_night': 50},
+            {'id': self.other_realty.pk, 'price_per_night': 50},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertDictEqual(errors[0], {})
+        self.assertIn('id', errors[1])
+        self.assertFalse(Realty.objects.filter(price_per_night=50).exists())
+
+    def test_superuser(self):
+        """Superusers can update realty of any host."""
+        self.client.login(email='admin@gmail.com', password='test')
+
+        response = self.patch([{'id': self.other_realty.pk, 'is_available': False}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Realty.objects.get(pk=self.other_realty.pk).is_available)
+
+    def test_invalid_items(self):
+        """Items without updated fields, invalid values and duplicate ids aren't accepted."""
+        self.client.login(email='user1@gmail.com', password='test')
+
+        self.assertEqual(self.patch([{'id': self.first_realty.pk}]).status_code, 400)
+        self.assertEqual(self.patch([{'id': self.first_realty.pk, 'price_per_night': 0}]).status_code, 400)
+        self.assertEqual(
+            self.patch([
+                {'id': self.first_realty.pk, 'price_per_night': 50},
+                {'id': self.first_realty.pk, 'is_available': False},
+            ]).status_code,
+            400,
+        )
+        self.assertEqual(self.patch({'id': self.first_realty.pk, 'price_per_night': 50}).status_code, 400)
+
+    def test_anonymous(self):
+        self.assertIn(self.patch([{'id': self.first_realty.pk, 'price_per_night': 50}]).status_code, (401, 403))
@@ -1,19 +1,18 @@
-from django.contrib.sitemaps.views import sitemap
 from django.urls import path
 
 from . import views
-from .sitemaps import RealtySiteMap
 
 
-sitemaps = {
-    'realty': RealtySiteMap,
-}
-
 app_name = 'realty'
 
 urlpatterns = [
     path('', views.RealtyListView.as_view(), name='all'),
     path('search/', views.RealtySearchResultsView.as_view(), name='search'),
+    path('autocomplete/', views.RealtyAutocompleteView.as_view(), name='autocomplete'),
+    path('facets/', views.RealtyFacetsView.as_view(), name='facets'),
+    path('map/', views.RealtyMapView.as_view(), name='map'),
+    path('trending/', views.RealtyTrendingView.as_view(), name='trending'),
+    path('trending/<slug:city_slug>/', views.RealtyTrendingView.as_view(), name='trending_by_city'),
     path('rooms/<int:pk>/<slug>/', views.RealtyDetailView.as_view(), name='detail'),
     path('city/<slug:city_slug>/', views.RealtyListView.as_view(), name='all_by_city'),
 
@@ -30,5 +29,6 @@ urlpatterns = [
     path('image/order/', views.RealtyImageOrderView.as_view(), name='image_change_order'),
 
     # Sitemap
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', views.RealtySitemapIndexView.as_view(), name='sitemap'),
+    path('sitemap-<int:chunk>.xml', views.RealtySitemapChunkView.as_view(), name='sitemap_chunk'),
 ]
@@ -3,38 +3,59 @@ from typing import List, Optional
 from braces.views import JsonRequestResponseMixin
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpRequest
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views import generic
 
 from addresses.forms import AddressForm
 from addresses.models import Address
 from common.collections import FormWithModel
+from common.mixins import ConditionalGetMixin
+from common.pagination import KeysetPaginationMixin
 from common.services import get_field_names_from_form, get_keys_with_prefixes, get_required_fields_from_form_with_model
 from common.session_handler import SessionHandler
 from hosts.models import RealtyHost
 
 from .constants import MAX_REALTY_IMAGES_COUNT, REALTY_FORM_KEYS_COLLECTOR_NAME, REALTY_FORM_SESSION_PREFIX
-from .filters import RealtyShortFilter
 from .forms import (
     RealtyDescriptionForm, RealtyFiltersForm, RealtyForm, RealtyGeneralInfoForm, RealtyImageFormSet, RealtyTypeForm,
 )
 from .mixins import RealtySessionDataRequiredMixin
 from .models import CustomDeleteQueryset, Realty, RealtyImage
+from .services.autocomplete import get_autocomplete_suggestions
+from .services.cache import (
+    CachedRealtyIds, CachedRealtyResults, get_cached_realty_count, get_cached_realty_results, get_realty_by_ordered_ids,
+    get_realty_validators, get_results_fingerprint,
+)
+from .services.cards import get_realty_cards
+from .services.facets import get_cached_realty_facets
+from .services.geo import get_realty_map_markers, parse_bbox
 from .services.images import get_images_by_realty_id, update_images_order
 from .services.order import convert_response_to_orders
 from .services.realty import (
-    get_all_available_realty, get_amenity_ids_from_session, get_available_realty_by_city_slug,
-    get_available_realty_filtered_by_type, get_available_realty_search_results,
-    get_cached_realty_visits_count_by_realty_id, get_or_create_realty_host_by_user, update_realty_visits_count,
+    get_all_available_realty, get_amenity_ids_from_session, get_filtered_available_realty,
+    get_or_create_realty_host_by_user, get_realty_details, register_realty_visit, register_realty_visit_by_id,
 )
+from .services.sitemaps import RenderedSitemap, get_realty_sitemap_chunk, get_realty_sitemap_index
+from .services.trending import get_trending_realty
+from .services.visitors import get_visitor_id
 
 
 class RealtySearchResultsView(generic.ListView):
+    """Display search results.
+
+    Results are paginated over ids: pages within the cached ids (see `get_cached_realty_results()`)
+    are taken from the cache, pages past them are fetched from the DB.
+    """
+
     model = Realty
     template_name = 'realty/realty/search_results.html'
+    paginate_by = 20
     realty_type_form: RealtyTypeForm = None
     realty_filters_form: RealtyFiltersForm = None
+    search_results: CachedRealtyResults = None
 
     def dispatch(self, request, *args, **kwargs):
         self.realty_type_form = RealtyTypeForm()
@@ -42,25 +63,22 @@ class RealtySearchResultsView(generic.ListView):
         return super(RealtySearchResultsView, self).dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        realty_search_results = get_available_realty_search_results(self.request.GET.get('q', None))
-
-        realty_types: List[str] = self.request.GET.getlist('realty_type', None)
-        if realty_types:
-            realty_search_results = get_available_realty_filtered_by_type(
-                realty_types=realty_types,
-                realty_qs=realty_search_results,
-            )
-
-        realty_search_results = RealtyShortFilter(self.request.GET, realty_search_results).qs
-
-        return realty_search_results
+        realty_qs = get_filtered_available_realty(self.request.GET, query=self.request.GET.get('q', None))
+        self.search_results = get_cached_realty_results(
+            fingerprint=get_results_fingerprint('search', dict(self.request.GET.lists())),
+            realty_qs=realty_qs,
+        )
+        return CachedRealtyIds(self.search_results, realty_qs)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(RealtySearchResultsView, self).get_context_data(**kwargs)
         search_query: str = self.request.GET.get('q')
+        realty_ids: List[int] = list(context['object_list'])
 
         context['search_query'] = search_query
-        context['realty_count'] = self.get_queryset().count()
+        context['realty_list'] = get_realty_by_ordered_ids(realty_ids).only('id')
+        context['realty_cards'] = get_realty_cards(realty_ids)
+        context['realty_count'] = self.search_results['total']
         context['realty_type_form'] = self.realty_type_form
         context['realty_filters_form'] = self.realty_filters_form
         context['meta_description'] = f"Search results for `{search_query}`"
@@ -68,8 +86,11 @@ class RealtySearchResultsView(generic.ListView):
         return context
 
 
-class RealtyListView(generic.ListView):
-    """Display all available realty objects."""
+class RealtyListView(KeysetPaginationMixin, generic.ListView):
+    """Display all available realty objects.
+
+    Realty is paginated by the `(created, id)` keyset (see `KeysetPaginationMixin`).
+    """
 
     model = Realty
     template_name = 'realty/realty/list.html'
@@ -83,29 +104,24 @@ class RealtyListView(generic.ListView):
         return super(RealtyListView, self).dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        available_realty = get_all_available_realty()
-
-        city_slug: str = self.kwargs.get('city_slug', None)
-        if city_slug:
-            available_realty = get_available_realty_by_city_slug(city_slug=city_slug)
-
-        realty_types: List[str] = self.request.GET.getlist('realty_type', None)
-        if realty_types:
-            available_realty = get_available_realty_filtered_by_type(
-                realty_types=realty_types,
-                realty_qs=available_realty,
-            )
-
-        available_realty = RealtyShortFilter(data=self.request.GET, queryset=available_realty).qs
-
-        return available_realty
+        return get_filtered_available_realty(
+            self.request.GET, city_slug=self.kwargs.get('city_slug', None),
+        ).only('id', 'created')
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(RealtyListView, self).get_context_data(**kwargs)
         city_slug = self.kwargs.get('city_slug', 'All cities')
         city: str = city_slug.capitalize()
 
-        context['realty_count'] = self.get_queryset().count()
+        results_params = dict(self.request.GET.lists(), city_slug=[self.kwargs.get('city_slug', '')])
+        context['realty_count'] = get_cached_realty_count(
+            fingerprint=get_results_fingerprint('list', results_params),
+            realty_qs=self.object_list,
+        )
+        context['realty_cards'] = get_realty_cards(
+            [realty.id for realty in context['realty_list']],
+            context={'show_views_count': True},
+        )
         context['city'] = city
         context['meta_description'] = f"List of places in {city}"
         context['realty_type_form'] = self.realty_type_form
@@ -114,26 +130,65 @@ class RealtyListView(generic.ListView):
         return context
 
 
-class RealtyDetailView(generic.DetailView):
-    """Display a single available Realty."""
+class RealtyTrendingView(generic.ListView):
+    """Display available realty with the highest trending score (recent visits with time decay)."""
+
+    model = Realty
+    template_name = 'realty/realty/trending.html'
+
+    def get_queryset(self):
+        return get_trending_realty(city_slug=self.kwargs.get('city_slug', None)).only('id')
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super(RealtyTrendingView, self).get_context_data(**kwargs)
+        city: str = self.kwargs.get('city_slug', 'All cities').capitalize()
+
+        context['realty_cards'] = get_realty_cards([realty.id for realty in context['realty_list']])
+        context['city'] = city
+        context['meta_description'] = f"Trending places in {city}"
+
+        return context
+
+
+class RealtyDetailView(ConditionalGetMixin, generic.DetailView):
+    """Display a single available Realty.
+
+    Realty is fetched once (with everything the template renders, see `get_realty_details()`)
+    and the visit is counted by a single Redis round trip.
+    Conditional requests are answered with `304 Not Modified` by the realty validators (see `get_realty_validators()`).
+    """
 
     model = Realty
     template_name = 'realty/realty/detail.html'
     queryset = get_all_available_realty()
+    realty_cached_visits_count: int = 0
+    weak_etag = True
+
+    def get_queryset(self):
+        return get_realty_details(super(RealtyDetailView, self).get_queryset())
+
+    def get_validators(self):
+        validators = get_realty_validators(self.kwargs['pk'])
+        if validators is not None:
+            # the page also depends on the user (e.g. the header) and the device
+            is_mobile_agent = getattr(self.request, 'is_mobile_agent', False)
+            validators['etag'] = f"{validators['etag']}:{self.request.user.pk}:{is_mobile_agent}"
+        return validators
 
     def get(self, request: HttpRequest, *args, **kwargs):
-        update_realty_visits_count(self.get_object().id)
-        return super(RealtyDetailView, self).get(request, *args, **kwargs)
+        if (not_modified_response := self.get_not_modified_response(request)) is not None:
+            # the page isn't rendered, but it's still a visit
+            register_realty_visit_by_id(kwargs['pk'], get_visitor_id(request))
+            return not_modified_response
+
+        self.object = self.get_object()
+        self.realty_cached_visits_count = register_realty_visit(self.object, get_visitor_id(request))
+        context = self.get_context_data(object=self.object)
+        return self.set_validators(self.render_to_response(context))
 
     def get_context_data(self, **kwargs):
         context = super(RealtyDetailView, self).get_context_data(**kwargs)
-        realty_object: Realty = self.get_object()
-
-        context['realty_views_count'] = (
-                realty_object.visits_count +
-                get_cached_realty_visits_count_by_realty_id(realty_id=realty_object.id)
-        )
-
+        context['realty_views_count'] = self.object.visits_count + self.realty_cached_visits_count
         return context
 
 
@@ -451,3 +506,78 @@ class RealtyImageOrderView(
                 'saved': 'OK',
             },
         )
+
+
+class RealtyAutocompleteView(
+    JsonRequestResponseMixin,
+    generic.View,
+):
+    """View for the search autocomplete (city and realty name suggestions)."""
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        return self.render_json_response(
+            context_dict=get_autocomplete_suggestions(request.GET.get('q', '')),
+        )
+
+
+class RealtyFacetsView(
+    JsonRequestResponseMixin,
+    generic.View,
+):
+    """View for facet counts of the realty filters (for the current search/list query parameters)."""
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        return self.render_json_response(
+            context_dict=get_cached_realty_facets(request.GET),
+        )
+
+
+class RealtyMapView(
+    JsonRequestResponseMixin,
+    generic.View,
+):
+    """View for realty markers inside the map viewport (`bbox` query parameter).
+
+    Markers are also filtered by the search query and the list filters (type, beds, guests, amenities).
+    """
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        try:
+            bbox = parse_bbox(request.GET.get('bbox', ''))
+        except ValueError as error:
+            return self.render_bad_request_response(error_dict={'bbox': str(error)})
+
+        realty_qs = get_filtered_available_realty(request.GET, query=request.GET.get('q', None))
+        return self.render_json_response(
+            context_dict={'markers': get_realty_map_markers(bbox, realty_qs)},
+        )
+
+
+class RealtySitemapView(generic.View):
+    """Base view for pre-rendered sitemaps (see `build_realty_sitemaps()`), that are served with `Last-Modified`."""
+
+    def render_sitemap_response(self, sitemap: RenderedSitemap) -> HttpResponse:
+        response = HttpResponse(sitemap['content'], content_type='application/xml')
+        if sitemap['last_modified'] is None:
+            return response
+
+        last_modified = int(sitemap['last_modified'].timestamp())
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(self.request, last_modified=last_modified, response=response)
+
+
+class RealtySitemapIndexView(RealtySitemapView):
+    """View for the sitemap index, that refers to sitemap chunks (split by realty id ranges)."""
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        return self.render_sitemap_response(get_realty_sitemap_index())
+
+
+class RealtySitemapChunkView(RealtySitemapView):
+    """View for a single sitemap chunk."""
+
+    def get(self, request: HttpRequest, chunk: int, *args, **kwargs):
+        sitemap = get_realty_sitemap_chunk(chunk)
+        if sitemap is None:
+            raise Http404
+        return self.render_sitemap_response(sitemap)
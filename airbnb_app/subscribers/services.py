@@ -7,10 +7,14 @@ from django.template.loader import get_template, render_to_string
 from accounts.models import CustomUser
 from mailings.services import send_email_with_attachments
 from realty.models import Realty
+from realty.services.cards import get_realty_cards
 
 from .models import Subscriber
 
 
+PROMO_REALTY_CARD_TEMPLATE = 'subscribers/promo/realty_card.html'
+
+
 def get_subscriber_by_email(email: str) -> QuerySet[Subscriber]:
     return Subscriber.objects.filter(email=email)
 
@@ -45,15 +49,23 @@ def send_recommendation_email_to_subscriber(
         subscriber_id: Union[int, str],
         realty_recommendations: QuerySet[Realty],
 ) -> None:
-    """Sends a promo email about new realty (`realty_recommendations`) to the `subscriber_id` Subscriber."""
+    """Sends a promo email about new realty (`realty_recommendations`) to the `subscriber_id` Subscriber.
+
+    Realty cards are rendered once and shared by all subscribers' emails (see `get_realty_cards()`).
+    """
     protocol = settings.DEFAULT_PROTOCOL
     subject = 'Check out new realty'
     subscriber = Subscriber.objects.get(id=subscriber_id)
+    realty_cards = get_realty_cards(
+        realty_recommendations.values_list('id', flat=True),
+        template_name=PROMO_REALTY_CARD_TEMPLATE,
+        context={'protocol': protocol, 'domain': site_domain},
+    )
     text_content = render_to_string(
         template_name='subscribers/promo/new_realty.html',
         context={
             'subscriber': subscriber,
-            'realty_list': realty_recommendations,
+            'realty_cards': realty_cards,
             'protocol': protocol,
             'domain': site_domain,
         },
@@ -62,7 +74,7 @@ def send_recommendation_email_to_subscriber(
     html_content = html.render(
         context={
             'subscriber': subscriber,
-            'realty_list': realty_recommendations,
+            'realty_cards': realty_cards,
             'protocol': protocol,
             'domain': site_domain,
         },
@@ -8,11 +8,12 @@ from accounts.models import CustomUser
 from addresses.models import Address
 from hosts.models import RealtyHost
 from realty.models import Realty, RealtyTypeChoices
+from realty.services.cards import get_realty_cards
 
 from ..models import Subscriber
 from ..services import (
-    get_subscriber_by_email, get_subscriber_by_user, send_recommendation_email_to_subscriber, set_user_for_subscriber,
-    update_email_for_subscriber_by_user,
+    PROMO_REALTY_CARD_TEMPLATE, get_subscriber_by_email, get_subscriber_by_user,
+    send_recommendation_email_to_subscriber, set_user_for_subscriber, update_email_for_subscriber_by_user,
 )
 
 
@@ -163,11 +164,16 @@ class SubscribersServicesTests(TestCase):
         realty_recommendations = Realty.objects.all()
         test_domain = 'airbnb'
         test_protocol = settings.DEFAULT_PROTOCOL
+        test_realty_cards = get_realty_cards(
+            realty_recommendations.values_list('id', flat=True),
+            template_name=PROMO_REALTY_CARD_TEMPLATE,
+            context={'protocol': test_protocol, 'domain': test_domain},
+        )
         test_content = render_to_string(
             template_name='subscribers/promo/new_realty.html',
             context={
                 'subscriber': test_subscriber,
-                'realty_list': realty_recommendations,
+                'realty_cards': test_realty_cards,
                 'protocol': test_protocol,
                 'domain': test_domain,
             },
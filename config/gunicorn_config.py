@@ -4,3 +4,10 @@ bind = '0.0.0.0:8000'
 workers = 1
 limit_request_fields = 32000
 limit_request_field_size = 0
+
+
+def worker_exit(server, worker):
+    """Flush realty visits buffered by the worker (if `REALTY_VISITS_BUFFER_ENABLED` is set)."""
+    from realty.services.visits_buffer import flush_realty_visits_buffer
+
+    flush_realty_visits_buffer()